@@ -0,0 +1,19 @@
+"""ASGI entrypoint (uvicorn/hypercorn) using the native request/response handler."""
+from atlasbahamas_app import core
+from atlasbahamas_app.asgi_adapter import ASGIHandler
+
+# Run the same startup bootstrap used by server.py.
+core.setup_logging()
+core.bootstrap_files()
+core.ensure_db()
+if core.CLEAR_SESSIONS_ON_START:
+    core.clear_active_sessions()
+
+application = ASGIHandler()
+app = application
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
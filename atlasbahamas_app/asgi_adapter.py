@@ -0,0 +1,142 @@
+"""ASGI adapter running the handler mixins under an async server (uvicorn, hypercorn).
+
+Request bodies are received on the event loop, so slow uploaders do not hold a
+handler thread; a client that disconnects mid-body is dropped without running the
+handler, and bodies over ``MAX_REQUEST_BYTES`` (declared or chunked) get a 413. The synchronous handler then runs on a bounded thread pool
+(``ASGI_WORKER_THREADS``). Small responses are sent after the handler returns;
+responses without a Content-Length or above ``WSGI_BUFFER_MAX_BYTES`` are sent
+as the handler writes them, each chunk waiting for the server to accept it.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import core
+from .http_handler import NativeHandler
+from .http_io import Request, Response, run_handler
+
+_METHOD_NOT_ALLOWED = b"Method Not Allowed"
+_SERVER_ERROR = b"Internal Server Error"
+_TOO_LARGE = b"Payload Too Large"
+
+
+def _encode_headers(headers):
+    return [(str(k).lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in headers]
+
+
+async def _send_plain(send, status, payload):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(payload)).encode())],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class ASGIHandler:
+    def __init__(self, handler_class=NativeHandler, max_workers=None):
+        self.handler_class = handler_class
+        self.max_workers = max_workers or core.ASGI_WORKER_THREADS
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asgi-handler")
+                    self._executor_pid = pid
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        method = (scope.get("method") or "GET").upper()
+        if method not in ("GET", "POST"):
+            await _send_plain(send, 405, _METHOD_NOT_ALLOWED)
+            return
+
+        try:
+            body = await self._read_body(receive, scope.get("headers") or [])
+        except _BodyTooLarge:
+            await _send_plain(send, 413, _TOO_LARGE)
+            return
+        if body is None:
+            # The client went away before the body was complete; never act on a partial POST.
+            return
+        request = Request.from_asgi(scope, body)
+        response = Response()
+        loop = asyncio.get_running_loop()
+
+        def _send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def _on_headers(resp):
+            if not resp.streaming and resp.should_stream(core.WSGI_BUFFER_MAX_BYTES):
+                _send_from_thread({"type": "http.response.start", "status": resp.code, "headers": _encode_headers(resp.headers)})
+                resp.stream_to(lambda chunk: _send_from_thread({"type": "http.response.body", "body": chunk, "more_body": True}))
+
+        handler = self.handler_class(request, response, on_headers=_on_headers)
+        try:
+            await loop.run_in_executor(self._pool(), run_handler, handler)
+        except Exception:
+            if response.streaming:
+                # Headers are already out; let the server drop the connection.
+                raise
+            await _send_plain(send, 500, _SERVER_ERROR)
+            return
+
+        if response.streaming:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        await send({"type": "http.response.start", "status": response.code, "headers": _encode_headers(response.buffered_headers())})
+        await send({"type": "http.response.body", "body": response.body()})
+
+    @staticmethod
+    async def _read_body(receive, headers):
+        """The full request body, or None if the client disconnected first."""
+        for k, v in headers:
+            if k.lower() == b"content-length":
+                try:
+                    declared = int(v)
+                except ValueError:
+                    declared = 0
+                if declared > core.MAX_REQUEST_BYTES:
+                    raise _BodyTooLarge()
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunk = message.get("body") or b""
+            size += len(chunk)
+            # Chunked uploads carry no Content-Length, so the running size is checked too.
+            if size > core.MAX_REQUEST_BYTES:
+                raise _BodyTooLarge()
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
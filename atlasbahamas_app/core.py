@@ -4,23 +4,45 @@ AtlasBahamas - Pure-Python Property Management Server
 Run:  python server.py      Open: http://127.0.0.1:5000
 Self-contained: all files are embedded and created on first launch.
 """
-import os, re, json, sqlite3, secrets, hashlib, hmac, sys, traceback, time, threading, smtplib, logging
+import os, re, json, sqlite3, secrets, hashlib, hmac, heapq, math, sys, traceback, time, threading, smtplib, logging
 from logging.handlers import RotatingFileHandler
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs, urlencode
 from pathlib import Path
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+import multiprocessing
+from itertools import chain
 from datetime import datetime, timedelta, timezone
 from email.message import EmailMessage
 try:
-    from db import connect_db, postgres_enabled, DBOperationalError
+    from db import (
+        connect_db, postgres_enabled, pool_stats, sql_translation_cache_stats, DBOperationalError,
+        sqlite_write_queue, write_queue_enabled, write_queue_stats, replicas_enabled, replica_stats,
+        start_query_stats, stop_query_stats,
+    )
 except Exception:  # pragma: no cover - sqlite-only fallback
     connect_db = None
     postgres_enabled = lambda *_args, **_kwargs: False
+    pool_stats = lambda: {}
+    sql_translation_cache_stats = lambda: {}
+    sqlite_write_queue = None
+    write_queue_enabled = lambda: False
+    write_queue_stats = lambda: {}
+    replicas_enabled = lambda: False
+    replica_stats = lambda: {}
+    start_query_stats = lambda: None
+    stop_query_stats = lambda: None
     DBOperationalError = (sqlite3.OperationalError,)
 try:
     from redis_client import RedisClient
 except Exception:
     RedisClient = None
+try:
+    from guard_store import SqliteGuardStore
+except Exception:
+    SqliteGuardStore = None
 
 def _env_bool(name, default=False):
     v = os.getenv(name)
@@ -116,7 +138,9 @@ DEFAULT_PUBLIC_HOST = _normalize_host_value(PUBLIC_BASE_URL) or (ALLOWED_HOSTS[0
 
 SESSION_COOKIE = "ATLASBAHAMAS_SESSION"
 CSRF_COOKIE = "ATLASBAHAMAS_CSRF"
+PRIMARY_STICKY_COOKIE = "ATLASBAHAMAS_PRIMARY"
 SESSION_DAYS = 7
+REPLICA_STICKY_SECONDS = max(0, _env_int("POSTGRES_REPLICA_STICKY_SECONDS", 5))
 LOGIN_MAX_ATTEMPTS = _env_int("LOGIN_MAX_ATTEMPTS", _env_int("MAX_LOGIN_ATTEMPTS", 5))
 LOGIN_LOCK_SECONDS = _env_int("LOGIN_LOCK_SECONDS", max(30, _env_int("LOGIN_ATTEMPT_TIMEOUT_MINUTES", 15) * 60))
 LOGIN_TRACK_SECONDS = _env_int("LOGIN_TRACK_SECONDS", max(LOGIN_LOCK_SECONDS, 900))
@@ -143,6 +167,27 @@ HSTS_PRELOAD = _env_bool("HSTS_PRELOAD", False)
 ALLOW_RESET_LINK_IN_RESPONSE_NONLOCAL = _env_bool("ALLOW_RESET_LINK_IN_RESPONSE_NONLOCAL", False)
 HOUSEKEEPING_INTERVAL_SECONDS = max(60, _env_int("HOUSEKEEPING_INTERVAL_SECONDS", 3600))
 PASSWORD_RESET_RETENTION_DAYS = max(1, _env_int("PASSWORD_RESET_RETENTION_DAYS", 30))
+QUERY_STATS_ENABLED = _env_bool("QUERY_STATS_ENABLED", True)
+QUERY_BUDGET_COUNT = max(1, _env_int("QUERY_BUDGET_COUNT", 50))
+QUERY_BUDGET_MS = max(1, _env_int("QUERY_BUDGET_MS", 500))
+N_PLUS_ONE_THRESHOLD = max(2, _env_int("N_PLUS_ONE_THRESHOLD", 10))
+TEMPLATE_RELOAD = _env_bool("TEMPLATE_RELOAD", not PROD_MODE)
+NAV_CACHE_TTL_SECONDS = max(0, _env_int("NAV_CACHE_TTL_SECONDS", 15))
+NAV_CACHE_MAX_USERS = max(1, _env_int("NAV_CACHE_MAX_USERS", 5000))
+SESSION_CACHE_TTL_SECONDS = max(0, _env_int("SESSION_CACHE_TTL_SECONDS", 10))
+SESSION_CACHE_MAX_ENTRIES = max(1, _env_int("SESSION_CACHE_MAX_ENTRIES", 10000))
+GUARD_STATE_BACKEND = (os.getenv("GUARD_STATE_BACKEND", "memory") or "memory").strip().lower()
+GUARD_STATE_PATH = Path(os.getenv("GUARD_STATE_PATH", str(DATA_DIR / "guard_state.sqlite")))
+PASSWORD_HASH_ROUNDS = max(100000, _env_int("PASSWORD_HASH_ROUNDS", 200000))
+PASSWORD_HASH_WORKERS = max(0, _env_int("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = max(1, _env_int("PASSWORD_HASH_MAX_PENDING", 8))
+PASSWORD_HASH_TIMEOUT_SECONDS = max(1, _env_int("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+WSGI_STREAMING_ENABLED = _env_bool("WSGI_STREAMING_ENABLED", True)
+WSGI_BUFFER_MAX_BYTES = max(0, _env_int("WSGI_BUFFER_MAX_BYTES", 256 * 1024))
+WSGI_STREAM_QUEUE_CHUNKS = max(1, _env_int("WSGI_STREAM_QUEUE_CHUNKS", 8))
+WSGI_HANDLER_THREADS = max(1, _env_int("WSGI_HANDLER_THREADS", 16))
+WSGI_RESPONSE_TIMEOUT_SECONDS = max(1, _env_int("WSGI_RESPONSE_TIMEOUT_SECONDS", 60))
+ASGI_WORKER_THREADS = max(1, _env_int("ASGI_WORKER_THREADS", 32))
 LOG_LEVEL = (os.getenv("LOG_LEVEL", "INFO") or "INFO").strip().upper()
 LOG_JSON = _env_bool("LOG_JSON", True)
 LOG_DIR = Path(os.getenv("LOG_DIR", str(DATA_DIR / "logs")))
@@ -154,7 +199,7 @@ ERROR_ALERT_COOLDOWN_SECONDS = max(60, _env_int("ERROR_ALERT_COOLDOWN_SECONDS",
 REDIS_SESSIONS_ENABLED = _env_bool("REDIS_SESSIONS_ENABLED", True)
 REDIS_SESSION_PREFIX = (os.getenv("REDIS_SESSION_PREFIX", "atlasbahamas:session:") or "atlasbahamas:session:").strip() or "atlasbahamas:session:"
 REDIS_SESSION_USER_PREFIX = (os.getenv("REDIS_SESSION_USER_PREFIX", "atlasbahamas:session_uid:") or "atlasbahamas:session_uid:").strip() or "atlasbahamas:session_uid:"
-SCHEMA_VERSION = 17
+SCHEMA_VERSION = 21
 POSTGRES_MIGRATIONS_REL = ("migrations", "postgres")
 RATE_LIMIT_RULES = {
     "/login": (12, 60),
@@ -223,13 +268,13 @@ PERMISSION_DEFAULTS = {
     "admin.audit.read": {"admin"},
 }
 
-_LOGIN_GUARD = {}
-_LOGIN_GUARD_LOCK = threading.Lock()
 _RATE_LIMIT_BUCKETS = {}
 _RATE_LIMIT_LOCK = threading.Lock()
+_RATE_LIMIT_STATS = {}
 _HOUSEKEEPING_LOCK = threading.Lock()
 _LAST_HOUSEKEEPING_TS = 0.0
 _LAST_DAILY_AUTOMATION_DATE = ""
+_LAST_OCCUPANCY_SNAPSHOT_MONTH = ""
 _LOGGER = logging.getLogger("atlasbahamas")
 _LOG_READY = False
 _ALERT_LOCK = threading.Lock()
@@ -337,11 +382,32 @@ def redis_runtime_client():
             log_event(logging.WARNING, "redis_init_failed_fallback_sqlite_sessions", error=str(e))
             return None
 
+# Session keys live under a namespace number ({prefix}{ns}:{raw}); clear_redis_sessions() bumps it
+# instead of scanning, and the abandoned keys age out on their own TTLs. Session reads fetch the
+# number with the key (get_session_redis), so a bump retires old sessions in every worker at once;
+# writes use the copy re-read every _REDIS_SESSION_NS_REFRESH_SECONDS.
+_REDIS_SESSION_NS_REFRESH_SECONDS = 5.0
+_REDIS_SESSION_NS = {"value": None, "checked": 0.0}
+
+def _redis_session_ns_key():
+    return f"{REDIS_SESSION_PREFIX}namespace"
+
+def _redis_session_ns():
+    now = time.monotonic()
+    if _REDIS_SESSION_NS["value"] is None or now - _REDIS_SESSION_NS["checked"] >= _REDIS_SESSION_NS_REFRESH_SECONDS:
+        cli = redis_runtime_client()
+        raw = cli.get_text(_redis_session_ns_key()) if cli else None
+        if raw is not None or _REDIS_SESSION_NS["value"] is None:
+            _REDIS_SESSION_NS["value"] = to_int(raw, 0)
+        _REDIS_SESSION_NS["checked"] = now
+    return _REDIS_SESSION_NS["value"]
+
 def _redis_session_key(raw):
-    return f"{REDIS_SESSION_PREFIX}{raw}"
+    return f"{REDIS_SESSION_PREFIX}{_redis_session_ns()}:{raw}"
 
 def _redis_user_session_key(uid):
-    return f"{REDIS_SESSION_USER_PREFIX}{to_int(uid, 0)}"
+    # A SET of the user's live session tokens.
+    return f"{REDIS_SESSION_USER_PREFIX}{_redis_session_ns()}:{to_int(uid, 0)}"
 
 def _expires_to_ttl_seconds(expires_at):
     ts = str(expires_at or "").strip()
@@ -356,7 +422,11 @@ def _expires_to_ttl_seconds(expires_at):
     except Exception:
         return max(1, SESSION_DAYS * 86400)
 
-def cache_session_redis(raw, user_id, expires_at, ip_hash="", user_agent_hash=""):
+# Version stamp of the Redis session payload; bump when the cached user fields change.
+# Payloads with another stamp (or none) fall back to a users lookup and are rewritten.
+REDIS_SESSION_PAYLOAD_VERSION = 2
+
+def cache_session_redis(raw, user_id, expires_at, ip_hash="", user_agent_hash="", user=None):
     token = (raw or "").strip()
     uid = to_int(user_id, 0)
     if not token or uid <= 0:
@@ -367,19 +437,23 @@ def cache_session_redis(raw, user_id, expires_at, ip_hash="", user_agent_hash=""
     ttl = _expires_to_ttl_seconds(expires_at)
     if ttl <= 0:
         return False
-    ukey = _redis_user_session_key(uid)
-    prior = cli.get_text(ukey) or ""
-    if prior and prior != token:
-        cli.delete(_redis_session_key(prior))
     payload = {
         "user_id": uid,
         "expires_at": str(expires_at or ""),
         "ip_hash": str(ip_hash or ""),
         "user_agent_hash": str(user_agent_hash or ""),
     }
-    ok_sess = cli.set_json(_redis_session_key(token), payload, ttl_seconds=ttl)
-    ok_user = cli.set_text(ukey, token, ttl_seconds=ttl)
-    return bool(ok_sess and ok_user)
+    if user:
+        payload["v"] = REDIS_SESSION_PAYLOAD_VERSION
+        payload["user"] = dict(user)
+    ukey = _redis_user_session_key(uid)
+    # Sessions all last SESSION_DAYS, so the newest one sets the index TTL.
+    replies = cli.pipeline([
+        ("SET", _redis_session_key(token), json.dumps(payload), "EX", ttl),
+        ("SADD", ukey, token),
+        ("EXPIRE", ukey, ttl),
+    ])
+    return bool(replies and replies[0])
 
 def get_session_redis(raw):
     token = (raw or "").strip()
@@ -388,56 +462,208 @@ def get_session_redis(raw):
     cli = redis_runtime_client()
     if not cli:
         return None
-    data = cli.get_json(_redis_session_key(token))
+    ns = _redis_session_ns()
+    current, data = cli.get_many_json([_redis_session_ns_key(), _redis_session_key(token)])
+    if current is not None and to_int(current, 0) != ns:
+        # Sessions were cleared by another process since this one last looked: follow it now.
+        _REDIS_SESSION_NS["value"] = to_int(current, 0)
+        _REDIS_SESSION_NS["checked"] = time.monotonic()
+        data = cli.get_json(_redis_session_key(token))
     if not isinstance(data, dict):
         return None
     uid = to_int(data.get("user_id"), 0)
     if uid <= 0:
-        cli.delete(_redis_session_key(token))
+        cli.delete_many([_redis_session_key(token)])
         return None
     if _expires_to_ttl_seconds(data.get("expires_at")) <= 0:
         delete_session_redis(token, user_id=uid)
         return None
+    user = data.get("user")
+    if data.get("v") != REDIS_SESSION_PAYLOAD_VERSION or not isinstance(user, dict) or to_int(user.get("id"), 0) != uid:
+        user = None
     return {
         "user_id": uid,
         "expires_at": str(data.get("expires_at") or ""),
         "ip_hash": str(data.get("ip_hash") or ""),
         "user_agent_hash": str(data.get("user_agent_hash") or ""),
+        "user": user,
     }
 
-def delete_session_redis(raw, user_id=None):
-    token = (raw or "").strip()
+def refresh_session_user(c, user_id):
+    """Rewrite the profile cached in a user's Redis sessions and drop their in-process entries.
+
+    Inside a request the Redis rewrite waits until the request transaction has ended, so a
+    change that is rolled back never reaches the cached sessions.
+    """
+    uid = to_int(user_id, 0)
+    if uid <= 0:
+        return
+    invalidate_session_cache(user_id=uid)
+    scope = current_request_scope()
+    if scope is not None:
+        scope.session_refreshes.add(uid)
+        return
+    _rewrite_session_user(c, uid)
+
+def _rewrite_session_user(c, uid):
     cli = redis_runtime_client()
     if not cli:
         return
-    uid = to_int(user_id, 0)
+    ukey = _redis_user_session_key(uid)
+    tokens = sorted(cli.set_members(ukey))
+    if not tokens:
+        return
+    r = c.execute("SELECT * FROM users WHERE id=?", (uid,)).fetchone()
+    if not r:
+        delete_user_sessions_redis(uid, tokens)
+        return
+    user = _user_row_to_dict(r)
+    items, stale = [], []
+    for token, data in zip(tokens, cli.get_many_json([_redis_session_key(t) for t in tokens])):
+        ttl = _expires_to_ttl_seconds(data.get("expires_at")) if isinstance(data, dict) else 0
+        if ttl <= 0 or to_int(data.get("user_id"), 0) != uid:
+            stale.append(token)
+            continue
+        data["v"] = REDIS_SESSION_PAYLOAD_VERSION
+        data["user"] = user
+        items.append((_redis_session_key(token), data, ttl))
+    if items:
+        cli.set_many_json(items)
+    if stale:
+        cli.pipeline([("SREM", ukey, *stale)])
+
+def delete_sessions_redis(pairs):
+    """Drop (raw, user_id) sessions and their per-user index entries in one pipeline."""
+    cli = redis_runtime_client()
+    if not cli:
+        return
+    pairs = [((raw or "").strip(), to_int(uid, 0)) for raw, uid in pairs]
+    pairs = [(raw, uid) for raw, uid in pairs if raw]
+    if not pairs:
+        return
+    unknown = [raw for raw, uid in pairs if uid <= 0]
+    if unknown:
+        owners = dict(zip(unknown, cli.get_many_json([_redis_session_key(raw) for raw in unknown])))
+        pairs = [
+            (raw, uid if uid > 0 else to_int((owners.get(raw) or {}).get("user_id"), 0))
+            for raw, uid in pairs
+        ]
+    by_user = {}
+    for raw, uid in pairs:
+        if uid > 0:
+            by_user.setdefault(uid, []).append(raw)
+    commands = [("UNLINK", *[_redis_session_key(raw) for raw, _uid in pairs])]
+    commands.extend(("SREM", _redis_user_session_key(uid), *raws) for uid, raws in by_user.items())
+    cli.pipeline(commands)
+
+def delete_session_redis(raw, user_id=None):
+    token = (raw or "").strip()
     if token:
-        if uid <= 0:
-            sess = cli.get_json(_redis_session_key(token)) or {}
-            uid = to_int(sess.get("user_id"), 0)
-        cli.delete(_redis_session_key(token))
-    if uid > 0:
-        ukey = _redis_user_session_key(uid)
-        if token:
-            mapped = cli.get_text(ukey) or ""
-            if (not mapped) or mapped == token:
-                cli.delete(ukey)
-        else:
-            cli.delete(ukey)
+        delete_sessions_redis([(token, user_id)])
+    elif to_int(user_id, 0) > 0:
+        delete_user_sessions_redis(user_id)
+
+def delete_user_sessions_redis(user_id, tokens=()):
+    """Drop every Redis session of a user (plus any extra tokens) via the per-user index."""
+    uid = to_int(user_id, 0)
+    cli = redis_runtime_client()
+    if not cli or uid <= 0:
+        return
+    ukey = _redis_user_session_key(uid)
+    tokens = {t for t in ((x or "").strip() for x in tokens) if t} | cli.set_members(ukey)
+    cli.delete_many([_redis_session_key(t) for t in sorted(tokens)] + [ukey])
 
 def clear_redis_sessions():
+    """Retire every Redis session by bumping the key namespace; returns the new namespace (0 if off)."""
     cli = redis_runtime_client()
     if not cli:
         return 0
-    removed = 0
-    removed += cli.delete_by_prefix(REDIS_SESSION_PREFIX)
-    removed += cli.delete_by_prefix(REDIS_SESSION_USER_PREFIX)
-    return removed
+    ns = cli.incr(_redis_session_ns_key())
+    if ns > 0:
+        _REDIS_SESSION_NS["value"] = ns
+        _REDIS_SESSION_NS["checked"] = time.monotonic()
+    return ns
+
+# Per-process LRU of validated sessions: raw session id -> user dict, ip/ua hashes and expiry.
+# Entries live for SESSION_CACHE_TTL_SECONDS; logout, session rotation and role/profile
+# changes drop them in this process, other workers see the change once their entry expires.
+_SESSION_CACHE = OrderedDict()
+_SESSION_CACHE_LOCK = threading.Lock()
+_SESSION_CACHE_GENERATION = 0
+_SESSION_CACHE_STATS = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+def _session_cache_get(raw):
+    if SESSION_CACHE_TTL_SECONDS <= 0:
+        return None
+    with _SESSION_CACHE_LOCK:
+        entry = _SESSION_CACHE.get(raw)
+        if entry is not None and (entry["cached_until"] <= time.monotonic() or entry["expires_ts"] <= time.time()):
+            _SESSION_CACHE.pop(raw, None)
+            entry = None
+        if entry is None:
+            _SESSION_CACHE_STATS["misses"] += 1
+            return None
+        _SESSION_CACHE.move_to_end(raw)
+        _SESSION_CACHE_STATS["hits"] += 1
+        return entry
+
+def _session_cache_put(raw, user, expires_at, ip_hash, user_agent_hash, generation):
+    if SESSION_CACHE_TTL_SECONDS <= 0:
+        return
+    ttl = _expires_to_ttl_seconds(expires_at)
+    if ttl <= 0:
+        return
+    entry = {
+        "user": dict(user),
+        "ip_hash": ip_hash or "",
+        "user_agent_hash": user_agent_hash or "",
+        "expires_ts": time.time() + ttl,
+        "cached_until": time.monotonic() + SESSION_CACHE_TTL_SECONDS,
+    }
+    with _SESSION_CACHE_LOCK:
+        # An invalidation landed while this session was being loaded; do not cache stale data.
+        if generation != _SESSION_CACHE_GENERATION:
+            return
+        _SESSION_CACHE[raw] = entry
+        _SESSION_CACHE.move_to_end(raw)
+        while len(_SESSION_CACHE) > SESSION_CACHE_MAX_ENTRIES:
+            _SESSION_CACHE.popitem(last=False)
+            _SESSION_CACHE_STATS["evictions"] += 1
+
+def _drop_session_cache_entries(raw="", user_id=0):
+    global _SESSION_CACHE_GENERATION
+    with _SESSION_CACHE_LOCK:
+        _SESSION_CACHE_GENERATION += 1
+        if raw:
+            _SESSION_CACHE.pop(raw, None)
+        if user_id > 0:
+            for key in [k for k, e in _SESSION_CACHE.items() if e["user"]["id"] == user_id]:
+                _SESSION_CACHE.pop(key, None)
+
+def invalidate_session_cache(raw=None, user_id=None):
+    """Drop cached sessions by session id and/or user id, or all of them when both are None."""
+    global _SESSION_CACHE_GENERATION
+    _SESSION_CACHE_STATS["invalidations"] += 1
+    if raw is None and user_id is None:
+        with _SESSION_CACHE_LOCK:
+            _SESSION_CACHE_GENERATION += 1
+            _SESSION_CACHE.clear()
+        return
+    token = (raw or "").strip()
+    uid = to_int(user_id, 0)
+    _drop_session_cache_entries(token, uid)
+    scope = current_request_scope()
+    if scope is not None:
+        scope.session_invalidations.add((token, uid))
+
+def session_cache_stats():
+    return dict(_SESSION_CACHE_STATS, size=len(_SESSION_CACHE), ttl_seconds=SESSION_CACHE_TTL_SECONDS)
 
 def invalidate_session_raw(raw):
     token = (raw or "").strip()
     if not token:
         return
+    invalidate_session_cache(raw=token)
     db_write_retry(lambda c: c.execute("DELETE FROM sessions WHERE session_id=?", (token,)))
     delete_session_redis(token)
 
@@ -445,17 +671,12 @@ def invalidate_user_sessions(c, user_id):
     uid = to_int(user_id, 0)
     if uid <= 0:
         return 0
+    invalidate_session_cache(user_id=uid)
     rows = c.execute("SELECT session_id FROM sessions WHERE user_id=?", (uid,)).fetchall()
     c.execute("DELETE FROM sessions WHERE user_id=?", (uid,))
-    deleted = 0
-    for r in rows:
-        sid = (r["session_id"] or "").strip()
-        if sid:
-            delete_session_redis(sid, user_id=uid)
-            deleted += 1
-    if deleted == 0:
-        delete_session_redis("", user_id=uid)
-    return deleted
+    sids = [sid for sid in ((r["session_id"] or "").strip() for r in rows) if sid]
+    delete_user_sessions_redis(uid, sids)
+    return len(sids)
 
 def _user_row_to_dict(r):
     return {
@@ -2243,6 +2464,12 @@ CREATE TABLE IF NOT EXISTS message_posts(id INTEGER PRIMARY KEY AUTOINCREMENT,th
 CREATE TABLE IF NOT EXISTS tenant_ledger_entries(id INTEGER PRIMARY KEY AUTOINCREMENT,tenant_account TEXT NOT NULL,property_id TEXT,unit_label TEXT,lease_id INTEGER,entry_type TEXT NOT NULL CHECK(entry_type IN('charge','payment','late_fee','adjustment')),category TEXT NOT NULL,amount INTEGER NOT NULL,status TEXT NOT NULL CHECK(status IN('open','paid','void','submitted','failed')) DEFAULT 'open',due_date TEXT,statement_month TEXT,note TEXT,source_payment_id INTEGER,created_at TEXT NOT NULL DEFAULT(datetime('now')),updated_at TEXT,FOREIGN KEY(tenant_account)REFERENCES users(account_number)ON DELETE CASCADE,FOREIGN KEY(lease_id)REFERENCES tenant_leases(id)ON DELETE SET NULL,FOREIGN KEY(source_payment_id)REFERENCES payments(id)ON DELETE SET NULL);
 CREATE TABLE IF NOT EXISTS notification_preferences(user_id INTEGER PRIMARY KEY,payment_events INTEGER NOT NULL DEFAULT 1,maintenance_events INTEGER NOT NULL DEFAULT 1,lease_events INTEGER NOT NULL DEFAULT 1,invite_events INTEGER NOT NULL DEFAULT 1,application_events INTEGER NOT NULL DEFAULT 1,inquiry_events INTEGER NOT NULL DEFAULT 1,system_events INTEGER NOT NULL DEFAULT 1,email_enabled INTEGER NOT NULL DEFAULT 1,sms_enabled INTEGER NOT NULL DEFAULT 0,created_at TEXT NOT NULL DEFAULT(datetime('now')),updated_at TEXT,FOREIGN KEY(user_id)REFERENCES users(id)ON DELETE CASCADE);
 CREATE TABLE IF NOT EXISTS user_onboarding(user_id INTEGER PRIMARY KEY,role TEXT NOT NULL,checklist_json TEXT NOT NULL DEFAULT '{}',completed_at TEXT,created_at TEXT NOT NULL DEFAULT(datetime('now')),updated_at TEXT,FOREIGN KEY(user_id)REFERENCES users(id)ON DELETE CASCADE);
+CREATE TABLE IF NOT EXISTS dashboard_counters(owner_account TEXT PRIMARY KEY,maintenance_open INTEGER NOT NULL DEFAULT 0,maintenance_in_progress INTEGER NOT NULL DEFAULT 0,checks_pending INTEGER NOT NULL DEFAULT 0,listing_reviews INTEGER NOT NULL DEFAULT 0,payments_submitted INTEGER NOT NULL DEFAULT 0,invites_pending INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS payment_monthly(month TEXT NOT NULL,property_id TEXT NOT NULL,status TEXT NOT NULL,payments INTEGER NOT NULL DEFAULT 0,amount INTEGER NOT NULL DEFAULT 0,PRIMARY KEY(month,property_id,status));
+CREATE TABLE IF NOT EXISTS maintenance_monthly(month TEXT NOT NULL,property_id TEXT NOT NULL,opened INTEGER NOT NULL DEFAULT 0,closed INTEGER NOT NULL DEFAULT 0,PRIMARY KEY(month,property_id));
+CREATE TABLE IF NOT EXISTS maintenance_backlog(property_id TEXT PRIMARY KEY,open_count INTEGER NOT NULL DEFAULT 0,created_days_sum REAL NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS occupancy_monthly(property_id TEXT NOT NULL,month TEXT NOT NULL,units_total INTEGER NOT NULL DEFAULT 0,units_occupied INTEGER NOT NULL DEFAULT 0,PRIMARY KEY(property_id,month));
+CREATE TABLE IF NOT EXISTS rent_payer_monthly(payer_account TEXT NOT NULL,month TEXT NOT NULL,paid_amount INTEGER NOT NULL DEFAULT 0,last_paid_at TEXT,PRIMARY KEY(payer_account,month));
 CREATE INDEX IF NOT EXISTS idx_tp_invites_tenant_status ON tenant_property_invites(tenant_account,status,created_at);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_actor ON audit_logs(actor_user_id,created_at);
@@ -2263,10 +2490,23 @@ CREATE INDEX IF NOT EXISTS idx_user_onboarding_role ON user_onboarding(role,user
 CREATE INDEX IF NOT EXISTS idx_inspections_property_date ON inspections(property_id,scheduled_date,id);
 CREATE INDEX IF NOT EXISTS idx_preventive_due_status ON preventive_tasks(next_due_date,status,id);
 CREATE INDEX IF NOT EXISTS idx_roommates_tenant_status ON lease_roommates(tenant_account,status,id);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_id,is_read);
+CREATE INDEX IF NOT EXISTS idx_maintenance_tenant_status ON maintenance_requests(tenant_account,status);
+CREATE INDEX IF NOT EXISTS idx_property_checks_prop_status ON property_checks(property_id,status);
+CREATE INDEX IF NOT EXISTS idx_payments_payer_status ON payments(payer_account,status);
+CREATE INDEX IF NOT EXISTS idx_tp_invites_prop_status ON tenant_property_invites(property_id,status);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+CREATE INDEX IF NOT EXISTS idx_inquiries_status ON inquiries(status);
+CREATE INDEX IF NOT EXISTS idx_applications_created ON applications(created_at);
+CREATE INDEX IF NOT EXISTS idx_inquiries_created ON inquiries(created_at);
+CREATE INDEX IF NOT EXISTS idx_listing_requests_created ON listing_requests(created_at);
 """
 
-def db():
+_REQUEST_STATE = threading.local()
+
+def _open_db():
     # SQLite remains default; if POSTGRES_DSN is set, db.py routes to PostgreSQL.
+    # connect_db() hands out pooled connections; close() returns them to the pool.
     if connect_db is not None:
         return connect_db(DATABASE_PATH)
     c = sqlite3.connect(DATABASE_PATH, timeout=30)
@@ -2277,16 +2517,290 @@ def db():
     c.execute("PRAGMA busy_timeout=5000")
     return c
 
-def db_write_retry(fn, retries=5, delay=0.15):
+def _open_read_db():
+    if connect_db is not None:
+        return connect_db(DATABASE_PATH, readonly=True)
+    return _open_db()
+
+class _RequestConnection:
+    # Handle returned by db()/db_read() inside a request scope. Every handle
+    # shares the request's single connection (or its read-replica connection);
+    # close() only ends this handle, and when the last open handle closes,
+    # uncommitted work is discarded exactly as a plain connection close() would.
+    __slots__ = ("_scope", "_open", "_read")
+
+    def __init__(self, scope, read=False):
+        self._scope = scope
+        self._open = True
+        self._read = read
+
+    @property
+    def _conn(self):
+        return self._scope.read_conn if self._read else self._scope.conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def execute(self, sql, params=()):
+        return self._conn.execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._conn.executemany(sql, seq_of_params)
+
+    def commit(self):
+        if not self._read:
+            self._scope.check_commit(self._conn)
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self._scope.release_handle(read=self._read)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+
+class RequestAbandoned(Exception):
+    """The client was already answered with an error; the request's writes must not commit."""
+
+class RequestDBScope:
+    """One lazily-opened connection per request, committed or rolled back once at the end."""
+
+    def __init__(self):
+        self.conn = None
+        self.read_conn = None
+        self.failed = False
+        # Optional callable asked before every commit; False means the request was abandoned.
+        self.commit_guard = None
+        self.primary_only = False
+        self.method = ""
+        self.path = ""
+        self.route = ""
+        self.query_stats = start_query_stats() if QUERY_STATS_ENABLED else None
+        self.handles = 0
+        self.nav_invalidations = set()
+        self.session_invalidations = set()
+        self.session_refreshes = set()
+        self._open_handles = 0
+        self._open_read_handles = 0
+
+    def connection(self):
+        if self.conn is None:
+            self.conn = _open_db()
+        self.handles += 1
+        self._open_handles += 1
+        return _RequestConnection(self)
+
+    def read_connection(self):
+        if self.primary_only or not replicas_enabled():
+            return self.connection()
+        if self.read_conn is None:
+            self.read_conn = _open_read_db()
+        self.handles += 1
+        self._open_read_handles += 1
+        return _RequestConnection(self, read=True)
+
+    def describe(self, method, path):
+        self.method = method
+        self.path = urlparse(path or "").path
+
+    def use_primary(self):
+        # Read-your-writes: POSTs and the GETs right after them never hit a replica.
+        self.primary_only = True
+
+    def release_handle(self, read=False):
+        if read:
+            self._open_read_handles = max(0, self._open_read_handles - 1)
+            if self._open_read_handles == 0 and self.read_conn is not None:
+                self.read_conn.rollback()
+            return
+        self._open_handles = max(0, self._open_handles - 1)
+        if self._open_handles == 0 and self.conn is not None:
+            self.conn.rollback()
+
+    def mark_failed(self):
+        self.failed = True
+
+    def may_commit(self):
+        return self.commit_guard is None or self.commit_guard()
+
+    def check_commit(self, conn):
+        if not self.may_commit():
+            self.failed = True
+            conn.rollback()
+            raise RequestAbandoned("request abandoned; refusing to commit")
+
+    def finish(self):
+        if self.query_stats is not None:
+            stop_query_stats()
+            _report_query_stats(self)
+        read_conn, self.read_conn = self.read_conn, None
+        if read_conn is not None:
+            try:
+                read_conn.close()
+            except Exception:
+                pass
+        conn, self.conn = self.conn, None
+        if conn is None:
+            self.session_refreshes.clear()
+            self._flush_nav_invalidations()
+            return
+        try:
+            if self.failed or not self.may_commit():
+                conn.rollback()
+            else:
+                conn.commit()
+        except Exception:
+            log_exception("request_db_finish_failed", scope="request_db", alert_key="request_db_finish")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        finally:
+            self._flush_session_refreshes(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+            self._flush_nav_invalidations()
+
+    def _flush_session_refreshes(self, conn):
+        # Rewrite Redis sessions from the users row as it stands after commit or rollback.
+        uids, self.session_refreshes = self.session_refreshes, set()
+        for uid in uids:
+            try:
+                _rewrite_session_user(conn, uid)
+            except Exception:
+                log_exception("session_refresh_failed", scope="request_db", user_id=uid)
+                # Without a trustworthy row, drop the cached payloads; cur_user reloads them.
+                delete_user_sessions_redis(uid)
+
+    def _flush_nav_invalidations(self):
+        # After commit, so a concurrent page view cannot re-cache pre-write counts.
+        if self.nav_invalidations:
+            _drop_nav_cache_entries(self.nav_invalidations)
+        self.nav_invalidations.clear()
+        # Same for sessions: drop again after commit so a concurrent cur_user() miss cannot
+        # re-cache the pre-write user row or a session that was just deleted.
+        for raw, uid in self.session_invalidations:
+            _drop_session_cache_entries(raw, uid)
+        self.session_invalidations.clear()
+
+def _report_query_stats(scope):
+    stats = scope.query_stats
+    if stats is None or not stats.count:
+        return
+    fields = dict(method=scope.method, path=scope.path, route=scope.route, **stats.summary())
+    if stats.count > QUERY_BUDGET_COUNT or stats.total_ms > QUERY_BUDGET_MS:
+        log_event(logging.WARNING, "query_budget_exceeded", slowest=stats.slowest(), **fields)
+    repeated = stats.repeated(N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        log_event(logging.WARNING, "n_plus_one_suspected", repeated=repeated[:5], **fields)
+
+def current_request_scope():
+    return getattr(_REQUEST_STATE, "db_scope", None)
+
+@contextmanager
+def request_db_scope():
+    # Nested scopes (WSGIHandler -> do_GET) join the outermost one.
+    outer = current_request_scope()
+    if outer is not None:
+        yield outer
+        return
+    scope = RequestDBScope()
+    _REQUEST_STATE.db_scope = scope
+    try:
+        yield scope
+    except BaseException:
+        scope.mark_failed()
+        raise
+    finally:
+        _REQUEST_STATE.db_scope = None
+        scope.finish()
+
+def db():
+    scope = current_request_scope()
+    if scope is not None:
+        return scope.connection()
+    return _open_db()
+
+def db_read():
+    # Read-only work (dashboards, exports, search, listing API, menu counts).
+    # Served by a PostgreSQL replica when POSTGRES_REPLICA_DSNS is set.
+    scope = current_request_scope()
+    if scope is not None:
+        return scope.read_connection()
+    if not replicas_enabled():
+        return _open_db()
+    return _open_read_db()
+
+def read_your_writes_pending(headers):
+    return bool(get_cookie(headers.get("Cookie", ""), PRIMARY_STICKY_COOKIE))
+
+def _use_write_queue():
+    return sqlite_write_queue is not None and write_queue_enabled()
+
+def _write_in_request_transaction(scope, fn, retries, delay):
+    # fn(c) joins the request's open transaction under a savepoint: a failed
+    # attempt only undoes its own statements, and the request-end commit (or
+    # rollback) decides for the whole request.
+    c = scope.connection()
+    try:
+        for i in range(retries):
+            c.execute("SAVEPOINT atlas_write_retry")
+            try:
+                result = fn(c)
+            except Exception as e:
+                c.execute("ROLLBACK TO SAVEPOINT atlas_write_retry")
+                c.execute("RELEASE SAVEPOINT atlas_write_retry")
+                if isinstance(e, DBOperationalError) and "locked" in str(e).lower() and i < (retries - 1):
+                    time.sleep(delay * (i + 1))
+                    continue
+                raise
+            c.execute("RELEASE SAVEPOINT atlas_write_retry")
+            return result
+    finally:
+        c.close()
+
+def db_write_retry(fn, retries=5, delay=0.15, queued=True):
+    # Never commits or rolls back the request connection. Writes already pending
+    # on it hold the write lock, so fn(c) joins that transaction; otherwise, with
+    # SQLITE_WRITE_QUEUE=1, fn(c) runs on the process's single writer connection
+    # and is group-committed with concurrent writes, else it runs on its own
+    # connection and retries "database is locked" with a short linear backoff.
+    scope = current_request_scope()
+    if scope is not None and scope.conn is not None and getattr(scope.conn, "in_transaction", True):
+        return _write_in_request_transaction(scope, fn, retries, delay)
+    if queued and _use_write_queue():
+        return sqlite_write_queue(DATABASE_PATH).run(fn)
     last = None
     for i in range(retries):
-        c = db()
+        c = _open_db()
         try:
             result = fn(c)
+            if scope is not None:
+                scope.check_commit(c)
             c.commit()
             return result
         except DBOperationalError as e:
             last = e
+            try:
+                c.rollback()
+            except Exception:
+                pass
             if "locked" in str(e).lower() and i < (retries - 1):
                 time.sleep(delay * (i + 1))
                 continue
@@ -2299,8 +2813,109 @@ def db_write_retry(fn, retries=5, delay=0.15):
     if last:
         raise last
 
-def pw_hash(password,salt):
-    return hashlib.pbkdf2_hmac("sha256",password.encode(),salt,200000).hex()
+# Password hashes are PBKDF2-SHA256 hex digests. Hashes made with the original 200,000 rounds are
+# stored bare; any other cost is stored as "pbkdf2_sha256$<rounds>$<hex>" so it can be verified
+# after PASSWORD_HASH_ROUNDS changes, and is upgraded on the next successful login.
+_PW_LEGACY_ROUNDS = 200000
+_PW_PREFIX = "pbkdf2_sha256$"
+_PW_POOL = None
+_PW_POOL_LOCK = threading.Lock()
+_PW_PENDING = 0
+_PW_STATS = {"hashed": 0, "rejected": 0, "timeouts": 0, "rehashed": 0, "pool_failures": 0}
+
+class PasswordHashBusy(Exception):
+    """The password hashing pool is saturated; the request is answered with 503."""
+
+def _pw_pool():
+    global _PW_POOL
+    if _PW_POOL is None:
+        with _PW_POOL_LOCK:
+            if _PW_POOL is None:
+                methods = multiprocessing.get_all_start_methods()
+                ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _PW_POOL = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, mp_context=ctx)
+    return _PW_POOL
+
+def _pw_release(_fut=None):
+    global _PW_PENDING
+    with _PW_POOL_LOCK:
+        _PW_PENDING -= 1
+
+def _pw_pool_failed(args):
+    global _PW_POOL
+    _PW_STATS["pool_failures"] += 1
+    log_event(logging.WARNING, "password_hash_pool_broken")
+    with _PW_POOL_LOCK:
+        _PW_POOL = None
+    return hashlib.pbkdf2_hmac(*args).hex()
+
+def _pbkdf2_hex(password, salt, rounds):
+    """PBKDF2 digest, computed in the worker pool while serving a request, inline otherwise."""
+    global _PW_PENDING
+    args = ("sha256", password.encode(), bytes(salt), int(rounds))
+    if PASSWORD_HASH_WORKERS <= 0 or current_request_scope() is None:
+        return hashlib.pbkdf2_hmac(*args).hex()
+    with _PW_POOL_LOCK:
+        if _PW_PENDING >= PASSWORD_HASH_MAX_PENDING:
+            _PW_STATS["rejected"] += 1
+            raise PasswordHashBusy("password hashing queue is full")
+        _PW_PENDING += 1
+    try:
+        fut = _pw_pool().submit(hashlib.pbkdf2_hmac, *args)
+    except (RuntimeError, OSError):
+        # Shut down (interpreter exit) or broken (BrokenProcessPool is a RuntimeError).
+        _pw_release()
+        return _pw_pool_failed(args)
+    # The slot is freed when the hash really finishes, not when the caller stops waiting: a
+    # running task cannot be cancelled, so timed-out hashes still count against the bound.
+    fut.add_done_callback(_pw_release)
+    try:
+        digest = fut.result(timeout=PASSWORD_HASH_TIMEOUT_SECONDS)
+    except FuturesTimeoutError:
+        fut.cancel()
+        _PW_STATS["timeouts"] += 1
+        raise PasswordHashBusy("password hashing timed out")
+    except (RuntimeError, OSError):
+        return _pw_pool_failed(args)
+    _PW_STATS["hashed"] += 1
+    return digest.hex()
+
+def password_hash_stats():
+    return dict(_PW_STATS, pending=_PW_PENDING, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING, rounds=PASSWORD_HASH_ROUNDS)
+
+def _pw_rounds(stored):
+    v = str(stored or "")
+    if v.startswith(_PW_PREFIX):
+        return to_int(v[len(_PW_PREFIX):].split("$", 1)[0], 0)
+    return _PW_LEGACY_ROUNDS
+
+def pw_hash(password,salt,rounds=None):
+    rounds = PASSWORD_HASH_ROUNDS if rounds is None else int(rounds)
+    digest = _pbkdf2_hex(password, salt, rounds)
+    if rounds == _PW_LEGACY_ROUNDS:
+        return digest
+    return f"{_PW_PREFIX}{rounds}${digest}"
+
+def pw_verify(password, salt, stored):
+    rounds = _pw_rounds(stored)
+    if rounds <= 0:
+        return False
+    return hmac.compare_digest(pw_hash(password, salt, rounds), str(stored or ""))
+
+def pw_needs_rehash(stored):
+    return _pw_rounds(stored) != PASSWORD_HASH_ROUNDS
+
+def rehash_password_if_needed(c, user_id, password, stored):
+    """Re-hash a just-verified password at PASSWORD_HASH_ROUNDS; skipped when the pool is busy."""
+    if not pw_needs_rehash(stored):
+        return False
+    try:
+        s = secrets.token_bytes(16)
+        c.execute("UPDATE users SET password_salt=?, password_hash=? WHERE id=?", (s.hex(), pw_hash(password, s), user_id))
+    except PasswordHashBusy:
+        return False
+    _PW_STATS["rehashed"] += 1
+    return True
 
 NOTIFICATION_PREF_KEYS = (
     "payment_events",
@@ -2496,6 +3111,9 @@ def _postgres_migrations_dir():
     return candidates[-1]
 
 
+_DOLLAR_QUOTE_RE = re.compile(r"\$[A-Za-z_]*\$")
+
+
 def _split_sql_statements(sql_text):
     text = str(sql_text or "")
     out = []
@@ -2533,6 +3151,16 @@ def _split_sql_statements(sql_text):
                 i += 2
                 continue
 
+        if ch == "$" and not in_single and not in_double:
+            # Dollar-quoted body ($$ ... $$ or $tag$ ... $tag$), e.g. plpgsql functions.
+            m = _DOLLAR_QUOTE_RE.match(text, i)
+            if m:
+                end = text.find(m.group(0), m.end())
+                end = len(text) if end < 0 else end + len(m.group(0))
+                buf.append(text[i:end])
+                i = end
+                continue
+
         if ch == "'" and not in_double:
             buf.append(ch)
             if in_single and nxt == "'":
@@ -2696,6 +3324,8 @@ def ensure_db():
         migrate_sessions_security(c);c.commit();
         migrate_schema_version(c);c.commit();
         repair_foreign_keys_old_table_refs(c);c.commit();
+        migrate_dashboard_counters(c);c.commit();
+        migrate_analytics_rollups(c);c.commit();
         seed(c)
     finally:
         if pg_lock_acquired:
@@ -2714,9 +3344,10 @@ def clear_active_sessions():
     def _clear(c):
         c.execute("DELETE FROM sessions")
     db_write_retry(_clear)
-    removed = clear_redis_sessions()
-    if removed:
-        log_event(logging.INFO, "redis_sessions_cleared_on_startup", removed=removed)
+    invalidate_session_cache()
+    namespace = clear_redis_sessions()
+    if namespace:
+        log_event(logging.INFO, "redis_sessions_cleared_on_startup", namespace=namespace)
 
 
 def migrate_uploads_related_key(c):
@@ -2959,6 +3590,442 @@ def migrate_core_indexes(c):
     c.execute("CREATE INDEX IF NOT EXISTS idx_maintenance_status_created ON maintenance_requests(status,created_at,id)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_password_resets_user_expires ON password_resets(user_id,expires_at,used)")
 
+# dashboard_counters holds one row per property owner plus the global '*' row read by
+# admins. Triggers keep it current inside the writing transaction; these expressions
+# are the COUNT definitions used to seed it and to repair drift.
+DASHBOARD_COUNTER_COLUMNS = (
+    "maintenance_open",
+    "maintenance_in_progress",
+    "checks_pending",
+    "listing_reviews",
+    "payments_submitted",
+    "invites_pending",
+)
+_OWNER_LEASED_TENANTS = (
+    "SELECT l.tenant_account FROM tenant_leases l JOIN properties p ON p.id=l.property_id "
+    "WHERE l.is_active=1 AND p.owner_account={owner}"
+)
+_DASHBOARD_COUNTER_EXPRS = {
+    "global": {
+        "maintenance_open": "(SELECT COUNT(1) FROM maintenance_requests WHERE status='open')",
+        "maintenance_in_progress": "(SELECT COUNT(1) FROM maintenance_requests WHERE status='in_progress')",
+        "checks_pending": "(SELECT COUNT(1) FROM property_checks WHERE status IN('requested','scheduled'))",
+        "listing_reviews": "(SELECT COUNT(1) FROM listing_requests WHERE status='pending')",
+        "payments_submitted": "(SELECT COUNT(1) FROM payments WHERE status='submitted')",
+        "invites_pending": "(SELECT COUNT(1) FROM tenant_property_invites WHERE status='pending')",
+    },
+    "owner": {
+        # One maintenance request counts once per active lease its tenant holds with the owner.
+        "maintenance_open": (
+            "(SELECT COUNT(1) FROM maintenance_requests m "
+            "JOIN tenant_leases l ON l.tenant_account=m.tenant_account AND l.is_active=1 "
+            "JOIN properties p ON p.id=l.property_id WHERE p.owner_account={owner} AND m.status='open')"
+        ),
+        "maintenance_in_progress": (
+            "(SELECT COUNT(1) FROM maintenance_requests m "
+            "JOIN tenant_leases l ON l.tenant_account=m.tenant_account AND l.is_active=1 "
+            "JOIN properties p ON p.id=l.property_id WHERE p.owner_account={owner} AND m.status='in_progress')"
+        ),
+        "checks_pending": (
+            "(SELECT COUNT(1) FROM property_checks pc JOIN properties p ON p.id=pc.property_id "
+            "WHERE p.owner_account={owner} AND pc.status IN('requested','scheduled'))"
+        ),
+        "listing_reviews": (
+            "(SELECT COUNT(1) FROM listing_requests lr JOIN properties p ON p.id=lr.property_id "
+            "WHERE p.owner_account={owner} AND lr.status='pending')"
+        ),
+        "payments_submitted": (
+            "(SELECT COUNT(1) FROM payments WHERE status='submitted' AND payer_account IN (" + _OWNER_LEASED_TENANTS + "))"
+        ),
+        "invites_pending": (
+            "(SELECT COUNT(1) FROM tenant_property_invites i JOIN properties p ON p.id=i.property_id "
+            "WHERE p.owner_account={owner} AND i.status='pending')"
+        ),
+    },
+}
+
+# (table, counter column, pending predicate) for rows keyed by property_id.
+_PROPERTY_COUNTER_TABLES = (
+    ("property_checks", "checks_pending", "{r}.status IN('requested','scheduled')"),
+    ("listing_requests", "listing_reviews", "{r}.status='pending'"),
+    ("tenant_property_invites", "invites_pending", "{r}.status='pending'"),
+)
+
+
+def _sqlite_dashboard_counter_triggers():
+    """CREATE TRIGGER statements keeping dashboard_counters in step on SQLite.
+
+    The PostgreSQL equivalents live in migrations/postgres/019_dashboard_counters.sql.
+    """
+    owner_of = "(SELECT owner_account FROM properties WHERE id={r}.property_id)"
+    owners_of_tenant = (
+        "(SELECT p.owner_account FROM tenant_leases l JOIN properties p ON p.id=l.property_id "
+        "WHERE l.tenant_account={r}.{col} AND l.is_active=1)"
+    )
+    out = []
+
+    def _trigger(name, event, table, body, when=""):
+        out.append(
+            f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} "
+            f"{('WHEN ' + when + ' ') if when else ''}BEGIN {' '.join(body)} END"
+        )
+
+    for table, col, pred in _PROPERTY_COUNTER_TABLES:
+        def _delta(r, sign):
+            return (
+                f"UPDATE dashboard_counters SET {col}={col}{sign}1 WHERE {pred.format(r=r)} "
+                f"AND (owner_account='*' OR owner_account={owner_of.format(r=r)});"
+            )
+        _trigger(f"trg_dc_{table}_ins", "INSERT", table, [_delta("NEW", "+")])
+        _trigger(f"trg_dc_{table}_del", "DELETE", table, [_delta("OLD", "-")])
+        _trigger(f"trg_dc_{table}_upd", "UPDATE OF status,property_id", table, [_delta("OLD", "-"), _delta("NEW", "+")])
+
+    def _payment_delta(r, sign):
+        return (
+            f"UPDATE dashboard_counters SET payments_submitted=payments_submitted{sign}1 WHERE {r}.status='submitted' "
+            f"AND (owner_account='*' OR owner_account IN {owners_of_tenant.format(r=r, col='payer_account')});"
+        )
+    _trigger("trg_dc_payments_ins", "INSERT", "payments", [_payment_delta("NEW", "+")])
+    _trigger("trg_dc_payments_del", "DELETE", "payments", [_payment_delta("OLD", "-")])
+    _trigger("trg_dc_payments_upd", "UPDATE OF status,payer_account", "payments", [_payment_delta("OLD", "-"), _payment_delta("NEW", "+")])
+
+    def _maintenance_delta(r, sign):
+        weight = (
+            "(CASE WHEN owner_account='*' THEN 1 ELSE (SELECT COUNT(1) FROM tenant_leases l "
+            "JOIN properties p ON p.id=l.property_id WHERE l.tenant_account={r}.tenant_account "
+            "AND l.is_active=1 AND p.owner_account=dashboard_counters.owner_account) END)"
+        ).format(r=r)
+        return (
+            f"UPDATE dashboard_counters SET "
+            f"maintenance_open=maintenance_open{sign}(CASE WHEN {r}.status='open' THEN {weight} ELSE 0 END),"
+            f"maintenance_in_progress=maintenance_in_progress{sign}(CASE WHEN {r}.status='in_progress' THEN {weight} ELSE 0 END) "
+            f"WHERE {r}.status IN('open','in_progress') "
+            f"AND (owner_account='*' OR owner_account IN {owners_of_tenant.format(r=r, col='tenant_account')});"
+        )
+    _trigger("trg_dc_maintenance_ins", "INSERT", "maintenance_requests", [_maintenance_delta("NEW", "+")])
+    _trigger("trg_dc_maintenance_del", "DELETE", "maintenance_requests", [_maintenance_delta("OLD", "-")])
+    _trigger(
+        "trg_dc_maintenance_upd", "UPDATE OF status,tenant_account", "maintenance_requests",
+        [_maintenance_delta("OLD", "-"), _maintenance_delta("NEW", "+")],
+    )
+
+    # Lease changes move a tenant's maintenance and payments between owners: recount
+    # the lease-derived columns for the owners involved.
+    lease_cols = ("maintenance_open", "maintenance_in_progress", "payments_submitted")
+    recount = ",".join(
+        f"{col}={_DASHBOARD_COUNTER_EXPRS['owner'][col].format(owner='dashboard_counters.owner_account')}" for col in lease_cols
+    )
+
+    def _lease_recount(*refs):
+        ids = ",".join(f"{r}.property_id" for r in refs)
+        return f"UPDATE dashboard_counters SET {recount} WHERE owner_account IN (SELECT owner_account FROM properties WHERE id IN ({ids}));"
+    _trigger("trg_dc_leases_ins", "INSERT", "tenant_leases", [_lease_recount("NEW")])
+    _trigger("trg_dc_leases_del", "DELETE", "tenant_leases", [_lease_recount("OLD")])
+    _trigger("trg_dc_leases_upd", "UPDATE OF is_active,tenant_account,property_id", "tenant_leases", [_lease_recount("OLD", "NEW")])
+
+    _trigger(
+        "trg_dc_properties_ins", "INSERT", "properties",
+        ["INSERT OR IGNORE INTO dashboard_counters(owner_account) VALUES(NEW.owner_account);"],
+    )
+    return out
+
+
+def rebuild_dashboard_counters(c):
+    """Recompute every dashboard_counters row from the source tables.
+
+    Returns the number of rows whose stored values differed (drift). The caller commits.
+    """
+    before = {
+        r["owner_account"]: tuple(to_int(r[col], 0) for col in DASHBOARD_COUNTER_COLUMNS)
+        for r in c.execute("SELECT * FROM dashboard_counters").fetchall()
+    }
+    cols = ",".join(DASHBOARD_COUNTER_COLUMNS)
+    global_exprs = ",".join(_DASHBOARD_COUNTER_EXPRS["global"][col] for col in DASHBOARD_COUNTER_COLUMNS)
+    owner_exprs = ",".join(
+        _DASHBOARD_COUNTER_EXPRS["owner"][col].format(owner="o.owner_account") for col in DASHBOARD_COUNTER_COLUMNS
+    )
+    c.execute("DELETE FROM dashboard_counters")
+    c.execute(f"INSERT INTO dashboard_counters(owner_account,{cols}) SELECT '*',{global_exprs}")
+    c.execute(
+        f"INSERT INTO dashboard_counters(owner_account,{cols}) "
+        f"SELECT o.owner_account,{owner_exprs} FROM (SELECT DISTINCT owner_account FROM properties) o"
+    )
+    after = {
+        r["owner_account"]: tuple(to_int(r[col], 0) for col in DASHBOARD_COUNTER_COLUMNS)
+        for r in c.execute("SELECT * FROM dashboard_counters").fetchall()
+    }
+    zero = (0,) * len(DASHBOARD_COUNTER_COLUMNS)
+    return sum(1 for k in set(before) | set(after) if before.get(k, zero) != after.get(k, zero))
+
+
+def migrate_dashboard_counters(c):
+    for stmt in _sqlite_dashboard_counter_triggers():
+        c.execute(stmt)
+    if not c.execute("SELECT 1 FROM dashboard_counters WHERE owner_account='*'").fetchone():
+        rebuild_dashboard_counters(c)
+
+
+def dashboard_counts(owner_account=None, c=None):
+    """Counter row for one owner, or the global row when ``owner_account`` is None."""
+    key = "*" if owner_account is None else (owner_account or "").strip()
+    own = c is None
+    c = c or db_read()
+    try:
+        row = c.execute("SELECT * FROM dashboard_counters WHERE owner_account=?", (key,)).fetchone()
+    finally:
+        if own:
+            c.close()
+    return {col: (to_int(row[col], 0) if row else 0) for col in DASHBOARD_COUNTER_COLUMNS}
+
+# Monthly analytics rollups. Payments and maintenance requests are attributed to a
+# property when written (the tenant's newest active lease, '' when none) and the
+# attribution is stored on the row, so later lease changes do not move history.
+# Backlog ages are kept as sums of epoch days (julianday - 2440587.5).
+_TENANT_LEASE_PROPERTY = (
+    "COALESCE((SELECT l.property_id FROM tenant_leases l WHERE l.tenant_account={tenant} "
+    "AND l.is_active=1 ORDER BY l.id DESC LIMIT 1),'')"
+)
+_RENT_PAYER_MONTH_SQL = (
+    "SELECT {payer},{month},COALESCE(SUM(amount),0),MAX(created_at) FROM payments "
+    "WHERE payer_account={payer} AND status='paid' AND payer_role='tenant' AND payment_type='rent' "
+    "AND substr(created_at,1,7)={month}"
+)
+_RENT_PAYER_RECOUNT = (
+    "INSERT INTO rent_payer_monthly(payer_account,month,paid_amount,last_paid_at) "
+    + _RENT_PAYER_MONTH_SQL.format(payer="{r}.payer_account", month="substr({r}.created_at,1,7)") + " "
+    "ON CONFLICT(payer_account,month) DO UPDATE SET paid_amount=excluded.paid_amount,last_paid_at=excluded.last_paid_at;"
+)
+_SQLITE_ROLLUP_TRIGGERS = (
+    # payments
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_payments_ins AFTER INSERT ON payments WHEN NEW.payer_role='tenant' BEGIN "
+    "UPDATE payments SET property_id=" + _TENANT_LEASE_PROPERTY.format(tenant="NEW.payer_account") + " "
+    "WHERE id=NEW.id AND property_id IS NULL; "
+    "INSERT INTO payment_monthly(month,property_id,status,payments,amount) "
+    "VALUES(substr(NEW.created_at,1,7),(SELECT property_id FROM payments WHERE id=NEW.id),NEW.status,1,NEW.amount) "
+    "ON CONFLICT(month,property_id,status) DO UPDATE SET payments=payments+1,amount=amount+excluded.amount; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_payments_upd AFTER UPDATE OF status,amount ON payments "
+    "WHEN NEW.payer_role='tenant' AND OLD.property_id IS NOT NULL BEGIN "
+    "UPDATE payment_monthly SET payments=payments-1,amount=amount-OLD.amount "
+    "WHERE month=substr(OLD.created_at,1,7) AND property_id=OLD.property_id AND status=OLD.status; "
+    "INSERT INTO payment_monthly(month,property_id,status,payments,amount) "
+    "VALUES(substr(NEW.created_at,1,7),NEW.property_id,NEW.status,1,NEW.amount) "
+    "ON CONFLICT(month,property_id,status) DO UPDATE SET payments=payments+1,amount=amount+excluded.amount; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_payments_del AFTER DELETE ON payments "
+    "WHEN OLD.property_id IS NOT NULL BEGIN "
+    "UPDATE payment_monthly SET payments=payments-1,amount=amount-OLD.amount "
+    "WHERE month=substr(OLD.created_at,1,7) AND property_id=OLD.property_id AND status=OLD.status; END",
+    # maintenance requests
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_maintenance_ins AFTER INSERT ON maintenance_requests BEGIN "
+    "UPDATE maintenance_requests SET property_id=" + _TENANT_LEASE_PROPERTY.format(tenant="NEW.tenant_account") + ","
+    "closed_at=CASE WHEN NEW.status='closed' THEN datetime('now') END WHERE id=NEW.id AND property_id IS NULL; "
+    "INSERT INTO maintenance_monthly(month,property_id,opened,closed) "
+    "SELECT substr(NEW.created_at,1,7),m.property_id,1,0 FROM maintenance_requests m WHERE m.id=NEW.id "
+    "ON CONFLICT(month,property_id) DO UPDATE SET opened=opened+1; "
+    "INSERT INTO maintenance_monthly(month,property_id,opened,closed) "
+    "SELECT substr(m.closed_at,1,7),m.property_id,0,1 FROM maintenance_requests m WHERE m.id=NEW.id AND m.closed_at IS NOT NULL "
+    "ON CONFLICT(month,property_id) DO UPDATE SET closed=closed+1; "
+    "INSERT INTO maintenance_backlog(property_id,open_count,created_days_sum) "
+    "SELECT m.property_id,1,julianday(NEW.created_at)-2440587.5 FROM maintenance_requests m "
+    "WHERE m.id=NEW.id AND NEW.status IN('open','in_progress') "
+    "ON CONFLICT(property_id) DO UPDATE SET open_count=open_count+1,created_days_sum=created_days_sum+excluded.created_days_sum; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_maintenance_close AFTER UPDATE OF status ON maintenance_requests "
+    "WHEN OLD.status<>'closed' AND NEW.status='closed' AND OLD.property_id IS NOT NULL BEGIN "
+    "UPDATE maintenance_requests SET closed_at=datetime('now') WHERE id=NEW.id; "
+    "INSERT INTO maintenance_monthly(month,property_id,opened,closed) VALUES(strftime('%Y-%m','now'),NEW.property_id,0,1) "
+    "ON CONFLICT(month,property_id) DO UPDATE SET closed=closed+1; "
+    "UPDATE maintenance_backlog SET open_count=open_count-1,created_days_sum=created_days_sum-(julianday(OLD.created_at)-2440587.5) "
+    "WHERE property_id=OLD.property_id; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_maintenance_reopen AFTER UPDATE OF status ON maintenance_requests "
+    "WHEN OLD.status='closed' AND NEW.status<>'closed' AND OLD.property_id IS NOT NULL BEGIN "
+    "UPDATE maintenance_monthly SET closed=closed-1 WHERE month=substr(OLD.closed_at,1,7) AND property_id=OLD.property_id; "
+    "UPDATE maintenance_requests SET closed_at=NULL WHERE id=NEW.id; "
+    "INSERT INTO maintenance_backlog(property_id,open_count,created_days_sum) VALUES(NEW.property_id,1,julianday(NEW.created_at)-2440587.5) "
+    "ON CONFLICT(property_id) DO UPDATE SET open_count=open_count+1,created_days_sum=created_days_sum+excluded.created_days_sum; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_maintenance_del AFTER DELETE ON maintenance_requests "
+    "WHEN OLD.property_id IS NOT NULL BEGIN "
+    "UPDATE maintenance_monthly SET opened=opened-1 WHERE month=substr(OLD.created_at,1,7) AND property_id=OLD.property_id; "
+    "UPDATE maintenance_monthly SET closed=closed-1 WHERE OLD.closed_at IS NOT NULL "
+    "AND month=substr(OLD.closed_at,1,7) AND property_id=OLD.property_id; "
+    "UPDATE maintenance_backlog SET open_count=open_count-1,created_days_sum=created_days_sum-(julianday(OLD.created_at)-2440587.5) "
+    "WHERE OLD.status IN('open','in_progress') AND property_id=OLD.property_id; END",
+    # rent roll: paid rent per payer and month, recomputed from the payer's paid rows
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_rent_paid_ins AFTER INSERT ON payments "
+    "WHEN NEW.payer_role='tenant' AND NEW.payment_type='rent' AND NEW.status='paid' BEGIN "
+    + _RENT_PAYER_RECOUNT.format(r="NEW") + " END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_rent_paid_upd AFTER UPDATE OF status,amount,payer_account,created_at ON payments "
+    "WHEN (OLD.payer_role='tenant' AND OLD.payment_type='rent') OR (NEW.payer_role='tenant' AND NEW.payment_type='rent') BEGIN "
+    + _RENT_PAYER_RECOUNT.format(r="OLD") + " " + _RENT_PAYER_RECOUNT.format(r="NEW") + " END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_rent_paid_del AFTER DELETE ON payments "
+    "WHEN OLD.payer_role='tenant' AND OLD.payment_type='rent' AND OLD.status='paid' BEGIN "
+    + _RENT_PAYER_RECOUNT.format(r="OLD") + " END",
+    # occupancy: the current month's row for a property tracks its live unit counts
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_units_ins AFTER INSERT ON units BEGIN "
+    "INSERT INTO occupancy_monthly(property_id,month,units_total,units_occupied) "
+    "SELECT NEW.property_id,strftime('%Y-%m','now'),COUNT(1),COALESCE(SUM(CASE WHEN is_occupied=1 THEN 1 ELSE 0 END),0) "
+    "FROM units WHERE property_id=NEW.property_id "
+    "ON CONFLICT(property_id,month) DO UPDATE SET units_total=excluded.units_total,units_occupied=excluded.units_occupied; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_units_upd AFTER UPDATE OF is_occupied,property_id ON units BEGIN "
+    "INSERT INTO occupancy_monthly(property_id,month,units_total,units_occupied) "
+    "SELECT p.id,strftime('%Y-%m','now'),(SELECT COUNT(1) FROM units WHERE property_id=p.id),"
+    "(SELECT COUNT(1) FROM units WHERE property_id=p.id AND is_occupied=1) FROM properties p WHERE p.id IN(OLD.property_id,NEW.property_id) "
+    "ON CONFLICT(property_id,month) DO UPDATE SET units_total=excluded.units_total,units_occupied=excluded.units_occupied; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_rollup_units_del AFTER DELETE ON units BEGIN "
+    "INSERT INTO occupancy_monthly(property_id,month,units_total,units_occupied) "
+    "SELECT OLD.property_id,strftime('%Y-%m','now'),COUNT(1),COALESCE(SUM(CASE WHEN is_occupied=1 THEN 1 ELSE 0 END),0) "
+    "FROM units WHERE property_id=OLD.property_id "
+    "ON CONFLICT(property_id,month) DO UPDATE SET units_total=excluded.units_total,units_occupied=excluded.units_occupied; END",
+)
+
+
+def _epoch_days_sql(expr):
+    # The PostgreSQL translation of julianday() already yields epoch days.
+    if postgres_enabled():
+        return f"(EXTRACT(EPOCH FROM CAST({expr} AS timestamptz))/86400.0)"
+    return f"(julianday({expr})-2440587.5)"
+
+
+def snapshot_occupancy(c, month=None):
+    """Write this month's occupancy row for every property (idempotent)."""
+    month = month or datetime.now(timezone.utc).strftime("%Y-%m")
+    c.execute(
+        "INSERT INTO occupancy_monthly(property_id,month,units_total,units_occupied) "
+        "SELECT p.id,?,COUNT(u.id),COALESCE(SUM(CASE WHEN u.is_occupied=1 THEN 1 ELSE 0 END),0) "
+        "FROM properties p LEFT JOIN units u ON u.property_id=p.id WHERE 1=1 GROUP BY p.id "
+        "ON CONFLICT(property_id,month) DO UPDATE SET units_total=excluded.units_total,units_occupied=excluded.units_occupied",
+        (month,),
+    )
+
+
+def rebuild_analytics_rollups(c):
+    """Backfill property attribution and recompute the monthly rollups from source rows.
+
+    Rows written before attribution existed are assigned to the tenant's current lease.
+    Occupancy history cannot be reconstructed; only this month's snapshot is rewritten.
+    Returns ``{table: rows}``. The caller commits.
+    """
+    c.execute(
+        "UPDATE payments SET property_id=" + _TENANT_LEASE_PROPERTY.format(tenant="payments.payer_account") + " "
+        "WHERE property_id IS NULL AND payer_role='tenant'"
+    )
+    c.execute(
+        "UPDATE maintenance_requests SET property_id="
+        + _TENANT_LEASE_PROPERTY.format(tenant="maintenance_requests.tenant_account") + " WHERE property_id IS NULL"
+    )
+    c.execute(
+        "UPDATE maintenance_requests SET closed_at=COALESCE(updated_at,created_at) WHERE status='closed' AND closed_at IS NULL"
+    )
+    c.execute("DELETE FROM payment_monthly")
+    c.execute(
+        "INSERT INTO payment_monthly(month,property_id,status,payments,amount) "
+        "SELECT substr(created_at,1,7),property_id,status,COUNT(1),COALESCE(SUM(amount),0) FROM payments "
+        "WHERE payer_role='tenant' AND property_id IS NOT NULL GROUP BY substr(created_at,1,7),property_id,status"
+    )
+    c.execute("DELETE FROM maintenance_monthly")
+    c.execute(
+        "INSERT INTO maintenance_monthly(month,property_id,opened,closed) "
+        "SELECT month,property_id,SUM(opened),SUM(closed) FROM ("
+        "SELECT substr(created_at,1,7) AS month,property_id,1 AS opened,0 AS closed FROM maintenance_requests "
+        "UNION ALL SELECT substr(closed_at,1,7),property_id,0,1 FROM maintenance_requests WHERE closed_at IS NOT NULL"
+        ") x GROUP BY month,property_id"
+    )
+    c.execute("DELETE FROM maintenance_backlog")
+    c.execute(
+        "INSERT INTO maintenance_backlog(property_id,open_count,created_days_sum) "
+        f"SELECT property_id,COUNT(1),COALESCE(SUM({_epoch_days_sql('created_at')}),0) FROM maintenance_requests "
+        "WHERE status IN('open','in_progress') GROUP BY property_id"
+    )
+    c.execute("DELETE FROM rent_payer_monthly")
+    c.execute(
+        "INSERT INTO rent_payer_monthly(payer_account,month,paid_amount,last_paid_at) "
+        "SELECT payer_account,substr(created_at,1,7),COALESCE(SUM(amount),0),MAX(created_at) FROM payments "
+        "WHERE status='paid' AND payer_role='tenant' AND payment_type='rent' GROUP BY payer_account,substr(created_at,1,7)"
+    )
+    snapshot_occupancy(c)
+    return {
+        t: to_int(c.execute(f"SELECT COUNT(1) AS n FROM {t}").fetchone()["n"], 0)
+        for t in ("payment_monthly", "maintenance_monthly", "maintenance_backlog", "occupancy_monthly", "rent_payer_monthly")
+    }
+
+
+def migrate_analytics_rollups(c):
+    backfill = False
+    for table, col in (("payments", "property_id"), ("maintenance_requests", "property_id"), ("maintenance_requests", "closed_at")):
+        cols = [r["name"] for r in c.execute(f"PRAGMA table_info({table})").fetchall()]
+        if col not in cols:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {col} TEXT")
+            backfill = True
+    if not backfill:
+        backfill = bool(
+            c.execute("SELECT 1 FROM rent_payer_monthly LIMIT 1").fetchone() is None
+            and c.execute(
+                "SELECT 1 FROM payments WHERE status='paid' AND payer_role='tenant' AND payment_type='rent' LIMIT 1"
+            ).fetchone()
+        )
+    for stmt in _SQLITE_ROLLUP_TRIGGERS:
+        c.execute(stmt)
+    if backfill:
+        rebuild_analytics_rollups(c)
+
+
+def analytics_rollups(owner_account=None, months=(), c=None):
+    """Rollup figures for /manager/analytics, scoped to one owner or (None) everyone.
+
+    Returns paid/submitted amounts and opened/closed maintenance keyed by month, plus the
+    open-maintenance average age in days and current occupancy.
+    """
+    own = c is None
+    c = c or db_read()
+    months = [m for m in months if m]
+    marks = ",".join("?" for _ in months) or "''"
+    if owner_account is None:
+        scope_join, scope_args = "", []
+    else:
+        scope_join, scope_args = " JOIN properties p ON p.id=r.property_id AND p.owner_account=?", [owner_account]
+    out = {
+        "paid": {m: 0 for m in months},
+        "submitted": {m: 0 for m in months},
+        "maintenance_opened": {m: 0 for m in months},
+        "maintenance_closed": {m: 0 for m in months},
+        "backlog_avg_days": 0.0,
+        "units_total": 0,
+        "units_occupied": 0,
+    }
+    try:
+        for r in c.execute(
+            f"SELECT r.month,r.status,SUM(r.amount) AS amount FROM payment_monthly r{scope_join} "
+            f"WHERE r.month IN({marks}) AND r.property_id<>'' AND r.status IN('paid','submitted') GROUP BY r.month,r.status",
+            tuple(scope_args + months),
+        ).fetchall():
+            out[r["status"]][r["month"]] = to_int(r["amount"], 0)
+        for r in c.execute(
+            f"SELECT r.month,SUM(r.opened) AS opened,SUM(r.closed) AS closed FROM maintenance_monthly r{scope_join} "
+            f"WHERE r.month IN({marks}) GROUP BY r.month",
+            tuple(scope_args + months),
+        ).fetchall():
+            out["maintenance_opened"][r["month"]] = to_int(r["opened"], 0)
+            out["maintenance_closed"][r["month"]] = to_int(r["closed"], 0)
+        backlog = c.execute(
+            f"SELECT SUM(r.open_count) AS n,SUM(r.created_days_sum) AS days FROM maintenance_backlog r{scope_join}",
+            tuple(scope_args),
+        ).fetchone()
+        # Latest row per property carries its occupancy forward until units change.
+        occupancy = c.execute(
+            f"SELECT COALESCE(SUM(r.units_total),0) AS total,COALESCE(SUM(r.units_occupied),0) AS occupied "
+            f"FROM occupancy_monthly r{scope_join or ' JOIN properties p ON p.id=r.property_id'} "
+            "WHERE r.month=(SELECT MAX(o.month) FROM occupancy_monthly o WHERE o.property_id=r.property_id)",
+            tuple(scope_args),
+        ).fetchone()
+    finally:
+        if own:
+            c.close()
+    open_n = to_int(backlog["n"] if backlog else 0, 0)
+    if open_n > 0:
+        out["backlog_avg_days"] = max(0.0, time.time() / 86400.0 - float(backlog["days"] or 0.0) / open_n)
+    if occupancy:
+        out["units_total"] = to_int(occupancy["total"], 0)
+        out["units_occupied"] = to_int(occupancy["occupied"], 0)
+    return out
+
 def migrate_sessions_security(c):
     cols = [r["name"] for r in c.execute("PRAGMA table_info(sessions)").fetchall()]
     if "ip_hash" not in cols:
@@ -3194,6 +4261,7 @@ def create_notification(c, user_id, text, link=None, category="general"):
     if not notification_allowed_for_user(c, uid, cat):
         return False
     c.execute("INSERT INTO notifications(user_id,text,link)VALUES(?,?,?)",(uid,text,link))
+    invalidate_nav_cache(uid)
     pref = ensure_notification_preferences(c, uid)
     email_ok = bool(pref and to_int(pref["email_enabled"], 1))
     # Best-effort email delivery for critical notifications when SMTP is configured.
@@ -3302,15 +4370,26 @@ def pager_html(path, q, page, per, total):
 def cleanup_expired_invites(c):
     now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")
     legacy_cutoff = (datetime.now(timezone.utc) - timedelta(hours=max(1, INVITE_EXPIRY_HOURS))).isoformat(timespec="seconds")
+    expired = (
+        "{i}status='pending' AND ("
+        "({i}expires_at IS NOT NULL AND {i}expires_at<=?) OR "
+        "({i}expires_at IS NULL AND {i}created_at<=?)"
+        ")"
+    )
+    rows = c.execute(
+        "SELECT DISTINCT i.tenant_account,p.owner_account FROM tenant_property_invites i "
+        "LEFT JOIN properties p ON p.id=i.property_id WHERE " + expired.format(i="i."),
+        (now_iso, legacy_cutoff),
+    ).fetchall()
+    if not rows:
+        return
     c.execute(
         "UPDATE tenant_property_invites "
         "SET status='cancelled', responded_at=?, revoke_reason=COALESCE(NULLIF(revoke_reason,''),'expired') "
-        "WHERE status='pending' AND ("
-        "(expires_at IS NOT NULL AND expires_at<=?) OR "
-        "(expires_at IS NULL AND created_at<=?)"
-        ")",
+        "WHERE " + expired.format(i=""),
         (now_iso, now_iso, legacy_cutoff),
     )
+    invalidate_nav_accounts(*{a for r in rows for a in (r["tenant_account"], r["owner_account"])})
 
 def run_housekeeping_if_due():
     global _LAST_HOUSEKEEPING_TS, _LAST_DAILY_AUTOMATION_DATE
@@ -3324,7 +4403,7 @@ def run_housekeeping_if_due():
         _LAST_HOUSEKEEPING_TS = now2
         try:
             def _housekeep(c):
-                global _LAST_DAILY_AUTOMATION_DATE
+                global _LAST_DAILY_AUTOMATION_DATE, _LAST_OCCUPANCY_SNAPSHOT_MONTH
                 now_dt = datetime.now(timezone.utc)
                 cleanup_expired_invites(c)
                 now_iso = now_dt.isoformat(timespec="seconds")
@@ -3333,10 +4412,7 @@ def run_housekeeping_if_due():
                     (now_iso,),
                 ).fetchall()
                 c.execute("DELETE FROM sessions WHERE expires_at<=?", (now_iso,))
-                for s in expired_sessions:
-                    sid = (s["session_id"] or "").strip()
-                    if sid:
-                        delete_session_redis(sid, user_id=s["user_id"])
+                delete_sessions_redis([(s["session_id"], s["user_id"]) for s in expired_sessions])
                 reset_cutoff = (now_dt - timedelta(days=max(1, PASSWORD_RESET_RETENTION_DAYS))).strftime("%Y-%m-%d %H:%M:%S")
                 c.execute(
                     "DELETE FROM password_resets WHERE used=1 OR expires_at<=?",
@@ -3347,26 +4423,44 @@ def run_housekeeping_if_due():
                 if _LAST_DAILY_AUTOMATION_DATE != today and 7 <= now_dt.hour <= 9:
                     run_automated_rent_notifications(c)
                     _LAST_DAILY_AUTOMATION_DATE = today
-            db_write_retry(_housekeep, retries=2, delay=0.05)
+                # Record a row for every property once per month so occupancy history has no gaps.
+                month = now_dt.strftime("%Y-%m")
+                if _LAST_OCCUPANCY_SNAPSHOT_MONTH != month:
+                    snapshot_occupancy(c, month)
+                    _LAST_OCCUPANCY_SNAPSHOT_MONTH = month
+            # Housekeeping may send email; keep it off the shared writer thread.
+            db_write_retry(_housekeep, retries=2, delay=0.05, queued=False)
+            pools = pool_stats()
+            if pools:
+                log_event(logging.INFO, "db_pool_stats", pools=pools)
+            write_queues = write_queue_stats()
+            if write_queues:
+                log_event(logging.INFO, "sqlite_write_queue_stats", queues=write_queues)
+            replicas = replica_stats()
+            if replicas:
+                log_event(logging.INFO, "db_replica_stats", **replicas)
+            if postgres_enabled():
+                log_event(logging.INFO, "sql_translation_cache_stats", **sql_translation_cache_stats())
+            if NAV_CACHE_TTL_SECONDS > 0:
+                log_event(logging.INFO, "nav_cache_stats", **nav_cache_stats())
+            if SESSION_CACHE_TTL_SECONDS > 0:
+                log_event(logging.INFO, "session_cache_stats", **session_cache_stats())
+            if PASSWORD_HASH_WORKERS > 0:
+                log_event(logging.INFO, "password_hash_stats", **password_hash_stats())
             # Trim in-memory abuse-protection buckets to prevent unbounded growth.
-            with _LOGIN_GUARD_LOCK:
-                stale_login = []
-                for k, rec in _LOGIN_GUARD.items():
-                    fail_count, first_ts, lock_until = rec
-                    if (now2 - first_ts) > max(LOGIN_TRACK_SECONDS, LOGIN_LOCK_SECONDS * 2):
-                        stale_login.append(k)
-                for k in stale_login:
-                    _LOGIN_GUARD.pop(k, None)
+            _LOGIN_GUARD.expire(now2)
+            if guard_state_store() is not None:
+                try:
+                    guard_state_store().expire(now2)
+                except sqlite3.Error:
+                    log_exception("guard_state_store_failed", scope="guard_state", op="expire", alert_key="guard_state")
             with _RATE_LIMIT_LOCK:
-                stale_rl = []
-                for k, items in _RATE_LIMIT_BUCKETS.items():
-                    if not items:
-                        stale_rl.append(k)
-                        continue
-                    if (now2 - max(items)) > 3600:
-                        stale_rl.append(k)
+                # A key whose theoretical arrival time has passed has a full allowance again.
+                stale_rl = [k for k, tat in _RATE_LIMIT_BUCKETS.items() if tat <= now2]
                 for k in stale_rl:
                     _RATE_LIMIT_BUCKETS.pop(k, None)
+            if _RATE_LIMIT_STATS:
+                log_event(logging.INFO, "rate_limit_stats", rules=rate_limit_stats())
         except Exception:
             # Housekeeping should never break user requests.
             log_exception("housekeeping_failed", scope="housekeeping", alert_key="housekeeping_error")
@@ -3786,6 +4880,7 @@ def create_tenant_property_invite(c, sender_user, tenant_ident, property_id, uni
         ") VALUES(?,?,?,?,?,?,'pending',?,NULL)",
         (sender_user["id"], tenant["id"], tenant["account_number"], pid, ul, msg, invite_expires_at),
     )
+    invalidate_nav_property(c, pid, tenant["account_number"])
 
     sender_name = sender_user.get("full_name") or sender_user.get("username") or "AtlasBahamas"
     preview = f" Note: {msg}" if msg else ""
@@ -3912,6 +5007,7 @@ def create_bulk_listing_requests(c, actor_user, property_id, category, owner_acc
         created += 1
 
     if created:
+        invalidate_nav_property(c, pid)
         for r in c.execute("SELECT id FROM users WHERE role='admin'").fetchall():
             create_notification(c, r["id"], f"{created} new listing submissions: {pr['name']}", "/admin/submissions")
     return created, skipped, ""
@@ -4175,7 +5271,7 @@ def sync_ledger_from_payments(c, tenant_account=None, payment_id=None):
     if payment_id:
         sql += "AND id=? "
         args.append(int(payment_id))
-    pays = c.execute(sql + "ORDER BY id", tuple(args)).fetchall()
+    pays = c.stream(sql + "ORDER BY id", tuple(args))
     lease_cache = {}
     for p in pays:
         acct = p["payer_account"]
@@ -4363,6 +5459,7 @@ def approve_listing_request(c, req_row):
         (listing_id, req_id),
     )
     c.execute("UPDATE listing_requests SET status='approved' WHERE id=?", (req_id,))
+    invalidate_nav_property(c, req_row["property_id"])
     if req_row["submitted_by_user_id"]:
         create_notification(c, req_row["submitted_by_user_id"], f"Your listing was approved: {req_row['title']}", f"/listing/{listing_id}")
     return listing_id
@@ -4531,15 +5628,51 @@ def to_int(v, default=0):
 def esc(s):
     return(str(s)if s is not None else"").replace("&","&amp;").replace("<","&lt;").replace(">","&gt;").replace('"',"&quot;").replace("'","&#039;")
 
+# Substring pattern for `LIKE ? ESCAPE '\'`: user input matches literally, so "_" or "%" is not a wildcard.
+LIKE_ESCAPE_SQL = "ESCAPE '\\'"
+
+def like_contains(term):
+    t = str(term or "").replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{t}%"
+
 _ph=re.compile(r"\{\{([a-zA-Z0-9_]+)\}\}")
 
-def render(tpl,**ctx):
+_TEMPLATE_CACHE = {}
+
+def _template_mtimes(tpl):
+    return ((TEMPLATES_DIR/"base.html").stat().st_mtime_ns, (TEMPLATES_DIR/tpl).stat().st_mtime_ns)
+
+def _compile_template(tpl):
+    # base.html + page merged once, then split into literal segments and slot names:
+    # literals[0] slot[0] literals[1] slot[1] ... literals[-1]
     base=(TEMPLATES_DIR/"base.html").read_text(encoding="utf-8")
     content=(TEMPLATES_DIR/tpl).read_text(encoding="utf-8")
-    merged=base.replace("{{content}}",content)
+    parts=_ph.split(base.replace("{{content}}",content))
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+def compiled_template(tpl):
+    entry=_TEMPLATE_CACHE.get(tpl)
+    if entry is not None and not TEMPLATE_RELOAD:
+        return entry[1]
+    mtimes=_template_mtimes(tpl) if TEMPLATE_RELOAD else None
+    if entry is not None and entry[0]==mtimes:
+        return entry[1]
+    compiled=_compile_template(tpl)
+    _TEMPLATE_CACHE[tpl]=(mtimes, compiled)
+    return compiled
+
+def clear_template_cache():
+    _TEMPLATE_CACHE.clear()
+
+def render(tpl,**ctx):
+    literals, slots = compiled_template(tpl)
     ctx.setdefault("scripts","")
     ctx.setdefault("nav_menu","")
-    return _ph.sub(lambda m:str(ctx.get(m.group(1),"")),merged).encode("utf-8")
+    out=[literals[0]]
+    for name, lit in zip(slots, literals[1:]):
+        out.append(str(ctx.get(name,"")))
+        out.append(lit)
+    return "".join(out).encode("utf-8")
 
 
 # â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•â•
@@ -4679,7 +5812,16 @@ def same_origin_ok(headers):
             return False
     return True
 
+def add_primary_sticky_cookie(h):
+    scope = current_request_scope()
+    # POSTs only: sticky GETs also run primary_only and must not keep extending the window.
+    if scope is not None and scope.primary_only and scope.method == "POST" and replicas_enabled() and REPLICA_STICKY_SECONDS > 0:
+        # Keep the client's next GETs on the primary so they see what this POST wrote.
+        h.send_header("Set-Cookie", f"{PRIMARY_STICKY_COOKIE}=1; Max-Age={REPLICA_STICKY_SECONDS}; Path=/; HttpOnly; SameSite=Lax")
+
 def add_security_headers(h):
+    # Every response helper (HTML, JSON, CSV, redirects, static files) passes through here.
+    add_primary_sticky_cookie(h)
     if not SECURITY_HEADERS_ENABLED:
         return
     h.send_header("X-Content-Type-Options", "nosniff")
@@ -4705,119 +5847,251 @@ def add_security_headers(h):
             hsts += "; preload"
         h.send_header("Strict-Transport-Security", hsts)
 
+class LoginGuard:
+    """Failed-login records indexed by (ip, username) and by username.
+
+    Each username keeps running totals (failures, latest lock) over its records, and records
+    expire through time buckets swept a bounded batch at a time, so no call scans the whole
+    table: a credential-stuffing run can leave hundreds of thousands of keys behind. Totals may
+    still include records up to one bucket past their expiry.
+    """
+
+    BUCKET_SECONDS = 30
+    SWEEP_BATCH = 1000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = {}  # (ip, uname) -> [fail_count, first_ts, lock_until, expiry_bucket]
+        self.users = {}  # uname -> {"ips": set, "fail_total": int, "locked_until": float}
+        self.locked = set()
+        self.fail_total = 0
+        self._expiry = {}
+        self._expiry_heap = []
+        self._unlock = {}
+        self._unlock_heap = []
+
+    def _bucket(self, ts):
+        return int(ts // self.BUCKET_SECONDS)
+
+    @staticmethod
+    def _add(buckets, heap, bucket, key):
+        keys = buckets.get(bucket)
+        if keys is None:
+            keys = buckets[bucket] = set()
+            heapq.heappush(heap, bucket)
+        keys.add(key)
+
+    @staticmethod
+    def _due(buckets, heap, bucket, budget):
+        due = []
+        while heap and heap[0] < bucket and len(due) < budget:
+            b = heap[0]
+            keys = buckets.get(b)
+            while keys and len(due) < budget:
+                due.append((b, keys.pop()))
+            if not keys:
+                heapq.heappop(heap)
+                buckets.pop(b, None)
+        return due
+
+    def _sweep(self, now):
+        cur = self._bucket(now)
+        unlocked = self._due(self._unlock, self._unlock_heap, cur, self.SWEEP_BATCH)
+        for b, key in unlocked:
+            rec = self.records.get(key)
+            if rec is not None and self._bucket(rec[2]) == b:
+                self.locked.discard(key)
+        expired = self._due(self._expiry, self._expiry_heap, cur, self.SWEEP_BATCH)
+        for b, key in expired:
+            rec = self.records.get(key)
+            if rec is not None and rec[3] == b:
+                self._remove(key)
+        return len(unlocked) + len(expired)
+
+    def _remove(self, key):
+        rec = self.records.pop(key, None)
+        if rec is None:
+            return False
+        self.fail_total -= rec[0]
+        self.locked.discard(key)
+        self._expiry.get(rec[3], set()).discard(key)
+        ip, uname = key
+        user = self.users.get(uname)
+        if user is not None:
+            user["fail_total"] -= rec[0]
+            user["ips"].discard(ip)
+            if not user["ips"]:
+                self.users.pop(uname, None)
+        return True
+
+    def expire(self, now=None):
+        now = time.time() if now is None else now
+        while True:
+            with self.lock:
+                if self._sweep(now) == 0:
+                    return
+
+    def check(self, key, now):
+        with self.lock:
+            rec = self.records.get(key)
+            if not rec:
+                return False, 0
+            if rec[2] and rec[2] > now:
+                return True, int(rec[2] - now)
+            if now - rec[1] > LOGIN_TRACK_SECONDS:
+                self._remove(key)
+            return False, 0
+
+    def fail(self, key, now):
+        ip, uname = key
+        with self.lock:
+            self._sweep(now)
+            rec = self.records.get(key)
+            user = self.users.get(uname)
+            if user is None:
+                user = self.users[uname] = {"ips": set(), "fail_total": 0, "locked_until": 0.0}
+            if rec is None:
+                rec = self.records[key] = [0, now, 0.0, None]
+                user["ips"].add(ip)
+            elif now - rec[1] > LOGIN_TRACK_SECONDS:
+                self.fail_total -= rec[0]
+                user["fail_total"] -= rec[0]
+                rec[0], rec[1], rec[2] = 0, now, 0.0
+                self.locked.discard(key)
+            rec[0] += 1
+            self.fail_total += 1
+            user["fail_total"] += 1
+            if rec[0] >= LOGIN_MAX_ATTEMPTS:
+                rec[2] = now + LOGIN_LOCK_SECONDS
+                user["locked_until"] = max(user["locked_until"], rec[2])
+                self.locked.add(key)
+                self._add(self._unlock, self._unlock_heap, self._bucket(rec[2]), key)
+            bucket = self._bucket(max(rec[1] + LOGIN_TRACK_SECONDS, rec[2])) + 1
+            if bucket != rec[3]:
+                if rec[3] is not None:
+                    self._expiry.get(rec[3], set()).discard(key)
+                rec[3] = bucket
+                self._add(self._expiry, self._expiry_heap, bucket, key)
+
+    def clear(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def user_status(self, uname, now):
+        with self.lock:
+            self._sweep(now)
+            user = self.users.get(uname)
+            if user is None:
+                return (False, 0, 0)
+            wait_s = max(0, int(user["locked_until"] - now))
+            return (wait_s > 0, wait_s, user["fail_total"])
+
+    def unlock_user(self, uname, now):
+        with self.lock:
+            self._sweep(now)
+            user = self.users.get(uname)
+            if user is None:
+                return 0
+            removed = 0
+            for ip in list(user["ips"]):
+                removed += int(self._remove((ip, uname)))
+            self.users.pop(uname, None)
+            return removed
+
+    def snapshot(self, now):
+        with self.lock:
+            self._sweep(now)
+            return {"tracked": len(self.records), "locked": len(self.locked), "fail_total": self.fail_total}
+
+
+_LOGIN_GUARD = LoginGuard()
+_GUARD_STORE = None
+_GUARD_STORE_LOCK = threading.Lock()
+
+def guard_state_store():
+    """The node-shared SQLite guard store when GUARD_STATE_BACKEND=sqlite, else None."""
+    global _GUARD_STORE
+    if GUARD_STATE_BACKEND != "sqlite" or SqliteGuardStore is None:
+        return None
+    if _GUARD_STORE is None:
+        with _GUARD_STORE_LOCK:
+            if _GUARD_STORE is None:
+                _GUARD_STORE = SqliteGuardStore(GUARD_STATE_PATH, LOGIN_MAX_ATTEMPTS, LOGIN_TRACK_SECONDS, LOGIN_LOCK_SECONDS)
+    return _GUARD_STORE
+
+def _with_login_guard(name, op):
+    # The shared store falls back to this process's LoginGuard if its file cannot be used.
+    store = guard_state_store()
+    if store is not None:
+        try:
+            return op(store)
+        except sqlite3.Error:
+            log_exception("guard_state_store_failed", scope="guard_state", op=name, alert_key="guard_state")
+    return op(_LOGIN_GUARD)
+
 def _login_guard_key(ip, username):
-    return f"{ip}|{(username or '').strip().lower()}"
+    return (ip or "", (username or "").strip().lower())
 
 def login_guard_check(ip, username):
     key = _login_guard_key(ip, username)
-    now = time.time()
-    with _LOGIN_GUARD_LOCK:
-        rec = _LOGIN_GUARD.get(key)
-        if not rec:
-            return False, 0
-        fail_count, first_ts, lock_until = rec
-        if lock_until and lock_until > now:
-            return True, int(lock_until - now)
-        if now - first_ts > LOGIN_TRACK_SECONDS:
-            _LOGIN_GUARD.pop(key, None)
-            return False, 0
-        return False, 0
+    return _with_login_guard("check", lambda g: g.check(key, time.time()))
 
 def login_guard_fail(ip, username):
     key = _login_guard_key(ip, username)
-    now = time.time()
-    with _LOGIN_GUARD_LOCK:
-        fail_count, first_ts, lock_until = _LOGIN_GUARD.get(key, (0, now, 0.0))
-        if now - first_ts > LOGIN_TRACK_SECONDS:
-            fail_count, first_ts, lock_until = (0, now, 0.0)
-        fail_count += 1
-        if fail_count >= LOGIN_MAX_ATTEMPTS:
-            lock_until = now + LOGIN_LOCK_SECONDS
-        _LOGIN_GUARD[key] = (fail_count, first_ts, lock_until)
+    _with_login_guard("fail", lambda g: g.fail(key, time.time()))
 
 def login_guard_clear(ip, username):
     key = _login_guard_key(ip, username)
-    with _LOGIN_GUARD_LOCK:
-        _LOGIN_GUARD.pop(key, None)
+    _with_login_guard("clear", lambda g: g.clear(key))
 
 def login_guard_status_for_username(username):
     uname = (username or "").strip().lower()
     if not uname:
         return (False, 0, 0)
-    suffix = "|" + uname
-    now = time.time()
-    locked_until = 0.0
-    fail_total = 0
-    stale = []
-    with _LOGIN_GUARD_LOCK:
-        for key, rec in _LOGIN_GUARD.items():
-            if not key.endswith(suffix):
-                continue
-            fail_count, first_ts, lock_until = rec
-            if now - first_ts > LOGIN_TRACK_SECONDS and (not lock_until or lock_until <= now):
-                stale.append(key)
-                continue
-            fail_total += to_int(fail_count, 0)
-            if lock_until and lock_until > locked_until:
-                locked_until = lock_until
-        for key in stale:
-            _LOGIN_GUARD.pop(key, None)
-    wait_s = max(0, int(locked_until - now))
-    return (wait_s > 0, wait_s, fail_total)
+    return _with_login_guard("user_status", lambda g: g.user_status(uname, time.time()))
 
 def login_guard_unlock_username(username):
     uname = (username or "").strip().lower()
     if not uname:
         return 0
-    suffix = "|" + uname
-    removed = 0
-    with _LOGIN_GUARD_LOCK:
-        keys = [k for k in _LOGIN_GUARD.keys() if k.endswith(suffix)]
-        for k in keys:
-            if k in _LOGIN_GUARD:
-                _LOGIN_GUARD.pop(k, None)
-                removed += 1
-    return removed
+    return _with_login_guard("unlock_user", lambda g: g.unlock_user(uname, time.time()))
 
 def login_guard_snapshot():
-    now = time.time()
-    tracked = 0
-    locked = 0
-    fail_total = 0
-    stale = []
-    with _LOGIN_GUARD_LOCK:
-        for key, rec in _LOGIN_GUARD.items():
-            fail_count, first_ts, lock_until = rec
-            if now - first_ts > LOGIN_TRACK_SECONDS and (not lock_until or lock_until <= now):
-                stale.append(key)
-                continue
-            tracked += 1
-            fail_total += to_int(fail_count, 0)
-            if lock_until and lock_until > now:
-                locked += 1
-        for key in stale:
-            _LOGIN_GUARD.pop(key, None)
-    return {"tracked": tracked, "locked": locked, "fail_total": fail_total}
+    return _with_login_guard("snapshot", lambda g: g.snapshot(time.time()))
 
 def rate_limit_check(key, limit, window_seconds):
-    cli = redis_runtime_client()
-    if cli:
-        allowed, retry_after = cli.rate_limit(key, max(1, int(limit)), max(1, int(window_seconds)))
-        if not allowed:
-            return True, max(1, int(retry_after))
-        return False, 0
+    """GCRA limiter: at most `limit` requests per sliding `window_seconds`, one stored time per key."""
+    limit = max(1, int(limit))
+    window_seconds = max(1, int(window_seconds))
+    backend = redis_runtime_client() or guard_state_store()
+    if backend:
+        try:
+            allowed, retry_after = backend.rate_limit(key, limit, window_seconds)
+        except sqlite3.Error:
+            log_exception("guard_state_store_failed", scope="guard_state", op="rate_limit", alert_key="guard_state")
+        else:
+            if not allowed:
+                return True, max(1, int(retry_after))
+            return False, 0
     now = time.time()
     with _RATE_LIMIT_LOCK:
-        items = _RATE_LIMIT_BUCKETS.get(key) or []
-        items = [ts for ts in items if (now - ts) < window_seconds]
-        if len(items) >= max(1, int(limit)):
-            retry = max(1, int(window_seconds - (now - items[0])))
-            _RATE_LIMIT_BUCKETS[key] = items
-            return True, retry
-        items.append(now)
-        _RATE_LIMIT_BUCKETS[key] = items
+        # Each request pushes the key's theoretical arrival time (TAT) out by window/limit; a
+        # request is refused while that would put the TAT more than one window ahead of now.
+        tat = max(_RATE_LIMIT_BUCKETS.get(key, now), now)
+        new_tat = tat + window_seconds / limit
+        if new_tat - now > window_seconds + 1e-6:
+            return True, max(1, int(math.ceil(new_tat - now - window_seconds)))
+        _RATE_LIMIT_BUCKETS[key] = new_tat
     return False, 0
 
+def rate_limit_stats():
+    """Allowed/denied counts per RATE_LIMIT_RULES path since process start, for tuning the rules."""
+    out = {}
+    for path, counts in list(_RATE_LIMIT_STATS.items()):
+        limit, window = RATE_LIMIT_RULES.get(path, (0, 0))
+        out[path] = dict(counts, limit=limit, window_seconds=window)
+    return out
+
 def route_rate_limit(path, headers, user, form):
     rule = RATE_LIMIT_RULES.get(path)
     if not rule:
@@ -4833,7 +6107,10 @@ def route_rate_limit(path, headers, user, form):
         key = f"{path}:{user.get('account_number') or ip}"
     else:
         key = f"{path}:{ip}"
-    return rate_limit_check(key, limit, window)
+    blocked, retry = rate_limit_check(key, limit, window)
+    counts = _RATE_LIMIT_STATS.setdefault(path, {"allowed": 0, "denied": 0})
+    counts["denied" if blocked else "allowed"] += 1
+    return blocked, retry
 
 def create_session(c,uid,headers=None):
     raw=secrets.token_urlsafe(32);exp=(datetime.now(timezone.utc)+timedelta(days=SESSION_DAYS)).isoformat(timespec="seconds")
@@ -4847,7 +6124,9 @@ def create_session(c,uid,headers=None):
         # Backward compatibility if migration has not yet run.
         c.execute("INSERT INTO sessions(session_id,user_id,expires_at)VALUES(?,?,?)",(raw,uid,exp))
     c.commit()
-    cache_session_redis(raw, uid, exp, iph, uah)
+    if redis_runtime_client():
+        r = c.execute("SELECT * FROM users WHERE id=?", (uid,)).fetchone()
+        cache_session_redis(raw, uid, exp, iph, uah, _user_row_to_dict(r) if r else None)
     return sign(raw)
 
 def cur_user(headers):
@@ -4857,6 +6136,16 @@ def cur_user(headers):
         if not raw:return None
         req_ip = session_ip_hash(headers or {})
         req_ua = session_user_agent_hash(headers or {})
+        cached = _session_cache_get(raw)
+        if cached is not None:
+            if cached["ip_hash"] and not hmac.compare_digest(cached["ip_hash"], req_ip):
+                invalidate_session_raw(raw)
+                return None
+            if cached["user_agent_hash"] and not hmac.compare_digest(cached["user_agent_hash"], req_ua):
+                invalidate_session_raw(raw)
+                return None
+            return dict(cached["user"])
+        generation = _SESSION_CACHE_GENERATION
         rs = get_session_redis(raw)
         if rs:
             expected_ip = (rs.get("ip_hash") or "")
@@ -4867,13 +6156,19 @@ def cur_user(headers):
             if expected_ua and not hmac.compare_digest(expected_ua, req_ua):
                 invalidate_session_raw(raw)
                 return None
-            c=db()
-            r=c.execute("SELECT * FROM users WHERE id=?", (rs["user_id"],)).fetchone()
-            c.close()
-            if not r:
-                invalidate_session_raw(raw)
-                return None
-            return _user_row_to_dict(r)
+            user = rs["user"]
+            if user is None:
+                # Payload written before profiles were cached (or by an older build): load and restamp.
+                c=db()
+                r=c.execute("SELECT * FROM users WHERE id=?", (rs["user_id"],)).fetchone()
+                c.close()
+                if not r:
+                    invalidate_session_raw(raw)
+                    return None
+                user = _user_row_to_dict(r)
+                cache_session_redis(raw, rs["user_id"], rs["expires_at"], expected_ip, expected_ua, user)
+            _session_cache_put(raw, user, rs["expires_at"], expected_ip, expected_ua, generation)
+            return user
         c=db()
         try:
             r=c.execute(
@@ -4904,9 +6199,12 @@ def cur_user(headers):
             c.close()
             delete_session_redis(raw, user_id=r["id"])
             return None
-        cache_session_redis(raw, r["id"], (r["expires_at"] if "expires_at" in r.keys() else ""), expected_ip, expected_ua)
+        expires_at = r["expires_at"] if "expires_at" in r.keys() else ""
+        user = _user_row_to_dict(r)
+        cache_session_redis(raw, r["id"], expires_at, expected_ip, expected_ua, user)
         c.close()
-        return _user_row_to_dict(r)
+        _session_cache_put(raw, user, expires_at, expected_ip, expected_ua, generation)
+        return user
     except:return None
 
 
@@ -4949,16 +6247,52 @@ def _csv_cell(v):
         s = "\"" + s.replace("\"", "\"\"") + "\""
     return s
 
-def send_csv(h, filename, rows):
-    data = "\n".join([",".join(_csv_cell(col) for col in row) for row in rows]).encode("utf-8", "replace")
+CSV_STREAM_CHUNK_BYTES = 64 * 1024
+FILE_STREAM_CHUNK_BYTES = 64 * 1024
+
+def write_file_chunks(h, fp):
+    with open(fp, "rb") as f:
+        while True:
+            chunk = f.read(FILE_STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            h.wfile.write(chunk)
+
+def send_csv(h, filename, rows, header=None):
+    # Lists are sent with a Content-Length; any other iterable (e.g. rows from
+    # c.stream()) is written in chunks as it is consumed.
+    if isinstance(rows, (list, tuple)):
+        all_rows = ([header] if header else []) + list(rows)
+        data = "\n".join([",".join(_csv_cell(col) for col in row) for row in all_rows]).encode("utf-8", "replace")
+        h.send_response(200)
+        h.send_header("Content-Type", "text/csv; charset=utf-8")
+        h.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        h.send_header("Content-Length", str(len(data)))
+        h.send_header("Cache-Control", "no-store")
+        add_security_headers(h)
+        h.end_headers()
+        h.wfile.write(data)
+        return
     h.send_response(200)
     h.send_header("Content-Type", "text/csv; charset=utf-8")
     h.send_header("Content-Disposition", f'attachment; filename="{filename}"')
-    h.send_header("Content-Length", str(len(data)))
     h.send_header("Cache-Control", "no-store")
     add_security_headers(h)
     h.end_headers()
-    h.wfile.write(data)
+    buf = []
+    size = 0
+    sep = ""
+    for row in chain([header] if header else [], rows):
+        text = sep + ",".join(_csv_cell(col) for col in row)
+        sep = "\n"
+        buf.append(text)
+        size += len(text)
+        if size >= CSV_STREAM_CHUNK_BYTES:
+            h.wfile.write("".join(buf).encode("utf-8", "replace"))
+            buf = []
+            size = 0
+    if buf:
+        h.wfile.write("".join(buf).encode("utf-8", "replace"))
 
 def with_msg(path, msg, err=False):
     q = urlencode({"msg": str(msg), "err": "1" if err else "0"})
@@ -5024,6 +6358,36 @@ def _menu_badge(n):
     n2 = to_int(n, 0)
     return f"<span class='menu-badge'>{n2}</span>" if n2 > 0 else ""
 
+# One round trip per role. Manager and admin queue badges come from their
+# dashboard_counters row (owner account or '*'); the remaining badges are scalar
+# subselects over indexed columns.
+_MENU_COUNTS_ALERTS = "(SELECT COUNT(1) FROM notifications WHERE user_id=? AND is_read=0) AS alerts"
+_MENU_COUNTS_SHARED_QUEUES = (
+    "(SELECT COUNT(1) FROM applications WHERE status IN('submitted','under_review')) AS applications_pending,"
+    "(SELECT COUNT(1) FROM inquiries WHERE status IN('new','open')) AS inquiries_open"
+)
+_MENU_COUNTS_COUNTERS = (
+    "dc.maintenance_open+dc.maintenance_in_progress AS maintenance_open,"
+    "dc.checks_pending AS checks_pending,"
+    "dc.listing_reviews AS listing_reviews,"
+    "dc.payments_submitted AS payments_submitted,"
+)
+_MENU_COUNTS_SQL = {
+    "tenant": (
+        f"SELECT {_MENU_COUNTS_ALERTS},"
+        "(SELECT COUNT(1) FROM tenant_property_invites WHERE tenant_account=? AND status='pending') AS invites_pending"
+    ),
+    "admin": (
+        f"SELECT {_MENU_COUNTS_ALERTS},{_MENU_COUNTS_COUNTERS}{_MENU_COUNTS_SHARED_QUEUES} "
+        "FROM (SELECT 1 AS one) x LEFT JOIN dashboard_counters dc ON dc.owner_account='*'"
+    ),
+    "property_manager": (
+        f"SELECT {_MENU_COUNTS_ALERTS},{_MENU_COUNTS_COUNTERS}"
+        f"dc.invites_pending AS invites_pending,{_MENU_COUNTS_SHARED_QUEUES} "
+        "FROM (SELECT 1 AS one) x LEFT JOIN dashboard_counters dc ON dc.owner_account=?"
+    ),
+}
+
 def menu_counts_for_user(user):
     counts = {
         "alerts": 0,
@@ -5039,80 +6403,27 @@ def menu_counts_for_user(user):
     if not user:
         return counts
     role = normalize_role(user.get("role"))
-    c = db()
+    if role == "tenant":
+        sql, args = _MENU_COUNTS_SQL["tenant"], (user["id"], user["account_number"])
+    elif role == "admin":
+        sql, args = _MENU_COUNTS_SQL["admin"], (user["id"],)
+    elif role == "property_manager":
+        sql, args = _MENU_COUNTS_SQL["property_manager"], (user["id"], (user.get("account_number") or "").strip())
+    else:
+        sql, args = f"SELECT {_MENU_COUNTS_ALERTS}", (user["id"],)
+    c = db_read()
     try:
-        counts["alerts"] = to_int(
-            c.execute("SELECT COUNT(1) AS n FROM notifications WHERE user_id=? AND is_read=0", (user["id"],)).fetchone()["n"],
-            0,
-        )
-        if role == "tenant":
-            counts["invites_pending"] = to_int(
-                c.execute(
-                    "SELECT COUNT(1) AS n FROM tenant_property_invites WHERE tenant_account=? AND status='pending'",
-                    (user["account_number"],),
-                ).fetchone()["n"],
-                0,
-            )
-            return counts
-        if role in ("property_manager", "admin"):
-            if role == "admin":
-                counts["maintenance_open"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM maintenance_requests WHERE status IN('open','in_progress')"
-                ).fetchone()["n"], 0)
-                counts["checks_pending"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM property_checks WHERE status IN('requested','scheduled')"
-                ).fetchone()["n"], 0)
-                counts["listing_reviews"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM listing_requests WHERE status='pending'"
-                ).fetchone()["n"], 0)
-                counts["payments_submitted"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM payments WHERE status='submitted'"
-                ).fetchone()["n"], 0)
-            else:
-                acct = (user.get("account_number") or "").strip()
-                counts["maintenance_open"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM maintenance_requests m "
-                    "JOIN tenant_leases l ON l.tenant_account=m.tenant_account AND l.is_active=1 "
-                    "JOIN properties p ON p.id=l.property_id "
-                    "WHERE p.owner_account=? AND m.status IN('open','in_progress')",
-                    (acct,),
-                ).fetchone()["n"], 0)
-                counts["checks_pending"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM property_checks pc JOIN properties p ON p.id=pc.property_id "
-                    "WHERE p.owner_account=? AND pc.status IN('requested','scheduled')",
-                    (acct,),
-                ).fetchone()["n"], 0)
-                counts["listing_reviews"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM listing_requests lr JOIN properties p ON p.id=lr.property_id "
-                    "WHERE p.owner_account=? AND lr.status='pending'",
-                    (acct,),
-                ).fetchone()["n"], 0)
-                counts["payments_submitted"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM payments p WHERE p.status='submitted' AND EXISTS("
-                    "SELECT 1 FROM tenant_leases l JOIN properties pp ON pp.id=l.property_id "
-                    "WHERE l.tenant_account=p.payer_account AND l.is_active=1 AND pp.owner_account=?"
-                    ")",
-                    (acct,),
-                ).fetchone()["n"], 0)
-                counts["invites_pending"] = to_int(c.execute(
-                    "SELECT COUNT(1) AS n FROM tenant_property_invites i JOIN properties p ON p.id=i.property_id "
-                    "WHERE p.owner_account=? AND i.status='pending'",
-                    (acct,),
-                ).fetchone()["n"], 0)
-            counts["applications_pending"] = to_int(
-                c.execute("SELECT COUNT(1) AS n FROM applications WHERE status IN('submitted','under_review')").fetchone()["n"],
-                0,
-            )
-            counts["inquiries_open"] = to_int(
-                c.execute("SELECT COUNT(1) AS n FROM inquiries WHERE status IN('new','open')").fetchone()["n"],
-                0,
-            )
-            counts["queue_total"] = (
-                counts["maintenance_open"] + counts["payments_submitted"] + counts["checks_pending"] +
-                counts["applications_pending"] + counts["inquiries_open"] + counts["invites_pending"]
-            )
+        row = c.execute(sql, args).fetchone()
     finally:
         c.close()
+    if row is not None:
+        for key in row.keys():
+            counts[key] = to_int(row[key], 0)
+    if role in ("property_manager", "admin"):
+        counts["queue_total"] = (
+            counts["maintenance_open"] + counts["payments_submitted"] + counts["checks_pending"] +
+            counts["applications_pending"] + counts["inquiries_open"] + counts["invites_pending"]
+        )
     return counts
 
 def manager_dashboard_sections(user, current_path="/manager"):
@@ -5228,6 +6539,10 @@ def e429(h, message="Too many requests. Please wait and try again."):
     status, body = render_error(429, "Too Many Requests", message)
     send_html(h, body, status)
 
+def e503(h, message="The service is busy. Please try again in a few seconds."):
+    status, body = render_error(503, "Service Busy", message)
+    send_html(h, body, status)
+
 def normalize_role(role):
     r = (role or "").strip().lower()
     if r in ("manager", "landlord", "property_manager"):
@@ -5255,6 +6570,112 @@ def user_has_role(user, *roles):
     allowed = {normalize_role(r) for r in roles}
     return ur in allowed
 
+# Per-process LRU of badge counts and rendered nav fragments, keyed by user id.
+# Entries expire after NAV_CACHE_TTL_SECONDS. Writes that move a badge drop only the
+# entries that read it: the user (alerts), the owner accounts whose dashboard_counters
+# row changed (plus admins, who read the '*' row) or all staff (shared queues).
+_NAV_CACHE = OrderedDict()
+_NAV_CACHE_LOCK = threading.Lock()
+_NAV_CACHE_GENERATION = 0
+_NAV_CACHE_STATS = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+def _nav_cache_key(user):
+    return (normalize_role(user.get("role")), user.get("account_number") or "", user.get("full_name") or "", user.get("username") or "")
+
+def _nav_entry_matches(uid, entry, tags):
+    role, account = entry["key"][0], entry["key"][1]
+    for kind, value in tags:
+        if (kind == "user" and uid == value) or (kind == "account" and account == value) or (kind == "role" and role == value):
+            return True
+    return False
+
+def _drop_nav_cache_entries(tags):
+    global _NAV_CACHE_GENERATION
+    with _NAV_CACHE_LOCK:
+        _NAV_CACHE_GENERATION += 1
+        if all(kind == "user" for kind, _ in tags):
+            for _, uid in tags:
+                _NAV_CACHE.pop(uid, None)
+            return
+        for uid in [k for k, e in _NAV_CACHE.items() if _nav_entry_matches(k, e, tags)]:
+            _NAV_CACHE.pop(uid, None)
+
+def _invalidate_nav(tags):
+    _NAV_CACHE_STATS["invalidations"] += 1
+    _drop_nav_cache_entries(tags)
+    scope = current_request_scope()
+    if scope is not None:
+        scope.nav_invalidations.update(tags)
+
+def invalidate_nav_cache(user_id=None):
+    """Drop cached nav counts for one user, or for everyone when user_id is None."""
+    global _NAV_CACHE_GENERATION
+    if user_id is None:
+        _NAV_CACHE_STATS["invalidations"] += 1
+        with _NAV_CACHE_LOCK:
+            _NAV_CACHE_GENERATION += 1
+            _NAV_CACHE.clear()
+        return
+    _invalidate_nav({("user", to_int(user_id, 0))})
+
+def invalidate_nav_accounts(*accounts):
+    """Drop nav counts for these accounts (owner counter rows, tenant invites) and for admins."""
+    tags = {("account", (a or "").strip()) for a in accounts if (a or "").strip()}
+    tags.add(("role", "admin"))
+    _invalidate_nav(tags)
+
+def invalidate_nav_staff():
+    """Drop nav counts for every manager and admin (application and inquiry queues)."""
+    _invalidate_nav({("role", "property_manager"), ("role", "admin")})
+
+def invalidate_nav_property(c, property_id, *accounts):
+    """Drop nav counts moved by a write to a property's checks, listing requests or invites."""
+    row = c.execute("SELECT owner_account FROM properties WHERE id=?", (property_id,)).fetchone()
+    invalidate_nav_accounts(row["owner_account"] if row else "", *accounts)
+
+def invalidate_nav_tenant(c, tenant_account):
+    """Drop nav counts moved by a tenant's payments, maintenance or leases (owners of active leases)."""
+    rows = c.execute(
+        "SELECT DISTINCT p.owner_account FROM tenant_leases l JOIN properties p ON p.id=l.property_id "
+        "WHERE l.tenant_account=? AND l.is_active=1",
+        (tenant_account,),
+    ).fetchall()
+    invalidate_nav_accounts(*[r["owner_account"] for r in rows])
+
+def nav_cache_stats():
+    return dict(_NAV_CACHE_STATS, size=len(_NAV_CACHE), ttl_seconds=NAV_CACHE_TTL_SECONDS)
+
+def _nav_entry(user):
+    if NAV_CACHE_TTL_SECONDS <= 0:
+        return {"counts": menu_counts_for_user(user)}
+    uid = to_int(user.get("id"), 0)
+    key = _nav_cache_key(user)
+    now = time.monotonic()
+    with _NAV_CACHE_LOCK:
+        entry = _NAV_CACHE.get(uid)
+        if entry is not None and entry["key"] == key and entry["expires"] > now:
+            _NAV_CACHE.move_to_end(uid)
+            _NAV_CACHE_STATS["hits"] += 1
+            return entry
+        _NAV_CACHE_STATS["misses"] += 1
+        generation = _NAV_CACHE_GENERATION
+    entry = {"key": key, "expires": now + NAV_CACHE_TTL_SECONDS, "counts": menu_counts_for_user(user)}
+    with _NAV_CACHE_LOCK:
+        # An invalidation landed while the counts were being read; do not cache them.
+        if generation == _NAV_CACHE_GENERATION:
+            _NAV_CACHE[uid] = entry
+            _NAV_CACHE.move_to_end(uid)
+            while len(_NAV_CACHE) > NAV_CACHE_MAX_USERS:
+                _NAV_CACHE.popitem(last=False)
+                _NAV_CACHE_STATS["evictions"] += 1
+    return entry
+
+def nav_counts(user):
+    """Badge counts for the nav, served from the per-user cache."""
+    if not user:
+        return menu_counts_for_user(user)
+    return _nav_entry(user)["counts"]
+
 def render_page(tpl, title, user=None, path="/", **ctx):
     ctx.setdefault("nav_right", nav(user, path))
     ctx.setdefault("nav_menu", nav_menu(user, path))
@@ -5264,10 +6685,15 @@ def nav(user, path="/"):
     # Desktop top-right UI: profile dropdown when logged in; pills when logged out.
     if not user:
         return '<a class="pill" href="/register">Register</a><a class="pill" href="/login">Log in</a>'
+    entry = _nav_entry(user)
+    html = entry.get("nav_right")
+    if html is None:
+        html = entry["nav_right"] = _nav_right_html(user, entry["counts"])
+    return html
 
+def _nav_right_html(user, counts):
     role = normalize_role(user.get("role"))
     d = role_home(role)
-    counts = menu_counts_for_user(user)
     unread = to_int(counts.get("alerts"), 0)
 
     name = esc(user.get("full_name") or user.get("username") or "Account")
@@ -5364,10 +6790,15 @@ def nav_menu(user, path="/"):
             '<a class="menu-item" href="/register">Register</a>'
             '<a class="menu-item" href="/login">Log in</a>'
         )
+    entry = _nav_entry(user)
+    html = entry.get("nav_menu")
+    if html is None:
+        html = entry["nav_menu"] = _nav_menu_html(user, entry["counts"])
+    return html
 
+def _nav_menu_html(user, counts):
     role = normalize_role(user.get("role"))
     d = role_home(role)
-    counts = menu_counts_for_user(user)
     unread = to_int(counts.get("alerts"), 0)
 
     items = (
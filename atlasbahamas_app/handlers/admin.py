@@ -288,6 +288,7 @@ class AdminHandlerMixin:
                     c.close()
                     return redir(self, with_msg("/admin/users", "At least one admin account must remain.", True))
             c.execute("UPDATE users SET role=? WHERE id=?", (new_role, user_id))
+            refresh_session_user(c, user_id)
             audit_log(c, u, "user_role_updated", "users", user_id, f"{cur_role}->{new_role}")
             c.commit()
             c.close()
@@ -394,18 +395,18 @@ class AdminHandlerMixin:
             u = self._req_role(u, "admin", action="admin.audit.read")
             if not u:
                 return
-            c = db()
-            rows_db = c.execute(
-                "SELECT a.created_at, COALESCE(uu.full_name,'-') AS actor_name, COALESCE(a.actor_role,'-') AS actor_role, "
-                "a.action, COALESCE(a.entity_type,'') AS entity_type, COALESCE(a.entity_id,'') AS entity_id, COALESCE(a.details,'') AS details "
-                "FROM audit_logs a LEFT JOIN users uu ON uu.id=a.actor_user_id "
-                "ORDER BY a.created_at DESC, a.id DESC LIMIT 5000"
-            ).fetchall()
-            c.close()
-            rows = [["created_at", "actor_name", "actor_role", "action", "entity_type", "entity_id", "details"]]
-            for r in rows_db:
-                rows.append([r["created_at"], r["actor_name"], r["actor_role"], r["action"], r["entity_type"], r["entity_id"], r["details"]])
-            return send_csv(self, "atlasbahamas_audit_log.csv", rows)
+            c = db_read()
+            try:
+                rows_db = c.stream(
+                    "SELECT a.created_at, COALESCE(uu.full_name,'-') AS actor_name, COALESCE(a.actor_role,'-') AS actor_role, "
+                    "a.action, COALESCE(a.entity_type,'') AS entity_type, COALESCE(a.entity_id,'') AS entity_id, COALESCE(a.details,'') AS details "
+                    "FROM audit_logs a LEFT JOIN users uu ON uu.id=a.actor_user_id "
+                    "ORDER BY a.created_at DESC, a.id DESC LIMIT 5000"
+                )
+                rows = ([r["created_at"], r["actor_name"], r["actor_role"], r["action"], r["entity_type"], r["entity_id"], r["details"]] for r in rows_db)
+                return send_csv(self, "atlasbahamas_audit_log.csv", rows, header=["created_at", "actor_name", "actor_role", "action", "entity_type", "entity_id", "details"])
+            finally:
+                c.close()
 
         def _admin_submissions_get(self,u):
             u = self._req_role(u, "admin", action="admin.submissions.review")
@@ -540,6 +541,7 @@ class AdminHandlerMixin:
                         "approval_note=?,review_state='changes_requested',status='rejected',reviewed_at=datetime('now') WHERE id=?",
                         (cp, cpr, cd, cdoc, f"Checklist incomplete: {', '.join(missing)}", req_id),
                     )
+                    invalidate_nav_property(c, r["property_id"])
                     if r["submitted_by_user_id"]:
                         create_notification(c, r["submitted_by_user_id"], f"Listing needs changes before approval: {r['title']}", "/landlord/listing-requests")
                     audit_log(c, u, "listing_request_changes_requested", "listing_requests", req_id, f"missing={','.join(missing)}")
@@ -557,6 +559,7 @@ class AdminHandlerMixin:
                         "approval_note=?,review_state='changes_requested',status='rejected',reviewed_at=datetime('now') WHERE id=?",
                         (cp, cpr, cd, cdoc, f"Needs fixes: {', '.join(issues)}", req_id),
                     )
+                    invalidate_nav_property(c, r["property_id"])
                     if r["submitted_by_user_id"]:
                         create_notification(c, r["submitted_by_user_id"], f"Listing needs fixes: {r['title']}", "/landlord/listing-requests")
                     audit_log(c, u, "listing_request_changes_requested", "listing_requests", req_id, f"issues={','.join(issues)}")
@@ -581,6 +584,7 @@ class AdminHandlerMixin:
                 "checklist_photos=?,checklist_price=?,checklist_description=?,checklist_docs=?,reviewed_at=datetime('now') WHERE id=?",
                 (note, state, cp, cpr, cd, cdoc, req_id),
             )
+            invalidate_nav_property(c, r["property_id"])
             if r["submitted_by_user_id"]:
                 msg = "Listing update requested" if decision == "request_changes" else "Listing rejected"
                 create_notification(c, r["submitted_by_user_id"], f"{msg}: {r['title']} ({note})", "/landlord/listing-requests")
@@ -618,6 +622,7 @@ class AdminHandlerMixin:
                         "WHERE id=?",
                         (f"Needs fixes: {', '.join(issues)}",req_id),
                     )
+                    invalidate_nav_property(c, r["property_id"])
                     if r["submitted_by_user_id"]:
                         create_notification(c, r["submitted_by_user_id"], f"Listing needs fixes: {r['title']}", "/landlord/listing-requests")
                     audit_log(c, u, "listing_request_changes_requested", "listing_requests", req_id, f"issues={','.join(issues)}")
@@ -36,11 +36,11 @@ class AuthHandlerMixin:
                 c.close()
                 login_guard_fail(ip, un)
                 return send_html(self,render("login.html",title="Log in",nav_right=nav(None),nav_menu=nav_menu(None),error_box='<div class="notice err"><b>Login failed:</b> Invalid credentials.</div>'))
-            h=pw_hash(pw,_salt_bytes(r["password_salt"]))
-            if not hmac.compare_digest(h,r["password_hash"]):
+            if not pw_verify(pw,_salt_bytes(r["password_salt"]),r["password_hash"]):
                 c.close()
                 login_guard_fail(ip, un)
                 return send_html(self,render("login.html",title="Log in",nav_right=nav(None),nav_menu=nav_menu(None),error_box='<div class="notice err"><b>Login failed:</b> Invalid credentials.</div>'))
+            rehash_password_if_needed(c,r["id"],pw,r["password_hash"])
             sid=create_session(c,r["id"],self.headers);c.close()
             login_guard_clear(ip, un)
             csrf = new_csrf_token()
@@ -178,8 +178,7 @@ class AuthHandlerMixin:
                     c.close()
                     detail = "New passwords must match." if npw != npw2 else ("Password must include: " + ", ".join(errs) + ".")
                     return self._profile_get(u, f'<div class="notice err"><b>Error:</b> {esc(detail)}</div>')
-                curh = pw_hash(cur, _salt_bytes(row["password_salt"]))
-                if not hmac.compare_digest(curh, row["password_hash"]):
+                if not pw_verify(cur, _salt_bytes(row["password_salt"]), row["password_hash"]):
                     c.close()
                     return self._profile_get(u, '<div class="notice err"><b>Error:</b> Current password is incorrect.</div>')
                 s=secrets.token_bytes(16);h=pw_hash(npw,s)
@@ -187,6 +186,7 @@ class AuthHandlerMixin:
                           (fn,ph,em,s.hex(),h,u["id"]))
             else:
                 c.execute("UPDATE users SET full_name=?, phone=?, email=? WHERE id=?",(fn,ph,em,u["id"]))
+            refresh_session_user(c, u["id"])
             create_notification(c,u["id"],"Profile updated successfully.", "/profile")
             c.commit();c.close()
             return self._profile_get(u, '<div class="notice"><b>Saved.</b> Your profile has been updated.</div>')
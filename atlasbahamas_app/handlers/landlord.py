@@ -410,6 +410,7 @@ class LandlordHandlerMixin:
                     "UPDATE tenant_property_invites SET status='cancelled', responded_at=datetime('now'), revoke_reason=? WHERE id=?",
                     (revoke_reason, invite_id),
                 )
+                invalidate_nav_accounts(u["account_number"], row["tenant_account"])
                 if row["tenant_user_id"]:
                     create_notification(c, row["tenant_user_id"], f"Invite cancelled: {row['property_id']} / {row['unit_label']}", "/tenant/invites")
                 audit_log(c, u, "tenant_invite_cancelled", "tenant_property_invites", invite_id, f"{row['property_id']}/{row['unit_label']};reason={revoke_reason}")
@@ -460,6 +461,7 @@ class LandlordHandlerMixin:
                     c.execute("UPDATE tenant_leases SET is_active=0,end_date=date('now') WHERE id=?",(lease_id,))
                     c.execute("UPDATE lease_roommates SET status='removed' WHERE lease_id=? AND status='active'", (lease_id,))
                     c.execute("UPDATE units SET is_occupied=0 WHERE property_id=? AND unit_label=?",(row["property_id"],row["unit_label"]))
+                    invalidate_nav_accounts(u["account_number"])
                     tgt=c.execute("SELECT id FROM users WHERE account_number=?",(row["tenant_account"],)).fetchone()
                     if tgt:
                         create_notification(c,tgt["id"],f"Lease ended: {row['property_id']} / {row['unit_label']}", "/tenant/lease")
@@ -591,6 +593,7 @@ class LandlordHandlerMixin:
                     ),
                 )
                 new_req_id = c.execute("SELECT last_insert_rowid()").fetchone()[0]
+                invalidate_nav_accounts(u["account_number"])
                 # Carry forward photos tied to previous request.
                 c.execute(
                     "UPDATE uploads SET related_id=? WHERE related_table='listing_requests' AND related_id=? AND kind='listing_photo'",
@@ -643,6 +646,7 @@ class LandlordHandlerMixin:
                 if not unit or unit["property_id"]!=pid:c.close();return e404(self)
                 c.execute("INSERT INTO listing_requests(property_id,unit_id,title,price,location,beds,baths,category,description,status,submitted_by_user_id)VALUES(?,?,?,?,?,?,?,?,?,'pending',?)",
                           (pid,unit_id,title,price,location,beds,baths,category,description,u["id"]))
+                invalidate_nav_accounts(u["account_number"])
                 req_id=c.execute("SELECT last_insert_rowid()").fetchone()[0]
                 files=getattr(self,"_files",{}) or {}
                 photos=files.get("photos")
@@ -682,6 +686,7 @@ class LandlordHandlerMixin:
                 c=db();ok=c.execute("SELECT 1 FROM properties WHERE id=? AND owner_account=?",(pid,u["account_number"])).fetchone()
                 if not ok:c.close();return e403(self)
                 c.execute("INSERT INTO property_checks(requester_account,property_id,preferred_date,notes,status)VALUES(?,?,?,?,?)",(u["account_number"],pid,d,notes,"requested"))
+                invalidate_nav_accounts(u["account_number"])
                 for m in c.execute("SELECT id FROM users WHERE role IN ('property_manager','admin')").fetchall():
                     create_notification(c,m["id"],f"New property check request for {pid}", "/manager/checks")
                 audit_log(c, u, "property_check_requested", "property_checks", "", f"{pid};date={d}")
@@ -698,6 +703,7 @@ class LandlordHandlerMixin:
                     return e404(self)
                 if row["status"] not in ("completed","cancelled"):
                     c.execute("UPDATE property_checks SET status='cancelled' WHERE id=?",(cid,))
+                    invalidate_nav_property(c, row["property_id"])
                     audit_log(c, u, "property_check_cancelled", "property_checks", cid, row["property_id"])
                 c.commit();c.close()
                 return redir(self,"/landlord/checks")
@@ -866,24 +872,29 @@ class LandlordHandlerMixin:
             u = self._req_role(u, "landlord", action="landlord.property.manage")
             if not u:
                 return
-            c = db()
-            rows_db = c.execute(
-                "SELECT p.id,p.name,p.location,p.property_type,p.units_count,p.created_at,"
-                "COALESCE(SUM(CASE WHEN u2.is_occupied=1 THEN 1 ELSE 0 END),0) AS occupied_units "
-                "FROM properties p "
-                "LEFT JOIN units u2 ON u2.property_id=p.id "
-                "WHERE p.owner_account=? "
-                "GROUP BY p.id,p.name,p.location,p.property_type,p.units_count,p.created_at "
-                "ORDER BY p.created_at DESC,p.id DESC",
-                (u["account_number"],),
-            ).fetchall()
-            c.close()
-            rows = [["property_id", "name", "location", "property_type", "units_total", "occupied_units", "vacant_units", "created_at"]]
-            for r in rows_db:
-                total = to_int(r["units_count"], 0)
-                occ = to_int(r["occupied_units"], 0)
-                rows.append([r["id"], r["name"], r["location"], r["property_type"], total, occ, max(0, total - occ), r["created_at"]])
-            return send_csv(self, "atlasbahamas_properties.csv", rows)
+            c = db_read()
+
+            def _rows():
+                rows_db = c.stream(
+                    "SELECT p.id,p.name,p.location,p.property_type,p.units_count,p.created_at,"
+                    "COALESCE(SUM(CASE WHEN u2.is_occupied=1 THEN 1 ELSE 0 END),0) AS occupied_units "
+                    "FROM properties p "
+                    "LEFT JOIN units u2 ON u2.property_id=p.id "
+                    "WHERE p.owner_account=? "
+                    "GROUP BY p.id,p.name,p.location,p.property_type,p.units_count,p.created_at "
+                    "ORDER BY p.created_at DESC,p.id DESC",
+                    (u["account_number"],),
+                )
+                for r in rows_db:
+                    total = to_int(r["units_count"], 0)
+                    occ = to_int(r["occupied_units"], 0)
+                    yield [r["id"], r["name"], r["location"], r["property_type"], total, occ, max(0, total - occ), r["created_at"]]
+
+            try:
+                header = ["property_id", "name", "location", "property_type", "units_total", "occupied_units", "vacant_units", "created_at"]
+                return send_csv(self, "atlasbahamas_properties.csv", _rows(), header=header)
+            finally:
+                c.close()
 
         def _landlord_export_property_units(self, u, q):
             u = self._req_role(u, "landlord", action="landlord.property.manage")
@@ -892,7 +903,7 @@ class LandlordHandlerMixin:
             pid = ((q.get("property_id") or [""])[0]).strip()
             if len(pid) < 5:
                 return redir(self, with_msg("/landlord/properties", "Select a property before exporting units.", True))
-            c = db()
+            c = db_read()
             pr = c.execute("SELECT id,name FROM properties WHERE id=? AND owner_account=?", (pid, u["account_number"])).fetchone()
             if not pr:
                 c.close()
@@ -930,7 +941,7 @@ class LandlordHandlerMixin:
                 status_filter = ""
             property_filter = ((q.get("property") or [""])[0]).strip() if filtered else ""
             search = ((q.get("q") or [""])[0]).strip().lower() if filtered else ""
-            c = db()
+            c = db_read()
             sql = (
                 "SELECT r.id,r.property_id,COALESCE(p.name,'') AS property_name,COALESCE(uu.unit_label,'') AS unit_label,"
                 "r.title,r.price,r.status,r.created_at,COALESCE(r.approval_note,'') AS approval_note "
@@ -950,23 +961,26 @@ class LandlordHandlerMixin:
                 s = "%" + search + "%"
                 sql += "AND (LOWER(COALESCE(r.title,'')) LIKE ? OR LOWER(COALESCE(p.name,'')) LIKE ? OR LOWER(COALESCE(r.property_id,'')) LIKE ?) "
                 args.extend([s, s, s])
-            rows_db = c.execute(sql + "ORDER BY r.created_at DESC,r.id DESC", tuple(args)).fetchall()
-            c.close()
-            rows = [["request_id", "property_id", "property_name", "unit_label", "title", "price", "status", "submitted_at", "review_note"]]
-            for r in rows_db:
-                rows.append([
-                    r["id"],
-                    r["property_id"],
-                    r["property_name"],
-                    r["unit_label"],
-                    r["title"],
-                    to_int(r["price"], 0),
-                    r["status"],
-                    r["created_at"],
-                    r["approval_note"],
-                ])
             fname = "atlasbahamas_listing_requests_filtered.csv" if filtered else "atlasbahamas_listing_requests.csv"
-            return send_csv(self, fname, rows)
+            try:
+                rows = (
+                    [
+                        r["id"],
+                        r["property_id"],
+                        r["property_name"],
+                        r["unit_label"],
+                        r["title"],
+                        to_int(r["price"], 0),
+                        r["status"],
+                        r["created_at"],
+                        r["approval_note"],
+                    ]
+                    for r in c.stream(sql + "ORDER BY r.created_at DESC,r.id DESC", tuple(args))
+                )
+                header = ["request_id", "property_id", "property_name", "unit_label", "title", "price", "status", "submitted_at", "review_note"]
+                return send_csv(self, fname, rows, header=header)
+            finally:
+                c.close()
 
         def _landlord_export_checks(self, u):
             u = self._req_role(u, "landlord", action="landlord.portal")
@@ -989,13 +1003,12 @@ class LandlordHandlerMixin:
                 s = "%" + search + "%"
                 sql += "AND (LOWER(COALESCE(property_id,'')) LIKE ? OR LOWER(COALESCE(notes,'')) LIKE ?) "
                 args.extend([s, s])
-            c = db()
-            rows_db = c.execute(sql + "ORDER BY created_at DESC,id DESC LIMIT 5000", tuple(args)).fetchall()
-            c.close()
-            rows = [["id", "property_id", "preferred_date", "status", "notes", "created_at"]]
-            for r in rows_db:
-                rows.append([r["id"], r["property_id"], r["preferred_date"], r["status"], r["notes"], r["created_at"]])
-            return send_csv(self, "atlasbahamas_property_checks.csv", rows)
+            c = db_read()
+            try:
+                rows = ([r["id"], r["property_id"], r["preferred_date"], r["status"], r["notes"], r["created_at"]] for r in c.stream(sql + "ORDER BY created_at DESC,id DESC LIMIT 5000", tuple(args)))
+                return send_csv(self, "atlasbahamas_property_checks.csv", rows, header=["id", "property_id", "preferred_date", "status", "notes", "created_at"])
+            finally:
+                c.close()
 
 
 
@@ -73,6 +73,7 @@ class NotificationsHandlerMixin:
                 )
             c.execute("UPDATE notifications SET is_read=1 WHERE user_id=?",(u["id"],))
             c.commit();c.close()
+            invalidate_nav_cache(u["id"])
             if not items:
                 items = (
                     "<div class='alerts-empty'>"
@@ -99,6 +100,7 @@ class NotificationsHandlerMixin:
         def _notifications_readall(self, f, u):
             if not u:return send_json(self,{"ok":False},401)
             db_write_retry(lambda c: c.execute("UPDATE notifications SET is_read=1 WHERE user_id=?",(u["id"],)))
+            invalidate_nav_cache(u["id"])
             accept = (self.headers.get("Accept") or "").lower()
             xrw = (self.headers.get("X-Requested-With") or "").lower()
             if "application/json" in accept or xrw == "xmlhttprequest":
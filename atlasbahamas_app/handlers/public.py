@@ -20,15 +20,14 @@ class PublicHandlerMixin:
             ext = fp.suffix.lower()
             ct = {".png":"image/png",".jpg":"image/jpeg",".jpeg":"image/jpeg",".webp":"image/webp",".pdf":"application/pdf",".txt":"text/plain; charset=utf-8",".csv":"text/csv; charset=utf-8"}
             ctype = ct.get(ext, "application/octet-stream")
-            data = fp.read_bytes()
             self.send_response(200)
             self.send_header("Content-Type", ctype)
-            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Content-Length", str(fp.stat().st_size))
             self.send_header("X-Download-Options", "noopen")
             self.send_header("Cache-Control", "private, max-age=300")
             add_security_headers(self)
             self.end_headers()
-            self.wfile.write(data)
+            write_file_chunks(self, fp)
             return
 
         def _api_listings(self,q):
@@ -36,7 +35,7 @@ class PublicHandlerMixin:
             loc=q["location"][0]if"location"in q and q["location"][0]else None
             beds=int(q["beds"][0])if"beds"in q and q["beds"][0].isdigit()else None
             cat=q["category"][0]if"category"in q and q["category"][0]else None
-            c=db();sql="SELECT * FROM listings WHERE is_approved=1 AND is_available=1";args=[]
+            c=db_read();sql="SELECT * FROM listings WHERE is_approved=1 AND is_available=1";args=[]
             if mp is not None:sql+=" AND price<=?";args.append(mp)
             if loc:sql+=" AND location=?";args.append(loc)
             if beds is not None:sql+=" AND beds>=?";args.append(beds)
@@ -151,7 +150,7 @@ class PublicHandlerMixin:
                     ),
                 )
             s = "%" + qtxt + "%"
-            c = db()
+            c = db_read()
             try:
                 sections = []
                 if role == "tenant":
@@ -291,6 +290,7 @@ class PublicHandlerMixin:
                                              message_box='<div class="notice err"><b>Error:</b> Please complete the form.</div>',back_to_listing=(f'<a class="btn ghost" href="/listing/{lid}">Back to Listing</a>' if lid else "")))
             c=db()
             c.execute("INSERT INTO inquiries(listing_id,full_name,email,phone,subject,body)VALUES(?,?,?,?,?,?)",(lid,fn,em,ph,subj,body))
+            invalidate_nav_staff()
             c.commit()
             for m in c.execute("SELECT id FROM users WHERE role='property_manager'").fetchall():
                 create_notification(c,m["id"],f"New inquiry from {fn}", "/manager/inquiries")
@@ -312,6 +312,7 @@ class PublicHandlerMixin:
             c=db()
             c.execute("INSERT INTO applications(listing_id,applicant_user_id,full_name,email,phone,income,notes)VALUES(?,?,?,?,?,?,?)",
                       (lid, u["id"] if u else None, fn, em, ph, income, notes))
+            invalidate_nav_staff()
             c.commit()
             for m in c.execute("SELECT id FROM users WHERE role='property_manager'").fetchall():
                 create_notification(c,m["id"],f"New application: {fn}", "/manager/applications")
@@ -0,0 +1,150 @@
+"""Route declarations for the HTTP handler mixins.
+
+Handlers receive ``(handler, ctx)`` where ``ctx`` is a ``routing.RequestContext``.
+Guards (``auth``/``role``/``action``/``permission``) run in ``BaseHandlerMixin._dispatch``
+before the handler is called.
+"""
+from ..core import e404, esc, render_page, send_html
+from ..routing import AUTH_ADMIN, AUTH_LOGIN, AUTH_PROPERTY_MANAGER, RouteTable
+
+GET_ROUTES = RouteTable()
+POST_ROUTES = RouteTable()
+get = GET_ROUTES.get
+post = POST_ROUTES.post
+
+# Public + account pages
+get("/health", lambda h, r: h._health_get())
+get("/static/", lambda h, r: h._static(r.path), prefix=True)
+get("/uploads/", lambda h, r: h._uploads(r.path), prefix=True)
+get("/api/listings", lambda h, r: h._api_listings(r.query))
+get("/api/units", lambda h, r: h._api_units(r.query, r.user))
+get("/", lambda h, r: send_html(h, render_page("home.html", "AtlasBahamas", r.user, r.path)))
+get("/about", lambda h, r: send_html(h, render_page("about.html", "About AtlasBahamas", r.user, r.path)))
+get("/contact", lambda h, r: send_html(h, render_page("contact.html", "Contact AtlasBahamas", r.user, r.path)))
+get("/changelog", lambda h, r: h._changelog_get(r.user, r.path))
+get("/login", lambda h, r: h._guest_page_get(r.user, r.path, "login.html", "Log in", error_box=""))
+get("/register", lambda h, r: h._guest_page_get(r.user, r.path, "register.html", "Register", message_box=""))
+get("/forgot", lambda h, r: h._guest_page_get(r.user, r.path, "forgot_password.html", "Reset password", message_box=""))
+get("/reset", lambda h, r: h._guest_page_get(
+    r.user, r.path, "reset_password.html", "Choose new password",
+    token_value=esc((r.query.get("token") or [""])[0]), message_box="",
+))
+get("/favorites", lambda h, r: h._favorites_get(r.user), auth=AUTH_LOGIN)
+get("/messages", lambda h, r: h._messages_get(r.user), auth=AUTH_LOGIN)
+get("/notifications", lambda h, r: h._notifications_get(r.user), auth=AUTH_LOGIN)
+get("/notifications/preferences", lambda h, r: h._notifications_preferences_get(r.user), auth=AUTH_LOGIN)
+get("/onboarding", lambda h, r: h._onboarding_get(r.user), auth=AUTH_LOGIN)
+get("/profile", lambda h, r: h._profile_get(r.user), auth=AUTH_LOGIN)
+get("/search", lambda h, r: h._global_search_get(r.user, r.query), auth=AUTH_LOGIN)
+get("/compare", lambda h, r: h._compare_get(r.query, r.user))
+get("/listings", lambda h, r: h._listings_get(r.user, r.path))
+get("/listing/<int:listing_id>", lambda h, r: h._listing_detail_get(r.user, r.path, r.params["listing_id"]))
+
+# Admin
+get("/admin", lambda h, r: h._admin_get(r.user), auth=AUTH_ADMIN)
+get("/admin/submissions", lambda h, r: h._admin_submissions_get(r.user), auth=AUTH_ADMIN)
+get("/admin/permissions", lambda h, r: h._admin_permissions_get(r.user), auth=AUTH_ADMIN)
+get("/admin/audit", lambda h, r: h._admin_audit_get(r.user), auth=AUTH_ADMIN)
+get("/admin/audit/export", lambda h, r: h._admin_audit_export(r.user), auth=AUTH_ADMIN)
+get("/admin/users", lambda h, r: h._admin_users_get(r.user), auth=AUTH_ADMIN)
+
+# Property-manager shared pages and exports
+get("/landlord/export/properties", lambda h, r: h._landlord_export_properties(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/landlord/export/property_units", lambda h, r: h._landlord_export_property_units(r.user, r.query), auth=AUTH_PROPERTY_MANAGER)
+get("/landlord/export/listing_requests", lambda h, r: h._landlord_export_listing_requests(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/landlord/export/checks", lambda h, r: h._landlord_export_checks(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/landlord/export/listing_requests_filtered", lambda h, r: h._landlord_export_listing_requests(r.user, filtered=True), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/inquiries", lambda h, r: h._manager_inquiries_get(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/applications", lambda h, r: h._manager_applications_get(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/inquiries/export", lambda h, r: h._manager_inquiries_export(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/applications/export", lambda h, r: h._manager_applications_export(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/payments/export", lambda h, r: h._manager_payments_export(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/listing-requests/export", lambda h, r: h._manager_listing_requests_export(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/manager/export/properties", lambda h, r: h._manager_export_properties(r.user), auth=AUTH_PROPERTY_MANAGER)
+get("/property-manager", lambda h, r: h._property_manager_get(r.path, r.user, r.query), auth=AUTH_PROPERTY_MANAGER)
+get("/property-manager/search", lambda h, r: h._property_manager_get(r.path, r.user, r.query), auth=AUTH_PROPERTY_MANAGER)
+
+# Manager portal
+get("/manager", lambda h, r: h._manager_dashboard_get(r.path, r.user), role="manager", action="manager.portal")
+get("/manager/analytics", lambda h, r: h._manager_analytics_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.portal")
+get("/manager/queue", lambda h, r: h._manager_queue_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.portal")
+get("/manager/rent-roll", lambda h, r: h._manager_rent_roll_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.portal")
+get("/manager/properties", lambda h, r: h._manager_properties_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.property.manage")
+get("/manager/property/new", lambda h, r: h._manager_property_new_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.property.manage")
+get("/manager/leases", lambda h, r: h._manager_leases_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.leases.manage")
+get("/manager/inspections", lambda h, r: h._manager_inspections_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.ops.update")
+get("/manager/preventive", lambda h, r: h._manager_preventive_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.ops.update")
+get("/manager/batch-notify", lambda h, r: h._manager_batch_notify_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.ops.update")
+get("/manager/inspections/export", lambda h, r: h._manager_inspections_export(r.user), role="manager", action="manager.portal", permission="manager.ops.update")
+get("/manager/maintenance", lambda h, r: h._manager_maintenance_get(r.path, r.user), role="manager", action="manager.portal")
+get("/manager/checks", lambda h, r: h._manager_checks_get(r.path, r.user), role="manager", action="manager.portal")
+get("/manager/calendar", lambda h, r: h._manager_calendar_get(r.path, r.user), role="manager", action="manager.portal")
+get("/manager/payments", lambda h, r: h._manager_payments_get(r.path, r.user), role="manager", action="manager.portal")
+get("/manager/tenants", lambda h, r: h._manager_tenants_get(r.user), role="manager", action="manager.portal")
+get("/manager/listing-requests", lambda h, r: h._manager_listing_requests_get(r.path, r.user), role="manager", action="manager.portal", permission="manager.listing.submit")
+get("/manager/listings", lambda h, r: h._manager_listings_get(r.path, r.user), role="manager", action="manager.portal")
+get("/manager/listings/edit", lambda h, r: h._manager_listings_edit_get(r.path, r.user), role="manager", action="manager.portal")
+
+# Sections that still dispatch internally
+get("/tenant", lambda h, r: h._tenant_get(r.path, r.user), prefix=True)
+get("/landlord", lambda h, r: h._landlord_get(r.path, r.user), prefix=True)
+get("/manager", lambda h, r: e404(h), prefix=True, role="manager", action="manager.portal")
+get("/property-manager", lambda h, r: h._property_manager_get(r.path, r.user, r.query), prefix=True)
+
+
+post("/login", lambda h, r: h._login(r.form, r.user))
+post("/register", lambda h, r: h._register(r.form, r.user))
+post("/logout", lambda h, r: h._logout(r.user))
+post("/forgot", lambda h, r: h._forgot(r.form, r.user))
+post("/reset", lambda h, r: h._reset(r.form, r.user))
+post("/profile/update", lambda h, r: h._profile_update(r.form, r.user))
+post("/messages/new", lambda h, r: h._messages_new(r.form, r.user), auth=AUTH_LOGIN)
+post("/messages/send", lambda h, r: h._messages_send(r.form, r.user), auth=AUTH_LOGIN)
+post("/favorite", lambda h, r: h._favorite_toggle(r.form, r.user))
+post("/inquiry", lambda h, r: h._inquiry_submit(r.form, r.user))
+post("/apply", lambda h, r: h._application_submit(r.form, r.user))
+post("/search/save", lambda h, r: h._save_search(r.form, r.user))
+post("/notifications/readall", lambda h, r: h._notifications_readall(r.form, r.user))
+post("/notifications/preferences", lambda h, r: h._notifications_preferences_post(r.form, r.user))
+post("/onboarding/step", lambda h, r: h._onboarding_step_post(r.form, r.user))
+
+post("/admin/submissions/approve", lambda h, r: h._admin_submissions_approve(r.user, r.form), auth=AUTH_ADMIN)
+post("/admin/submissions/review", lambda h, r: h._admin_submissions_review(r.user, r.form), auth=AUTH_ADMIN)
+post("/admin/submissions/reject", lambda h, r: h._admin_submissions_reject(r.user, r.form), auth=AUTH_ADMIN)
+post("/admin/submissions/approve_all", lambda h, r: h._admin_submissions_approve_all(r.user, r.form), auth=AUTH_ADMIN)
+post("/admin/permissions/update", lambda h, r: h._admin_permissions_update(r.user, r.form), auth=AUTH_ADMIN)
+post("/admin/users/role", lambda h, r: h._admin_users_role_update(r.user, r.form), auth=AUTH_ADMIN)
+post("/admin/users/unlock", lambda h, r: h._admin_users_unlock(r.user, r.form), auth=AUTH_ADMIN)
+
+post("/manager/inquiries/update", lambda h, r: h._manager_inquiries_update(r.form, r.user))
+post("/manager/applications/update", lambda h, r: h._manager_applications_update(r.form, r.user))
+post("/manager/queue/action", lambda h, r: h._manager_queue_action_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/staff/new", lambda h, r: h._manager_staff_new_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/maintenance/thread", lambda h, r: h._manager_maintenance_thread_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/roommates/add", lambda h, r: h._manager_roommates_add_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.leases.manage")
+post("/manager/roommates/remove", lambda h, r: h._manager_roommates_remove_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.leases.manage")
+post("/manager/inspections/new", lambda h, r: h._manager_inspections_new_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/inspections/update", lambda h, r: h._manager_inspections_update_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/preventive/new", lambda h, r: h._manager_preventive_new_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/preventive/update", lambda h, r: h._manager_preventive_update_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/batch-notify", lambda h, r: h._manager_batch_notify_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/tenant/invite", lambda h, r: h._manager_tenant_invite(r.form, r.user), role="manager", action="manager.portal", permission="manager.tenant_sync.manage")
+post("/manager/tenant/invite/cancel", lambda h, r: h._manager_tenant_invite_cancel_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.tenant_sync.manage")
+post("/manager/tenant/invite/resend", lambda h, r: h._manager_tenant_invite_resend_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.tenant_sync.manage")
+post("/manager/property/new", lambda h, r: h._manager_property_new_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.property.manage")
+post("/manager/listing/submit_all", lambda h, r: h._manager_listing_submit_all_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.listing.submit")
+post("/manager/leases", lambda h, r: h._manager_leases_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.leases.manage")
+post("/manager/leases/end", lambda h, r: h._manager_leases_end_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.leases.manage")
+post("/manager/maintenance/update", lambda h, r: h._manager_maintenance_update_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/checks/update", lambda h, r: h._manager_checks_update_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/payments/update", lambda h, r: h._manager_payments_update_post(r.user, r.form), role="manager", action="manager.portal", permission="manager.ops.update")
+post("/manager/listings/action", lambda h, r: h._manager_listings_action_post(r.user, r.form), role="manager", action="manager.portal")
+post("/manager/listings/edit", lambda h, r: h._manager_listings_edit_post(r.user, r.form), role="manager", action="manager.portal")
+post("/manager/listings/photos", lambda h, r: h._manager_listings_photos_post(r.user, r.form), role="manager", action="manager.portal")
+post("/manager/listings/thumbnail", lambda h, r: h._manager_listings_thumbnail_post(r.user, r.form), role="manager", action="manager.portal")
+post("/manager/listings/photo_delete", lambda h, r: h._manager_listings_photo_delete_post(r.user, r.form), role="manager", action="manager.portal")
+
+post("/tenant", lambda h, r: h._tenant_post(r.path, r.user, r.form), prefix=True)
+post("/landlord", lambda h, r: h._landlord_post(r.path, r.user, r.form), prefix=True)
+post("/manager", lambda h, r: e404(h), prefix=True, role="manager", action="manager.portal")
+post("/property-manager", lambda h, r: h._property_manager_post(r.path, r.user, r.form), prefix=True)
@@ -742,6 +742,7 @@ class TenantHandlerMixin:
                         return handle_user_error(self, "Saved payment method was not found.", "/tenant/pay-rent")
                     provider = "Saved Method - " + format_payment_method_label(pm)
                 c.execute("INSERT INTO payments(payer_account,payer_role,payment_type,provider,amount,status)VALUES(?,?,?,?,?,?)",(u["account_number"],"tenant","rent",provider,amt,"submitted"))
+                invalidate_nav_tenant(c, u["account_number"])
                 pay_id = c.execute("SELECT last_insert_rowid()").fetchone()[0]
                 sync_ledger_from_payments(c, payment_id=pay_id)
                 reconcile_tenant_ledger(c, u["account_number"])
@@ -782,6 +783,7 @@ class TenantHandlerMixin:
                 if prov in("Cable Bahamas","Aliv","BTC","BPL")and amt>0:
                     c=db()
                     c.execute("INSERT INTO payments(payer_account,payer_role,payment_type,provider,amount,status)VALUES(?,?,?,?,?,?)",(u["account_number"],"tenant","bill",prov,amt,"submitted"))
+                    invalidate_nav_tenant(c, u["account_number"])
                     pay_id = c.execute("SELECT last_insert_rowid()").fetchone()[0]
                     sync_ledger_from_payments(c, payment_id=pay_id)
                     audit_log(c,u,"tenant_bill_submitted","payments",pay_id,f"provider={prov};amount={amt}")
@@ -909,6 +911,7 @@ class TenantHandlerMixin:
                     "INSERT INTO maintenance_requests(tenant_account,tenant_name,description,status,urgency)VALUES(?,?,?,?,?)",
                     (u["account_number"],u["full_name"],desc,"open",urgency),
                 )
+                invalidate_nav_tenant(c, u["account_number"])
                 mid=to_int(c.execute("SELECT last_insert_rowid()").fetchone()[0], 0)
                 up=getattr(self,"_files",{}).get("photo")
                 if up and up.get("content"):
@@ -1115,6 +1118,7 @@ class TenantHandlerMixin:
                     "UPDATE tenant_property_invites SET status='cancelled', responded_at=datetime('now'), revoke_reason='expired' WHERE id=?",
                     (iid,),
                 )
+                invalidate_nav_property(c, inv["property_id"], u["account_number"])
                 c.commit()
                 c.close()
                 return redir(self, with_msg("/tenant/invites", "Invite expired. Ask for a new invite.", True))
@@ -1128,6 +1132,7 @@ class TenantHandlerMixin:
                     "UPDATE tenant_property_invites SET status='declined', responded_at=datetime('now'), revoke_reason='declined_by_tenant' WHERE id=?",
                     (iid,),
                 )
+                invalidate_nav_property(c, pid, u["account_number"])
                 if sender_id:
                     create_notification(c, sender_id, f"Tenant declined invite: {pid} / {ul}", "/notifications")
                 audit_log(c, u, "tenant_invite_declined", "tenant_property_invites", iid, f"{pid}/{ul}")
@@ -1150,6 +1155,7 @@ class TenantHandlerMixin:
                     "UPDATE tenant_property_invites SET status='cancelled', responded_at=datetime('now'), revoke_reason='unavailable' WHERE id=?",
                     (iid,),
                 )
+                invalidate_nav_property(c, pid, u["account_number"])
                 if sender_id:
                     create_notification(c, sender_id, f"Invite expired/unavailable: {pid} / {ul}", "/notifications")
                 audit_log(c, u, "tenant_invite_unavailable", "tenant_property_invites", iid, f"{pid}/{ul}")
@@ -1162,6 +1168,14 @@ class TenantHandlerMixin:
                 (u["account_number"],),
             ).fetchone()
             already_linked = bool(current and current["property_id"] == pid and current["unit_label"] == ul)
+            # Accepting cancels the tenant's other invites and other tenants' invites for this unit.
+            superseded = c.execute(
+                "SELECT DISTINCT i.tenant_account,p.owner_account FROM tenant_property_invites i "
+                "LEFT JOIN properties p ON p.id=i.property_id WHERE i.status='pending' AND i.id<>? "
+                "AND (i.tenant_account=? OR (i.property_id=? AND i.unit_label=?))",
+                (iid, u["account_number"], pid, ul),
+            ).fetchall()
+            invalidate_nav_tenant(c, u["account_number"])
             if not already_linked:
                 prev = c.execute(
                     "SELECT property_id,unit_label FROM tenant_leases WHERE tenant_account=? AND is_active=1",
@@ -1195,6 +1209,9 @@ class TenantHandlerMixin:
                 "WHERE property_id=? AND unit_label=? AND status='pending' AND id<>?",
                 (pid, ul, iid),
             )
+            invalidate_nav_property(
+                c, pid, u["account_number"], *[a for r in superseded for a in (r["tenant_account"], r["owner_account"])]
+            )
             if sender_id:
                 create_notification(c, sender_id, f"Tenant accepted invite: {pid} / {ul}", "/notifications")
             audit_log(c, u, "tenant_invite_accepted", "tenant_property_invites", iid, f"{pid}/{ul}")
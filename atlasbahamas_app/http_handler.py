@@ -1,4 +1,4 @@
-"""Composed HTTP handler built from modular mixins."""
+"""Composed HTTP handlers built from modular mixins."""
 from http.server import BaseHTTPRequestHandler
 
 from .handlers import (
@@ -13,9 +13,9 @@ from .handlers import (
     AdminHandlerMixin,
     PropertyManagerHandlerMixin,
 )
+from .http_io import NativeIOMixin
 
-
-class H(
+HANDLER_MIXINS = (
     BaseHandlerMixin,
     AuthHandlerMixin,
     PublicHandlerMixin,
@@ -26,9 +26,14 @@ class H(
     ManagerHandlerMixin,
     AdminHandlerMixin,
     PropertyManagerHandlerMixin,
-    BaseHTTPRequestHandler,
-):
+)
+
+
+class H(*HANDLER_MIXINS, BaseHTTPRequestHandler):
     """Main request handler assembled from modular mixins."""
     server_version = "AtlasBahamas/1.0"
 
 
+class NativeHandler(NativeIOMixin, *HANDLER_MIXINS):
+    """Same mixins over http_io Request/Response objects (WSGI/ASGI adapters)."""
+    server_version = "AtlasBahamas/1.0"
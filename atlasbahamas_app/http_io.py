@@ -0,0 +1,224 @@
+"""Request/response objects the handler mixins run against under WSGI and ASGI.
+
+``NativeIOMixin`` supplies the small slice of the ``BaseHTTPRequestHandler``
+interface the mixins use (``path``, ``command``, ``headers``, ``rfile``,
+``wfile``, ``send_response``/``send_header``/``end_headers``) on top of a
+``Request`` and a ``Response``, so the adapters no longer fake a socket handler.
+"""
+from __future__ import annotations
+
+from http import HTTPStatus
+from io import BytesIO
+
+from .core import request_db_scope
+
+_PHRASES = {s.value: s.phrase for s in HTTPStatus}
+
+
+def status_phrase(code: int, fallback: str = "OK") -> str:
+    return _PHRASES.get(int(code), fallback)
+
+
+class Headers:
+    """Case-insensitive request headers keyed by lower-case name."""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store=None):
+        self._store = store if store is not None else {}
+
+    def add(self, name, value):
+        k = str(name or "").strip().lower()
+        if k:
+            self._store[k] = str(value or "")
+
+    def get(self, name, default=None):
+        return self._store.get(str(name or "").lower(), default)
+
+    @classmethod
+    def from_environ(cls, environ):
+        store = {}
+        for k, v in environ.items():
+            if k.startswith("HTTP_"):
+                store[k[5:].replace("_", "-").lower()] = v
+        h = cls(store)
+        if environ.get("CONTENT_TYPE"):
+            store["content-type"] = environ["CONTENT_TYPE"]
+        if environ.get("CONTENT_LENGTH"):
+            store["content-length"] = environ["CONTENT_LENGTH"]
+        if not store.get("host") and environ.get("SERVER_NAME") and environ.get("SERVER_PORT"):
+            store["host"] = f"{environ['SERVER_NAME']}:{environ['SERVER_PORT']}"
+        return h
+
+    @classmethod
+    def from_asgi(cls, raw_headers, server=None):
+        store = {}
+        for k, v in raw_headers:
+            name = k.decode("latin-1").lower()
+            value = v.decode("latin-1")
+            if name in store:
+                value = store[name] + ("; " if name == "cookie" else ", ") + value
+            store[name] = value
+        if not store.get("host") and server:
+            store["host"] = f"{server[0]}:{server[1]}"
+        return cls(store)
+
+
+class Request:
+    __slots__ = ("method", "path", "headers", "body", "client_address", "version")
+
+    def __init__(self, method, path, headers, body=b"", client_address=("0.0.0.0", 0), version="HTTP/1.1"):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.client_address = client_address
+        self.version = version
+
+    @classmethod
+    def from_environ(cls, environ):
+        method = (environ.get("REQUEST_METHOD") or "GET").upper()
+        path = environ.get("PATH_INFO") or "/"
+        qs = environ.get("QUERY_STRING") or ""
+        body = b""
+        try:
+            ln = int((environ.get("CONTENT_LENGTH") or "0").strip() or "0")
+            if ln > 0:
+                body = environ["wsgi.input"].read(ln)
+        except Exception:
+            body = b""
+        headers = Headers.from_environ(environ)
+        if environ.get("REMOTE_ADDR"):
+            headers.add("X-Real-Ip", environ["REMOTE_ADDR"])
+        if environ.get("wsgi.url_scheme"):
+            headers.add("X-Forwarded-Proto", environ["wsgi.url_scheme"])
+        return cls(
+            method,
+            f"{path}?{qs}" if qs else path,
+            headers,
+            body,
+            (environ.get("REMOTE_ADDR", "0.0.0.0"), int(environ.get("REMOTE_PORT") or 0)),
+            environ.get("SERVER_PROTOCOL", "HTTP/1.1"),
+        )
+
+    @classmethod
+    def from_asgi(cls, scope, body):
+        path = scope.get("path") or "/"
+        qs = (scope.get("query_string") or b"").decode("latin-1")
+        headers = Headers.from_asgi(scope.get("headers") or (), scope.get("server"))
+        client = scope.get("client") or ("0.0.0.0", 0)
+        headers.add("X-Real-Ip", client[0])
+        headers.add("X-Forwarded-Proto", scope.get("scheme") or "http")
+        return cls(
+            (scope.get("method") or "GET").upper(),
+            f"{path}?{qs}" if qs else path,
+            headers,
+            body,
+            (client[0], int(client[1] or 0)),
+            f"HTTP/{scope.get('http_version') or '1.1'}",
+        )
+
+
+class Response:
+    """Status, headers and body sink; buffers until ``stream_to()`` redirects writes."""
+
+    __slots__ = ("code", "phrase", "headers", "streaming", "_buf", "_sink")
+
+    def __init__(self):
+        self.code = 200
+        self.phrase = "OK"
+        self.headers = []
+        self.streaming = False
+        self._buf = BytesIO()
+        self._sink = None
+
+    @property
+    def status_line(self):
+        return f"{self.code} {self.phrase}"
+
+    def content_length(self):
+        for k, v in reversed(self.headers):
+            if k.lower() == "content-length":
+                try:
+                    return int(v)
+                except ValueError:
+                    return None
+        return None
+
+    def should_stream(self, buffer_max):
+        length = self.content_length()
+        return length is None or length > buffer_max
+
+    def write(self, data):
+        if not data:
+            return
+        if isinstance(data, str):
+            data = data.encode("utf-8", "replace")
+        if self._sink is not None:
+            self._sink(bytes(data))
+        else:
+            self._buf.write(data)
+
+    def flush(self):
+        return
+
+    def stream_to(self, sink):
+        self.streaming = True
+        pending = self._buf.getvalue()
+        self._buf = BytesIO()
+        self._sink = sink
+        if pending:
+            sink(pending)
+
+    def body(self):
+        return self._buf.getvalue()
+
+    def buffered_headers(self):
+        if self.content_length() is None:
+            return self.headers + [("Content-Length", str(len(self._buf.getbuffer())))]
+        return self.headers
+
+
+class NativeIOMixin:
+    """The ``BaseHTTPRequestHandler`` surface used by the mixins, over Request/Response."""
+
+    def __init__(self, request, response, on_headers=None):
+        self.request = request
+        self.response = response
+        self.command = request.method
+        self.path = request.path
+        self.headers = request.headers
+        self.client_address = request.client_address
+        self.request_version = request.version
+        self.wfile = response
+        self._on_headers = on_headers
+        self._rfile = None
+
+    @property
+    def rfile(self):
+        if self._rfile is None:
+            self._rfile = BytesIO(self.request.body)
+        return self._rfile
+
+    def send_response(self, code, message=None):
+        self.response.code = int(code)
+        self.response.phrase = str(message or status_phrase(code))
+
+    def send_header(self, keyword, value):
+        self.response.headers.append((str(keyword), str(value)))
+
+    def end_headers(self):
+        if self._on_headers is not None:
+            self._on_headers(self.response)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def run_handler(handler):
+    """Dispatch one request on a native handler inside a request DB scope."""
+    with request_db_scope():
+        if handler.command == "POST":
+            handler.do_POST()
+        else:
+            handler.do_GET()
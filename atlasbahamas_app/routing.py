@@ -0,0 +1,132 @@
+"""Declarative route table used by the HTTP handler dispatcher.
+
+Exact paths resolve through a dict, parameterized paths (``/listing/<int:listing_id>``)
+through one compiled alternation regex per method, and a short list of prefix routes
+catches whole sections (``/tenant...``). Guards are declared on the route and enforced
+by ``BaseHandlerMixin._dispatch``.
+"""
+from __future__ import annotations
+
+import re
+
+_PARAM_RE = re.compile(r"<(?:(int):)?([A-Za-z_][A-Za-z0-9_]*)>")
+
+# auth guard values understood by the dispatcher
+AUTH_LOGIN = "login"
+AUTH_ADMIN = "admin"
+AUTH_PROPERTY_MANAGER = "property_manager"
+
+
+class Route:
+    __slots__ = ("method", "path", "handler", "auth", "role", "action", "permission", "prefix", "_converters")
+
+    def __init__(self, method, path, handler, auth=None, role=None, action=None, permission=None, prefix=False):
+        self.method = method
+        self.path = path
+        self.handler = handler
+        self.auth = auth
+        self.role = role
+        self.action = action
+        self.permission = permission
+        self.prefix = prefix
+        self._converters = {name: int for kind, name in _PARAM_RE.findall(path) if kind == "int"}
+
+    @property
+    def label(self):
+        """Stable name for logs and metrics (the declared path or pattern)."""
+        return f"{self.path}*" if self.prefix else self.path
+
+    def __repr__(self):
+        return f"Route({self.method} {self.label})"
+
+
+class RequestContext:
+    __slots__ = ("path", "query", "user", "form", "params")
+
+    def __init__(self, path, query=None, user=None, form=None, params=None):
+        self.path = path
+        self.query = query if query is not None else {}
+        self.user = user
+        self.form = form if form is not None else {}
+        self.params = params or {}
+
+
+class RouteTable:
+    def __init__(self):
+        self._routes = []
+        self._exact = {}
+        self._patterns = {}
+        self._prefixes = {}
+        self._compiled = {}
+
+    def add(self, method, path, handler, **guards):
+        route = Route(method, path, handler, **guards)
+        if route.prefix:
+            self._prefixes.setdefault(method, []).append(route)
+            self._prefixes[method].sort(key=lambda r: len(r.path), reverse=True)
+        elif _PARAM_RE.search(path):
+            self._patterns.setdefault(method, []).append(route)
+            self._compiled.pop(method, None)
+        else:
+            key = (method, path)
+            if key in self._exact:
+                raise ValueError(f"duplicate route {method} {path}")
+            self._exact[key] = route
+        self._routes.append(route)
+        return route
+
+    def get(self, path, handler, **guards):
+        return self.add("GET", path, handler, **guards)
+
+    def post(self, path, handler, **guards):
+        return self.add("POST", path, handler, **guards)
+
+    def _compile(self, method):
+        compiled = self._compiled.get(method)
+        if compiled is not None:
+            return compiled
+        parts = []
+        groups = []
+        for i, route in enumerate(self._patterns.get(method, ())):
+            gname = f"_r{i}"
+            pos = 0
+            body = ""
+            for m in _PARAM_RE.finditer(route.path):
+                body += re.escape(route.path[pos:m.start()])
+                body += f"(?P<{gname}_{m.group(2)}>" + (r"\d+" if m.group(1) == "int" else r"[^/]+") + ")"
+                pos = m.end()
+            body += re.escape(route.path[pos:])
+            parts.append(f"(?P<{gname}>{body})")
+            groups.append((gname, route))
+        regex = re.compile("^(?:" + "|".join(parts) + ")$") if parts else None
+        compiled = (regex, groups)
+        self._compiled[method] = compiled
+        return compiled
+
+    def match(self, method, path):
+        """Return ``(route, params)`` for a request, or ``(None, {})``."""
+        route = self._exact.get((method, path))
+        if route is not None:
+            return route, {}
+        regex, groups = self._compile(method)
+        if regex is not None:
+            m = regex.match(path)
+            if m is not None:
+                found = m.groupdict()
+                for gname, route in groups:
+                    if found[gname] is None:
+                        continue
+                    params = {}
+                    pfx = gname + "_"
+                    for key, value in found.items():
+                        if key.startswith(pfx) and value is not None:
+                            name = key[len(pfx):]
+                            params[name] = route._converters.get(name, str)(value)
+                    return route, params
+        for route in self._prefixes.get(method, ()):
+            if path.startswith(route.path):
+                return route, {}
+        return None, {}
+
+    def routes(self, method=None):
+        return [r for r in self._routes if method is None or r.method == method]
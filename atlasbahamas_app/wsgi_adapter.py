@@ -1,161 +1,191 @@
-"""WSGI adapter to run the existing BaseHTTPRequestHandler stack under Gunicorn."""
+"""WSGI adapter running the handler mixins natively under Gunicorn.
+
+Each request becomes an ``http_io.Request``/``Response`` pair handled by
+``NativeHandler``; no socket-style ``BaseHTTPRequestHandler`` is emulated.
+
+Small responses are buffered and returned with a Content-Length. Responses sent
+without a Content-Length (streamed CSV exports) or larger than
+``WSGI_BUFFER_MAX_BYTES`` are streamed: the handler runs on a bounded pool of
+reused helper threads (``WSGI_HANDLER_THREADS``) and its writes are handed to the
+WSGI body iterator through a bounded queue, so the status line and headers go
+out at ``end_headers()`` and memory stays flat. The server thread waits at most
+``WSGI_RESPONSE_TIMEOUT_SECONDS`` for each event from the handler. A request that
+times out before its handler starts is cancelled; one whose handler is already
+running has its commits refused and its request transaction rolled back.
+"""
 from __future__ import annotations
 
-from io import BytesIO
-from http import HTTPStatus
-
-from .http_handler import H
-
-
-class _CaseInsensitiveHeaders:
-    def __init__(self):
-        self._store = {}
-
-    def add(self, name: str, value: str):
-        k = str(name or "").strip()
-        if not k:
-            return
-        self._store[k.lower()] = (k, str(value or ""))
-
-    def get(self, name: str, default=None):
-        k = str(name or "").lower()
-        row = self._store.get(k)
-        if not row:
-            return default
-        return row[1]
-
-
-class _WriteBuffer:
-    def __init__(self):
-        self._buf = BytesIO()
-
-    def write(self, data):
-        if data is None:
-            return
-        if isinstance(data, str):
-            data = data.encode("utf-8", "replace")
-        self._buf.write(data)
-
-    def getvalue(self):
-        return self._buf.getvalue()
-
-
-def _http_status_phrase(code: int, fallback: str = "OK") -> str:
-    try:
-        return HTTPStatus(int(code)).phrase
-    except Exception:
-        return fallback
-
-
-def _headers_from_environ(environ) -> _CaseInsensitiveHeaders:
-    h = _CaseInsensitiveHeaders()
-    for k, v in environ.items():
-        if not k.startswith("HTTP_"):
-            continue
-        name = k[5:].replace("_", "-").title()
-        h.add(name, v)
-    if environ.get("CONTENT_TYPE"):
-        h.add("Content-Type", environ.get("CONTENT_TYPE"))
-    if environ.get("CONTENT_LENGTH"):
-        h.add("Content-Length", environ.get("CONTENT_LENGTH"))
-    if environ.get("REMOTE_ADDR"):
-        h.add("X-Real-Ip", environ.get("REMOTE_ADDR"))
-    if environ.get("wsgi.url_scheme"):
-        h.add("X-Forwarded-Proto", environ.get("wsgi.url_scheme"))
-    if environ.get("HTTP_HOST"):
-        h.add("Host", environ.get("HTTP_HOST"))
-    elif environ.get("SERVER_NAME"):
-        host = environ.get("SERVER_NAME")
-        port = environ.get("SERVER_PORT")
-        if host and port:
-            h.add("Host", f"{host}:{port}")
-    return h
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from . import core
+from .http_handler import NativeHandler
+from .http_io import Request, Response, run_handler
 
-class WSGIHandler:
-    def __init__(self, handler_class=H):
-        self.handler_class = handler_class
+_METHOD_NOT_ALLOWED = b"Method Not Allowed"
+_SERVER_ERROR = b"Internal Server Error"
 
-    def __call__(self, environ, start_response):
-        method = (environ.get("REQUEST_METHOD") or "GET").upper()
-        if method not in ("GET", "POST"):
-            payload = b"Method Not Allowed"
-            start_response(
-                "405 Method Not Allowed",
-                [
-                    ("Content-Type", "text/plain; charset=utf-8"),
-                    ("Content-Length", str(len(payload))),
-                ],
-            )
-            return [payload]
-
-        path = environ.get("PATH_INFO") or "/"
-        qs = environ.get("QUERY_STRING") or ""
-        full_path = f"{path}?{qs}" if qs else path
-
-        body = b""
-        try:
-            ln = int((environ.get("CONTENT_LENGTH") or "0").strip() or "0")
-            if ln > 0:
-                body = environ["wsgi.input"].read(ln)
-        except Exception:
-            body = b""
-
-        handler = self.handler_class.__new__(self.handler_class)
-        handler.command = method
-        handler.path = full_path
-        handler.request_version = environ.get("SERVER_PROTOCOL", "HTTP/1.1")
-        handler.requestline = f"{method} {full_path} {handler.request_version}"
-        handler.client_address = (
-            environ.get("REMOTE_ADDR", "0.0.0.0"),
-            int(environ.get("REMOTE_PORT") or 0),
-        )
-        handler.server = type(
-            "WSGIServerStub",
-            (),
-            {"server_name": environ.get("SERVER_NAME", "atlasbahamas"), "server_port": int(environ.get("SERVER_PORT") or 0)},
-        )()
-        handler.headers = _headers_from_environ(environ)
-        handler.rfile = BytesIO(body)
-        handler.wfile = _WriteBuffer()
-
-        response = {"code": 200, "phrase": "OK", "headers": []}
-
-        def _send_response(code, message=None):
-            c = int(code)
-            response["code"] = c
-            response["phrase"] = str(message or _http_status_phrase(c, "OK"))
-
-        def _send_header(key, value):
-            response["headers"].append((str(key), str(value)))
-
-        def _end_headers():
-            return
-
-        handler.send_response = _send_response
-        handler.send_header = _send_header
-        handler.end_headers = _end_headers
 
+class _StreamBridge:
+    """Bounded hand-off of response events from the handler thread to the WSGI iterator."""
+
+    def __init__(self, max_chunks: int):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._closed = threading.Event()
+        self._state_lock = threading.Lock()
+        self._finishing = False
+
+    def put(self, kind, value=None):
+        while not self._closed.is_set():
+            try:
+                self._queue.put((kind, value), timeout=0.25)
+                return
+            except queue.Full:
+                continue
+        raise BrokenPipeError("WSGI client went away")
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("WSGI handler produced no response event in time") from None
+
+    def claim_commit(self) -> bool:
+        """Handler side: may the request commit? False once the server gave up on it."""
+        with self._state_lock:
+            if self._finishing:
+                return True
+            if self._closed.is_set():
+                return False
+            self._finishing = True
+            return True
+
+    def abandon(self) -> bool:
+        """Server side: close unless the handler has already committed; True if closed."""
+        with self._state_lock:
+            if self._finishing:
+                return False
+            self._closed.set()
+        self._drain()
+        return True
+
+    def close(self):
+        with self._state_lock:
+            self._closed.set()
+        self._drain()
+
+    def _drain(self):
         try:
-            if method == "GET":
-                handler.do_GET()
-            else:
-                handler.do_POST()
-        except Exception:
-            payload = b"Internal Server Error"
-            response["code"] = 500
-            response["phrase"] = "Internal Server Error"
-            response["headers"] = [("Content-Type", "text/plain; charset=utf-8"), ("Content-Length", str(len(payload)))]
-            start_response("500 Internal Server Error", response["headers"])
-            return [payload]
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
 
-        payload = handler.wfile.getvalue()
-        if not any(k.lower() == "content-length" for k, _ in response["headers"]):
-            response["headers"].append(("Content-Length", str(len(payload))))
 
-        status_line = f"{response['code']} {response['phrase']}"
-        start_response(status_line, response["headers"])
-        return [payload]
+def _plain(start_response, status_line, payload):
+    start_response(status_line, [("Content-Type", "text/plain; charset=utf-8"), ("Content-Length", str(len(payload)))])
+    return [payload]
 
 
+class WSGIHandler:
+    def __init__(self, handler_class=NativeHandler, max_workers=None):
+        self.handler_class = handler_class
+        self.max_workers = max_workers or core.WSGI_HANDLER_THREADS
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="wsgi-response")
+                    self._executor_pid = pid
+        return self._executor
 
+    def __call__(self, environ, start_response):
+        method = (environ.get("REQUEST_METHOD") or "GET").upper()
+        if method not in ("GET", "POST"):
+            return _plain(start_response, "405 Method Not Allowed", _METHOD_NOT_ALLOWED)
+
+        request = Request.from_environ(environ)
+        response = Response()
+        if not core.WSGI_STREAMING_ENABLED:
+            try:
+                run_handler(self.handler_class(request, response))
+            except Exception:
+                return _plain(start_response, "500 Internal Server Error", _SERVER_ERROR)
+            start_response(response.status_line, response.buffered_headers())
+            return [response.body()]
+
+        bridge = _StreamBridge(core.WSGI_STREAM_QUEUE_CHUNKS)
+
+        def _on_headers(resp):
+            if not resp.streaming and resp.should_stream(core.WSGI_BUFFER_MAX_BYTES):
+                bridge.put("headers", (resp.status_line, list(resp.headers)))
+                resp.stream_to(lambda chunk: bridge.put("chunk", chunk))
+
+        handler = self.handler_class(request, response, on_headers=_on_headers)
+        try:
+            future = self._pool().submit(self._run_streaming, handler, bridge)
+        except RuntimeError:
+            # Pool shut down.
+            bridge.close()
+            return _plain(start_response, "500 Internal Server Error", _SERVER_ERROR)
+        try:
+            kind, value = bridge.get(core.WSGI_RESPONSE_TIMEOUT_SECONDS)
+        except TimeoutError:
+            # Saturated pool: the handler never runs. Stuck handler: its commits are refused
+            # and its transaction rolls back, so the client is not told 500 about a saved POST.
+            if future.cancel() or bridge.abandon():
+                return _plain(start_response, "500 Internal Server Error", _SERVER_ERROR)
+            # It already committed: wait once more for the real response.
+            try:
+                kind, value = bridge.get(core.WSGI_RESPONSE_TIMEOUT_SECONDS)
+            except TimeoutError:
+                bridge.close()
+                return _plain(start_response, "500 Internal Server Error", _SERVER_ERROR)
+        if kind == "done":
+            if value is not None:
+                return _plain(start_response, "500 Internal Server Error", _SERVER_ERROR)
+            start_response(response.status_line, response.buffered_headers())
+            return [response.body()]
+        status_line, headers = value
+        start_response(status_line, headers)
+        return self._stream_body(bridge)
+
+    @staticmethod
+    def _run_streaming(handler, bridge):
+        error = None
+        try:
+            # run_handler joins this scope; every commit first checks the server still waits.
+            with core.request_db_scope() as scope:
+                scope.commit_guard = bridge.claim_commit
+                run_handler(handler)
+        except BaseException as exc:
+            error = exc
+        finally:
+            try:
+                bridge.put("done", error)
+            except BrokenPipeError:
+                pass
+
+    @staticmethod
+    def _stream_body(bridge):
+        try:
+            # An empty first chunk makes the server flush the status line and headers now.
+            yield b""
+            while True:
+                kind, value = bridge.get(core.WSGI_RESPONSE_TIMEOUT_SECONDS)
+                if kind == "chunk":
+                    yield value
+                elif kind == "done":
+                    if value is not None:
+                        # Headers are already out; abort so the client sees a truncated body.
+                        raise value
+                    return
+        finally:
+            bridge.close()
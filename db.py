@@ -1,10 +1,20 @@
 """Database compatibility layer for AtlasBahamas (SQLite default, optional PostgreSQL)."""
 from __future__ import annotations
 
+import functools
+import heapq
+import itertools
 import os
+import queue
 import re
 import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from collections.abc import Mapping
 from contextlib import contextmanager
+from types import MappingProxyType
 
 try:
     import psycopg
@@ -17,6 +27,27 @@ else:  # pragma: no cover
     DBOperationalError = (sqlite3.OperationalError,)
 
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return bool(default)
+    return str(v).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(str(os.getenv(name, str(default))).strip())
+    except Exception:
+        return int(default)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(str(os.getenv(name, str(default))).strip())
+    except Exception:
+        return float(default)
+
+
 def _replace_qmark_placeholders(sql: str) -> str:
     out = []
     in_single = False
@@ -123,128 +154,175 @@ def _julianday_expr_to_pg(token: str) -> str:
     )
 
 
-def _translate_sql(sql: str, params):
-    text = str(sql or "")
+_RE_PRAGMA_TABLE_INFO = re.compile(r"(?is)^PRAGMA\s+table_info\(([^)]+)\)$")
+_RE_PRAGMA = re.compile(r"(?is)^PRAGMA\s+")
+_RE_LAST_INSERT_ROWID = re.compile(r"(?is)^SELECT\s+last_insert_rowid\(\)\s*$")
+_RE_INSERT_OR_IGNORE = re.compile(r"(?is)^\s*INSERT\s+OR\s+IGNORE\s+INTO\b")
+_RE_INTEGER_PK_AUTOINCREMENT = re.compile(r"(?i)\bINTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT\b")
+_RE_AUTOINCREMENT = re.compile(r"(?i)\bAUTOINCREMENT\b")
+_RE_DATETIME_NOW_MODIFIER = re.compile(r"(?is)\bdatetime\(\s*['\"]now['\"]\s*,\s*([^)]+?)\s*\)")
+_RE_DATE_NOW_MODIFIER = re.compile(r"(?is)\bdate\(\s*['\"]now['\"]\s*,\s*([^)]+?)\s*\)")
+_RE_DATETIME_NOW = re.compile(r"(?i)\bdatetime\(\s*(?:'now'|\"now\")\s*\)")
+_RE_DATE_NOW = re.compile(r"(?i)\bdate\(\s*(?:'now'|\"now\")\s*\)")
+_RE_DATE_EXPR = re.compile(r"(?is)\bdate\(\s*([^)]+)\s*\)")
+_RE_JULIANDAY_NOW = re.compile(r"(?i)\bjulianday\(\s*(?:'now'|\"now\")\s*\)")
+_RE_JULIANDAY_EXPR = re.compile(r"(?is)\bjulianday\(\s*([^)]+)\s*\)")
+
+
+def _translate_sql_text(text: str):
+    """Translate SQLite-dialect SQL to PostgreSQL.
+
+    Returns ``(sql, fixed_params)``; ``fixed_params`` is None when the caller's
+    params should be passed through unchanged.
+    """
     stripped = text.strip().rstrip(";")
 
-    m = re.match(r"(?is)^PRAGMA\s+table_info\(([^)]+)\)$", stripped)
+    m = _RE_PRAGMA_TABLE_INFO.match(stripped)
     if m:
         raw_name = m.group(1).strip().strip('"\'`[]')
         return _PRAGMA_TABLE_INFO_SQL, (raw_name, raw_name)
 
-    if re.match(r"(?is)^PRAGMA\s+", stripped):
+    if _RE_PRAGMA.match(stripped):
         return "SELECT 1", ()
 
-    if re.match(r"(?is)^SELECT\s+last_insert_rowid\(\)\s*$", stripped):
+    if _RE_LAST_INSERT_ROWID.match(stripped):
         return "SELECT LASTVAL()", ()
 
-    if re.search(r"(?is)^\s*INSERT\s+OR\s+IGNORE\s+INTO\b", text):
-        text = re.sub(r"(?is)^\s*INSERT\s+OR\s+IGNORE\s+INTO\b", "INSERT INTO", text, count=1)
+    if _RE_INSERT_OR_IGNORE.search(text):
+        text = _RE_INSERT_OR_IGNORE.sub("INSERT INTO", text, count=1)
         if "ON CONFLICT" not in text.upper():
             text = text.rstrip().rstrip(";") + " ON CONFLICT DO NOTHING"
 
-    text = re.sub(
-        r"(?i)\bINTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT\b",
-        "BIGSERIAL PRIMARY KEY",
-        text,
-    )
-    text = re.sub(r"(?i)\bAUTOINCREMENT\b", "", text)
-    text = re.sub(
-        r"(?is)\bdatetime\(\s*['\"]now['\"]\s*,\s*([^)]+?)\s*\)",
-        lambda m: _datetime_with_modifier_to_pg(m.group(1)),
-        text,
-    )
-    text = re.sub(
-        r"(?is)\bdate\(\s*['\"]now['\"]\s*,\s*([^)]+?)\s*\)",
-        lambda m: _date_with_modifier_to_pg(m.group(1)),
-        text,
-    )
-    text = re.sub(r"(?i)\bdatetime\(\s*'now'\s*\)", _SQLITE_NOW_TEXT, text)
-    text = re.sub(r"(?i)\bdatetime\(\s*\"now\"\s*\)", _SQLITE_NOW_TEXT, text)
-    text = re.sub(r"(?i)\bdate\(\s*'now'\s*\)", _SQLITE_DATE_TEXT, text)
-    text = re.sub(r"(?i)\bdate\(\s*\"now\"\s*\)", _SQLITE_DATE_TEXT, text)
-    text = re.sub(
-        r"(?is)\bdate\(\s*([^)]+)\s*\)",
-        lambda m: _date_expr_to_pg(m.group(1)),
-        text,
-    )
-    text = re.sub(
-        r"(?i)\bjulianday\(\s*'now'\s*\)",
-        "(EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC')) / 86400.0)",
-        text,
-    )
-    text = re.sub(
-        r"(?i)\bjulianday\(\s*\"now\"\s*\)",
-        "(EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC')) / 86400.0)",
-        text,
-    )
-    text = re.sub(
-        r"(?is)\bjulianday\(\s*([^)]+)\s*\)",
-        lambda m: _julianday_expr_to_pg(m.group(1)),
-        text,
-    )
+    text = _RE_INTEGER_PK_AUTOINCREMENT.sub("BIGSERIAL PRIMARY KEY", text)
+    text = _RE_AUTOINCREMENT.sub("", text)
+    text = _RE_DATETIME_NOW_MODIFIER.sub(lambda m: _datetime_with_modifier_to_pg(m.group(1)), text)
+    text = _RE_DATE_NOW_MODIFIER.sub(lambda m: _date_with_modifier_to_pg(m.group(1)), text)
+    text = _RE_DATETIME_NOW.sub(_SQLITE_NOW_TEXT, text)
+    text = _RE_DATE_NOW.sub(_SQLITE_DATE_TEXT, text)
+    text = _RE_DATE_EXPR.sub(lambda m: _date_expr_to_pg(m.group(1)), text)
+    text = _RE_JULIANDAY_NOW.sub("(EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC')) / 86400.0)", text)
+    text = _RE_JULIANDAY_EXPR.sub(lambda m: _julianday_expr_to_pg(m.group(1)), text)
     text = _replace_qmark_placeholders(text)
+    return text, None
+
+
+# The application issues a few hundred distinct literal SQL strings, so the
+# translation is memoized on the raw text; params never enter the key.
+_translate_sql_cached = functools.lru_cache(maxsize=max(16, _env_int("SQL_TRANSLATION_CACHE_SIZE", 2048)))(
+    _translate_sql_text
+)
+
+
+def _translate_sql(sql: str, params):
+    text, fixed_params = _translate_sql_cached(str(sql or ""))
+    if fixed_params is not None:
+        return text, fixed_params
     return text, tuple(params or ())
 
 
-class CompatRow(dict):
-    """dict-like row supporting both row['col'] and row[idx] access."""
+def sql_translation_cache_stats() -> dict:
+    info = _translate_sql_cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def _column_index(keys) -> MappingProxyType:
+    return MappingProxyType({k: i for i, k in enumerate(keys)})
 
-    __slots__ = ("_keys",)
 
-    def __init__(self, keys, values):
-        keys2 = tuple(keys)
-        super().__init__(zip(keys2, values))
-        self._keys = keys2
+class CompatRow(Mapping):
+    """Tuple-backed row supporting row['col'], row[idx], keys() and dict(row).
+
+    Rows from one result set share a single immutable column -> index map, so
+    each row only carries its values tuple.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, keys, values, index=None):
+        self._index = index if index is not None else _column_index(keys)
+        self._values = values if isinstance(values, tuple) else tuple(values)
 
     def __getitem__(self, key):
-        if isinstance(key, int):
-            key = self._keys[key]
-        return super().__getitem__(key)
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
 
     def keys(self):
-        return list(self._keys)
+        return list(self._index)
+
+    def __repr__(self):
+        return f"CompatRow({dict(self)!r})"
 
 
 class PostgresCursorCompat:
     def __init__(self, cursor):
         self._cursor = cursor
+        self._cols = None
+        self._index = None
 
     @property
     def rowcount(self):
         return self._cursor.rowcount
 
     def _columns(self):
-        desc = self._cursor.description
-        if not desc:
-            return []
-        cols = []
-        for c in desc:
-            cols.append(getattr(c, "name", c[0]))
-        return cols
+        if self._cols is None:
+            desc = self._cursor.description
+            if not desc:
+                return []
+            self._cols = tuple(getattr(c, "name", c[0]) for c in desc)
+            self._index = _column_index(self._cols)
+        return self._cols
 
     def _wrap_row(self, row):
         if row is None:
             return None
         cols = self._columns()
         if isinstance(row, dict):
-            values = [row.get(c) for c in cols]
+            values = tuple(row.get(c) for c in cols)
         else:
-            values = list(row)
-        return CompatRow(cols, values)
+            values = row
+        return CompatRow(cols, values, self._index)
+
+    def _wrap_rows(self, rows):
+        if not rows:
+            return []
+        self._columns()
+        index = self._index
+        if isinstance(rows[0], dict):
+            return [self._wrap_row(r) for r in rows]
+        return [CompatRow(None, r, index) for r in rows]
 
     def fetchone(self):
         return self._wrap_row(self._cursor.fetchone())
 
     def fetchall(self):
-        return [self._wrap_row(r) for r in self._cursor.fetchall()]
+        return self._wrap_rows(self._cursor.fetchall())
 
     def fetchmany(self, size=None):
         if size is None:
             rows = self._cursor.fetchmany()
         else:
             rows = self._cursor.fetchmany(size)
-        return [self._wrap_row(r) for r in rows]
+        return self._wrap_rows(rows)
 
     def __iter__(self):
         while True:
@@ -257,25 +335,178 @@ class PostgresCursorCompat:
         self._cursor.close()
 
 
+_RE_FP_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_FP_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_FP_IN_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+_RE_FP_SPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def sql_fingerprint(sql: str) -> str:
+    """Statement shape with literals and IN-lists collapsed, used to group repeats."""
+    fp = _RE_FP_STRING.sub("?", sql)
+    fp = _RE_FP_NUMBER.sub("?", fp)
+    fp = _RE_FP_IN_LIST.sub("(...)", fp)
+    return _RE_FP_SPACE.sub(" ", fp).strip()
+
+
+class QueryStats:
+    """Per-request query counters filled in by the compat connections.
+
+    Only fingerprints are kept, so logged statements never carry parameter
+    values or inlined literals.
+    """
+
+    def __init__(self, keep_slowest: int = 5):
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints = {}
+        self._slowest = []
+        self._keep = max(1, int(keep_slowest))
+
+    def record(self, sql: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        fp = sql_fingerprint(sql)
+        entry = self.fingerprints.get(fp)
+        if entry is None:
+            self.fingerprints[fp] = [1, elapsed_ms]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+        if len(self._slowest) < self._keep:
+            heapq.heappush(self._slowest, (elapsed_ms, fp))
+        elif elapsed_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (elapsed_ms, fp))
+
+    def summary(self) -> dict:
+        return {"queries": self.count, "db_ms": round(self.total_ms, 2), "distinct": len(self.fingerprints)}
+
+    def slowest(self) -> list:
+        return [{"ms": round(ms, 2), "sql": fp[:300]} for ms, fp in sorted(self._slowest, reverse=True)]
+
+    def repeated(self, threshold: int) -> list:
+        out = [
+            {"count": n, "ms": round(ms, 2), "sql": fp[:300]}
+            for fp, (n, ms) in self.fingerprints.items()
+            if n > threshold
+        ]
+        out.sort(key=lambda item: item["count"], reverse=True)
+        return out
+
+
+_QUERY_STATE = threading.local()
+
+
+def start_query_stats() -> QueryStats:
+    stats = QueryStats()
+    _QUERY_STATE.stats = stats
+    return stats
+
+
+def stop_query_stats():
+    stats = getattr(_QUERY_STATE, "stats", None)
+    _QUERY_STATE.stats = None
+    return stats
+
+
+def current_query_stats():
+    return getattr(_QUERY_STATE, "stats", None)
+
+
+def _recorded(sql, fn, *args):
+    stats = getattr(_QUERY_STATE, "stats", None)
+    if stats is None:
+        return fn(*args)
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        stats.record(sql, (time.perf_counter() - start) * 1000.0)
+
+
+_STREAM_CURSOR_IDS = itertools.count(1)
+
+
+def stream_batch_size(batch_size=None) -> int:
+    if batch_size is None:
+        batch_size = _env_int("DB_STREAM_BATCH_SIZE", 500)
+    return max(1, int(batch_size))
+
+
+def _postgres_prepare_threshold():
+    raw = (os.getenv("POSTGRES_PREPARE_THRESHOLD", "5") or "").strip().lower()
+    if raw in ("", "off", "none", "false", "disabled"):
+        return None
+    try:
+        value = int(raw)
+    except Exception:
+        return 5
+    return value if value >= 0 else None
+
+
 class PostgresConnectionCompat:
     backend = "postgres"
 
-    def __init__(self, dsn: str):
+    def __init__(self, dsn: str, read_only: bool = False):
         if psycopg is None:
             raise RuntimeError("psycopg is not installed")
         self._conn = psycopg.connect(dsn)
+        if read_only:
+            self._conn.read_only = True
+        # psycopg prepares a statement server-side once the same query text has
+        # run prepare_threshold times on this connection (psycopg default 5,
+        # kept here), keeping up to prepared_max statements per connection in an
+        # LRU. prepared_max deliberately overrides psycopg's default of 100 with
+        # 256: a pooled connection serves every route, and at 100 the less
+        # frequent route statements would keep evicting and re-preparing each
+        # other. Translated SQL comes from the translation cache, so hot queries
+        # repeat byte-for-byte and pooled connections live long enough to reach
+        # the threshold.
+        # Disable (POSTGRES_PREPARE_THRESHOLD=off) behind transaction-mode PgBouncer.
+        self._conn.prepare_threshold = _postgres_prepare_threshold()
+        self._conn.prepared_max = max(1, _env_int("POSTGRES_PREPARED_MAX", 256))
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._conn.closed)
+
+    def ping(self) -> bool:
+        try:
+            self._conn.execute("SELECT 1").fetchone()
+            self._conn.rollback()
+            return True
+        except Exception:
+            return False
 
     def execute(self, sql: str, params=()):
         sql2, params2 = _translate_sql(sql, params)
-        cur = self._conn.execute(sql2, params2)
+        cur = _recorded(sql, self._conn.execute, sql2, params2)
         return PostgresCursorCompat(cur)
 
     def executemany(self, sql: str, seq_of_params):
         sql2, _ = _translate_sql(sql, ())
         cur = self._conn.cursor()
-        cur.executemany(sql2, seq_of_params)
+        _recorded(sql, cur.executemany, sql2, seq_of_params)
         return PostgresCursorCompat(cur)
 
+    def stream(self, sql: str, params=(), batch_size=None):
+        """Iterate rows through a named server-side cursor, batch_size rows per round trip."""
+        size = stream_batch_size(batch_size)
+        sql2, params2 = _translate_sql(sql, params)
+        cur = self._conn.cursor(name=f"atlas_stream_{next(_STREAM_CURSOR_IDS)}")
+        cur.itersize = size
+        try:
+            _recorded(sql, cur.execute, sql2, params2)
+            wrapped = PostgresCursorCompat(cur)
+            while True:
+                rows = wrapped.fetchmany(size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cur.close()
+
     def commit(self):
         self._conn.commit()
 
@@ -299,34 +530,188 @@ class PostgresConnectionCompat:
         self.close()
 
 
+_SQLITE_BUSY_TIMEOUT_MS = 5000
+_SQLITE_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER", "BEGIN IMMEDIATE", "BEGIN EXCLUSIVE")
+_SQL_WITH = re.compile(r"WITH\b", re.I)
+_SQL_LEADING_COMMENTS = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?(?:\*/|$))*", re.S)
+# Tokens that matter when looking for the statement after a WITH clause: quoted strings and
+# identifiers and comments are skipped whole so their contents are never mistaken for keywords.
+_SQL_CTE_TOKEN = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\[[^\]]*\]|`[^`]*`|--[^\n]*|/\*.*?(?:\*/|$)|[()]|[A-Za-z_]\w*",
+    re.S,
+)
+
+
+def _sqlite_takes_write_lock(sql: str) -> bool:
+    head = sql.lstrip()
+    if head.startswith(("--", "/*")):
+        head = head[_SQL_LEADING_COMMENTS.match(head).end():]
+    if head[:15].upper().startswith(_SQLITE_WRITE_VERBS):
+        return True
+    if not _SQL_WITH.match(head):
+        return False
+    # WITH [RECURSIVE] name AS (...), ...: the first keyword outside the CTE bodies decides.
+    depth = 0
+    for m in _SQL_CTE_TOKEN.finditer(head, 4):
+        tok = m.group()
+        if tok == "(":
+            depth += 1
+        elif tok == ")":
+            depth -= 1
+        elif depth == 0:
+            word = tok.upper()
+            if word in ("INSERT", "UPDATE", "DELETE", "REPLACE"):
+                return True
+            if word in ("SELECT", "VALUES"):
+                return False
+    return False
+
+
+class SqliteWriteGate:
+    """In-process turn-taking for one SQLite file's single write lock.
+
+    Connections sharing a gate take it before their first write statement and
+    hand it back when their transaction ends, so a process's writers (the
+    write-queue thread and request connections alike) wait on a lock instead
+    of polling in SQLite's busy handler. Other processes still contend
+    through SQLite's file lock and ``busy_timeout``. Writes are recognised by
+    their statement verb after any leading comments, including the statement
+    that follows a ``WITH`` clause.
+    """
+
+    def __init__(self, timeout: float = _SQLITE_BUSY_TIMEOUT_MS / 1000.0):
+        self.timeout = max(0.0, float(timeout))
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"gate_acquired": 0, "gate_waits": 0, "gate_wait_ms_total": 0.0, "gate_timeouts": 0}
+
+    def acquire(self):
+        if self._lock.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats["gate_acquired"] += 1
+            return
+        start = time.monotonic()
+        if not self._lock.acquire(timeout=self.timeout):
+            with self._stats_lock:
+                self._stats["gate_timeouts"] += 1
+            raise sqlite3.OperationalError("database is locked")
+        with self._stats_lock:
+            self._stats["gate_acquired"] += 1
+            self._stats["gate_waits"] += 1
+            self._stats["gate_wait_ms_total"] += (time.monotonic() - start) * 1000.0
+
+    def release(self):
+        self._lock.release()
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            out = dict(self._stats)
+        out["gate_wait_ms_total"] = round(out["gate_wait_ms_total"], 2)
+        return out
+
+
 class SqliteConnectionCompat:
     backend = "sqlite"
 
-    def __init__(self, path: str, timeout: int = 30):
-        self._conn = sqlite3.connect(path, timeout=timeout)
+    def __init__(self, path: str, timeout: int = 30, check_same_thread: bool = True, write_gate=None):
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=check_same_thread)
         self._conn.row_factory = sqlite3.Row
         self._conn.execute("PRAGMA foreign_keys=ON")
         self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute("PRAGMA synchronous=NORMAL")
-        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(f"PRAGMA busy_timeout={_SQLITE_BUSY_TIMEOUT_MS}")
+        self._closed = False
+        self._gate = write_gate
+        self._gate_held = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn.in_transaction
+
+    def ping(self) -> bool:
+        try:
+            self._conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _gate_acquire(self):
+        if not self._gate_held:
+            self._gate.acquire()
+            self._gate_held = True
+
+    def _gate_settle(self):
+        # Hand the gate back once the connection has left its write transaction.
+        if self._gate_held and not self._conn.in_transaction:
+            self._gate_held = False
+            self._gate.release()
 
     def execute(self, sql: str, params=()):
-        return self._conn.execute(sql, params)
+        if self._gate is not None and _sqlite_takes_write_lock(sql):
+            self._gate_acquire()
+        try:
+            return _recorded(sql, self._conn.execute, sql, params)
+        finally:
+            self._gate_settle()
 
     def executemany(self, sql: str, seq_of_params):
-        return self._conn.executemany(sql, seq_of_params)
+        if self._gate is not None and _sqlite_takes_write_lock(sql):
+            self._gate_acquire()
+        try:
+            return _recorded(sql, self._conn.executemany, sql, seq_of_params)
+        finally:
+            self._gate_settle()
 
     def executescript(self, script: str):
-        return self._conn.executescript(script)
+        if self._gate is not None:
+            self._gate_acquire()
+        try:
+            return self._conn.executescript(script)
+        finally:
+            self._gate_settle()
+
+    def stream(self, sql: str, params=(), batch_size=None):
+        """Iterate rows by stepping the statement batch_size rows at a time."""
+        size = stream_batch_size(batch_size)
+        cur = _recorded(sql, self._conn.execute, sql, params)
+        cur.arraysize = size
+        try:
+            while True:
+                rows = cur.fetchmany(size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cur.close()
 
     def commit(self):
-        self._conn.commit()
+        try:
+            self._conn.commit()
+        finally:
+            self._gate_settle()
 
     def rollback(self):
-        self._conn.rollback()
+        try:
+            self._conn.rollback()
+        finally:
+            self._gate_settle()
 
     def close(self):
-        self._conn.close()
+        self._closed = True
+        try:
+            self._conn.close()
+        finally:
+            if self._gate_held:
+                self._gate_held = False
+                self._gate.release()
 
     def cursor(self):
         return self._conn.cursor()
@@ -342,19 +727,777 @@ class SqliteConnectionCompat:
         self.close()
 
 
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class _PoolEntry:
+    __slots__ = ("conn", "created_at", "last_used", "pid")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.pid = os.getpid()
+
+
+class PooledConnection:
+    """Checked-out pool connection; close() hands it back instead of disconnecting."""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def raw(self):
+        entry = self._entry
+        if entry is None:
+            raise RuntimeError("connection already returned to pool")
+        return entry.conn
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.raw, name)
+
+    def execute(self, sql: str, params=()):
+        return self.raw.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params):
+        return self.raw.executemany(sql, seq_of_params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def cursor(self):
+        return self.raw.cursor()
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+
+    def __del__(self):
+        # Leaked connections come back on the next checkout; the orphan queue
+        # is safe to use from a finalizer, unlike the pool lock.
+        entry = getattr(self, "_entry", None)
+        if entry is not None:
+            self._entry = None
+            self._pool._orphans.put(entry)
+
+
+# Connections inherited across fork() must never be finalized in the child:
+# closing them would tear down the parent's socket/file state.
+_INHERITED_CONNECTIONS = []
+
+
+class ConnectionPool:
+    """Thread-safe pool of compat connections.
+
+    Health checks run on checkout once a connection has been idle for
+    ``health_check_idle`` seconds (0 checks every checkout, negative disables),
+    and connections older than ``max_lifetime`` seconds are recycled.
+    """
+
+    def __init__(self, factory, name="default", min_size=1, max_size=20, timeout=10.0,
+                 max_lifetime=1800.0, health_check_idle=30.0):
+        self.name = name
+        self._factory = factory
+        self.min_size = max(0, int(min_size))
+        self.max_size = max(1, int(max_size), self.min_size)
+        self.timeout = max(0.0, float(timeout))
+        self.max_lifetime = float(max_lifetime)
+        self.health_check_idle = float(health_check_idle)
+        self._reset_state()
+
+    def _reset_state(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._orphans = queue.SimpleQueue()
+        self._size = 0
+        self._pid = os.getpid()
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "closed": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+            "waits": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "timeouts": 0,
+        }
+
+    def _expired(self, entry, now):
+        return self.max_lifetime > 0 and (now - entry.created_at) >= self.max_lifetime
+
+    def _close_entry(self, entry):
+        with self._cond:
+            self._size = max(0, self._size - 1)
+            self._stats["closed"] += 1
+            self._cond.notify()
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+
+    def _usable(self, entry):
+        now = time.monotonic()
+        if self._expired(entry, now):
+            with self._cond:
+                self._stats["recycled"] += 1
+            return False
+        if entry.conn.closed:
+            return False
+        if self.health_check_idle >= 0 and (now - entry.last_used) >= self.health_check_idle:
+            if not entry.conn.ping():
+                with self._cond:
+                    self._stats["failed_health_checks"] += 1
+                return False
+        return True
+
+    def _drain_orphans(self):
+        while True:
+            try:
+                entry = self._orphans.get_nowait()
+            except queue.Empty:
+                return
+            self.release(entry)
+
+    def prefill(self):
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = _PoolEntry(self._factory())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            self._drain_orphans()
+            entry = None
+            create = False
+            with self._cond:
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"timed out waiting {self.timeout:.1f}s for a '{self.name}' connection")
+                    waited = True
+                    self._cond.wait(min(remaining, 0.25))
+                    continue
+            if create:
+                try:
+                    entry = _PoolEntry(self._factory())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+            elif not self._usable(entry):
+                self._close_entry(entry)
+                continue
+            wait_ms = (time.monotonic() - start) * 1000.0
+            with self._cond:
+                self._stats["checkouts"] += 1
+                if waited:
+                    self._stats["waits"] += 1
+                    self._stats["wait_ms_total"] += wait_ms
+                    self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            return PooledConnection(self, entry)
+
+    def release(self, entry):
+        if entry.pid != os.getpid():
+            _INHERITED_CONNECTIONS.append(entry.conn)
+            return
+        try:
+            if entry.conn.closed:
+                raise RuntimeError("connection closed while checked out")
+            # Discard whatever the borrower left uncommitted, matching close().
+            entry.conn.rollback()
+        except Exception:
+            self._close_entry(entry)
+            return
+        now = time.monotonic()
+        if self._expired(entry, now):
+            with self._cond:
+                self._stats["recycled"] += 1
+            self._close_entry(entry)
+            return
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def close_idle(self):
+        with self._cond:
+            entries = list(self._idle)
+            self._idle.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    def reset_after_fork(self):
+        _INHERITED_CONNECTIONS.extend(entry.conn for entry in self._idle)
+        self._reset_state()
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._stats)
+            out["size"] = self._size
+            out["idle"] = len(self._idle)
+            out["in_use"] = self._size - len(self._idle)
+            out["max_size"] = self.max_size
+        out["wait_ms_total"] = round(out["wait_ms_total"], 2)
+        out["wait_ms_max"] = round(out["wait_ms_max"], 2)
+        out["wait_ms_avg"] = round(out["wait_ms_total"] / out["waits"], 2) if out["waits"] else 0.0
+        return out
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def pool_enabled() -> bool:
+    return _env_bool("DB_POOL_ENABLED", True)
+
+
+def _get_pool(key, name, factory) -> ConnectionPool:
+    pool = _POOLS.get(key)
+    if pool is not None:
+        return pool
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                factory,
+                name=name,
+                min_size=_env_int("DB_POOL_MIN_SIZE", 1),
+                max_size=_env_int("DB_POOL_MAX_SIZE", 20),
+                timeout=_env_float("DB_POOL_TIMEOUT_SECONDS", 10.0),
+                max_lifetime=_env_float("DB_POOL_MAX_LIFETIME_SECONDS", 1800.0),
+                health_check_idle=_env_float("DB_POOL_HEALTHCHECK_IDLE_SECONDS", 30.0),
+            )
+            pool.prefill()
+            _POOLS[key] = pool
+    return pool
+
+
+def pool_stats() -> dict:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return {p.name: p.stats() for p in pools}
+
+
+def close_pools():
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    for p in pools:
+        p.close_idle()
+
+
+def _reset_pools_after_fork():
+    global _POOLS_LOCK
+    _POOLS_LOCK = threading.Lock()
+    for p in list(_POOLS.values()):
+        p.reset_after_fork()
+
+
+class WriteQueueFull(RuntimeError):
+    pass
+
+
+class _WriteJob:
+    __slots__ = ("fn", "future")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.future = Future()
+
+
+class _WriteHandle:
+    """Connection view handed to queued write functions.
+
+    The queue owns the transaction: commit() is a no-op and rollback() only
+    undoes the current job's savepoint.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._conn, name)
+
+    def execute(self, sql: str, params=()):
+        return self._conn.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params):
+        return self._conn.executemany(sql, seq_of_params)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._conn.execute("ROLLBACK TO atlas_write")
+
+    def close(self):
+        pass
+
+
+class SqliteWriteQueue:
+    """Funnels a process's SQLite writes through one dedicated writer thread.
+
+    Each submitted ``fn(conn)`` runs inside its own savepoint; jobs that are
+    already queued when the writer picks up work are applied in the same
+    ``BEGIN IMMEDIATE`` transaction and committed together. A failing job
+    only rolls back its own savepoint.
+    """
+
+    def __init__(self, factory, name="default", max_pending=1000, batch_max=64, put_timeout=5.0):
+        self.name = name
+        self._factory = factory
+        self.batch_max = max(1, int(batch_max))
+        self.put_timeout = max(0.0, float(put_timeout))
+        self._jobs = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._conn = None
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "batches": 0,
+            "committed": 0,
+            "failed": 0,
+            "batch_max_seen": 0,
+            "commit_ms_total": 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"sqlite-writer-{self.name}", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn) -> Future:
+        job = _WriteJob(fn)
+        if threading.current_thread() is self._thread:
+            # Re-entrant submit from inside a queued job: run in the open transaction.
+            try:
+                job.future.set_result(fn(_WriteHandle(self._conn)))
+            except BaseException as e:
+                job.future.set_exception(e)
+            return job.future
+        self._ensure_started()
+        try:
+            self._jobs.put(job, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise WriteQueueFull(f"'{self.name}' write queue is full ({self._jobs.maxsize} pending)")
+        with self._lock:
+            self._stats["submitted"] += 1
+        return job.future
+
+    def run(self, fn):
+        return self.submit(fn).result()
+
+    def _connection(self):
+        if self._conn is None or self._conn.closed:
+            conn = self._factory()
+            # Transactions are managed explicitly with BEGIN IMMEDIATE/SAVEPOINT.
+            conn._conn.isolation_level = None
+            self._conn = conn
+        return self._conn
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._jobs.get()
+            if job is None:
+                break
+            batch = [job]
+            while len(batch) < self.batch_max:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            batch = [j for j in batch if j.future.set_running_or_notify_cancel()]
+            if batch:
+                self._apply(batch)
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _apply(self, batch):
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            self._fail(batch, e)
+            if self._conn is not None and not self._conn.ping():
+                self._conn = None
+            return
+        handle = _WriteHandle(conn)
+        done = []
+        for job in batch:
+            conn.execute("SAVEPOINT atlas_write")
+            try:
+                result = job.fn(handle)
+            except BaseException as e:
+                try:
+                    conn.execute("ROLLBACK TO atlas_write")
+                    conn.execute("RELEASE atlas_write")
+                except Exception:
+                    pass
+                job.future.set_exception(e)
+                with self._lock:
+                    self._stats["failed"] += 1
+                continue
+            conn.execute("RELEASE atlas_write")
+            done.append((job, result))
+        start = time.monotonic()
+        try:
+            conn.execute("COMMIT")
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            self._fail([job for job, _ in done], e)
+            return
+        commit_ms = (time.monotonic() - start) * 1000.0
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["committed"] += len(done)
+            self._stats["batch_max_seen"] = max(self._stats["batch_max_seen"], len(batch))
+            self._stats["commit_ms_total"] += commit_ms
+        for job, result in done:
+            job.future.set_result(result)
+
+    def _fail(self, jobs, exc):
+        with self._lock:
+            self._stats["failed"] += len(jobs)
+        for job in jobs:
+            job.future.set_exception(exc)
+
+    def stop(self, timeout=5.0):
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._jobs.put(None)
+        thread.join(timeout)
+
+    def reset_after_fork(self):
+        if self._conn is not None:
+            _INHERITED_CONNECTIONS.append(self._conn)
+        self._conn = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=self._jobs.maxsize)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+        out["pending"] = self._jobs.qsize()
+        out["commit_ms_avg"] = round(out["commit_ms_total"] / out["batches"], 2) if out["batches"] else 0.0
+        out["commit_ms_total"] = round(out["commit_ms_total"], 2)
+        return out
+
+
+_WRITE_QUEUES = {}
+_WRITE_GATES = {}
+
+
+def write_queue_enabled() -> bool:
+    return _env_bool("SQLITE_WRITE_QUEUE", False) and not postgres_enabled()
+
+
+def sqlite_write_gate(path: str | None = None) -> SqliteWriteGate | None:
+    """Shared write gate for ``path`` while the write queue is on, else None."""
+    raw_path = path or os.getenv("DATABASE_PATH", "data/atlasbahamas.sqlite")
+    if raw_path == ":memory:" or not write_queue_enabled():
+        return None
+    sqlite_path = os.path.abspath(raw_path)
+    gate = _WRITE_GATES.get(sqlite_path)
+    if gate is not None:
+        return gate
+    with _POOLS_LOCK:
+        return _WRITE_GATES.setdefault(sqlite_path, SqliteWriteGate())
+
+
+def sqlite_write_queue(path: str | None = None) -> SqliteWriteQueue:
+    sqlite_path = os.path.abspath(path or os.getenv("DATABASE_PATH", "data/atlasbahamas.sqlite"))
+    wq = _WRITE_QUEUES.get(sqlite_path)
+    if wq is not None:
+        return wq
+    with _POOLS_LOCK:
+        wq = _WRITE_QUEUES.get(sqlite_path)
+        if wq is None:
+            wq = SqliteWriteQueue(
+                lambda: SqliteConnectionCompat(
+                    sqlite_path, timeout=30, check_same_thread=False, write_gate=sqlite_write_gate(sqlite_path)
+                ),
+                name=os.path.basename(sqlite_path),
+                max_pending=_env_int("SQLITE_WRITE_QUEUE_MAX_PENDING", 1000),
+                batch_max=_env_int("SQLITE_WRITE_QUEUE_BATCH_MAX", 64),
+                put_timeout=_env_float("SQLITE_WRITE_QUEUE_TIMEOUT_SECONDS", 5.0),
+            )
+            _WRITE_QUEUES[sqlite_path] = wq
+    return wq
+
+
+def write_queue_stats() -> dict:
+    with _POOLS_LOCK:
+        queues = list(_WRITE_QUEUES.items())
+    out = {}
+    for path, q in queues:
+        out[q.name] = q.stats()
+        gate = _WRITE_GATES.get(path)
+        if gate is not None:
+            out[q.name].update(gate.stats())
+    return out
+
+
+_REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END AS lag"
+)
+
+
+class ReplicaRouter:
+    """Round-robin over PostgreSQL read replicas with lag-aware fallback.
+
+    A replica is skipped for ``cooldown`` seconds after a connection error and
+    while its replay lag exceeds ``max_lag`` seconds. Lag is re-measured on
+    checkout at most every ``lag_check_interval`` seconds. ``connect()``
+    returns None when no replica is usable so callers fall back to the primary.
+    """
+
+    def __init__(self, dsns, max_lag=5.0, lag_check_interval=5.0, cooldown=30.0):
+        self.dsns = list(dsns)
+        self.max_lag = float(max_lag)
+        self.lag_check_interval = max(0.0, float(lag_check_interval))
+        self.cooldown = max(0.0, float(cooldown))
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = [0.0] * len(self.dsns)
+        self._lag = [0.0] * len(self.dsns)
+        self._lag_checked = [float("-inf")] * len(self.dsns)
+        self._stats = {"replica_reads": 0, "primary_fallbacks": 0, "lag_skips": 0, "errors": 0}
+
+    def _order(self):
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % max(1, len(self.dsns))
+        return [(start + i) % len(self.dsns) for i in range(len(self.dsns))]
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _measure_lag(self, conn):
+        row = conn.execute(_REPLICA_LAG_SQL).fetchone()
+        conn.rollback()
+        return float(row["lag"] or 0)
+
+    def connect(self, connect_fn):
+        """Return a connection from ``connect_fn(index, dsn)`` for a usable replica, or None."""
+        for idx in self._order():
+            now = time.monotonic()
+            if self._down_until[idx] > now:
+                continue
+            fresh = (now - self._lag_checked[idx]) < self.lag_check_interval
+            if fresh and self._lag[idx] > self.max_lag:
+                self._count("lag_skips")
+                continue
+            conn = None
+            try:
+                conn = connect_fn(idx, self.dsns[idx])
+                if not fresh:
+                    self._lag[idx] = self._measure_lag(conn)
+                    self._lag_checked[idx] = now
+            except Exception:
+                self._down_until[idx] = now + self.cooldown
+                self._count("errors")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                continue
+            if self._lag[idx] > self.max_lag:
+                conn.close()
+                self._count("lag_skips")
+                continue
+            self._count("replica_reads")
+            return conn
+        self._count("primary_fallbacks")
+        return None
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+        now = time.monotonic()
+        out["replicas"] = [
+            {"lag_seconds": round(self._lag[i], 3), "down": self._down_until[i] > now}
+            for i in range(len(self.dsns))
+        ]
+        return out
+
+
+_REPLICA_ROUTER = None
+_REPLICA_ROUTER_KEY = None
+
+
+def _replica_dsns():
+    return [d.strip() for d in (os.getenv("POSTGRES_REPLICA_DSNS", "") or "").split(",") if d.strip()]
+
+
+def replicas_enabled() -> bool:
+    return postgres_enabled() and bool(_replica_dsns())
+
+
+def _replica_router():
+    global _REPLICA_ROUTER, _REPLICA_ROUTER_KEY
+    dsns = _replica_dsns()
+    if not dsns:
+        return None
+    key = tuple(dsns)
+    if _REPLICA_ROUTER is None or _REPLICA_ROUTER_KEY != key:
+        with _POOLS_LOCK:
+            if _REPLICA_ROUTER is None or _REPLICA_ROUTER_KEY != key:
+                _REPLICA_ROUTER = ReplicaRouter(
+                    dsns,
+                    max_lag=_env_float("POSTGRES_REPLICA_MAX_LAG_SECONDS", 5.0),
+                    lag_check_interval=_env_float("POSTGRES_REPLICA_LAG_CHECK_SECONDS", 5.0),
+                    cooldown=_env_float("POSTGRES_REPLICA_COOLDOWN_SECONDS", 30.0),
+                )
+                _REPLICA_ROUTER_KEY = key
+    return _REPLICA_ROUTER
+
+
+def replica_stats() -> dict:
+    router = _REPLICA_ROUTER
+    return router.stats() if router is not None else {}
+
+
+def _connect_replica(idx, dsn):
+    if pool_enabled():
+        return _get_pool(
+            ("postgres-replica", dsn),
+            f"postgres-replica-{idx}",
+            lambda: PostgresConnectionCompat(dsn, read_only=True),
+        ).acquire()
+    return PostgresConnectionCompat(dsn, read_only=True)
+
+
+def _before_fork():
+    # Stop writer threads first so the parent forks single-threaded; they
+    # restart lazily on the next submit.
+    with _POOLS_LOCK:
+        queues = list(_WRITE_QUEUES.values())
+    for wq in queues:
+        wq.stop()
+    close_pools()
+
+
+def _after_fork_in_child():
+    _reset_pools_after_fork()
+    if _REPLICA_ROUTER is not None:
+        _REPLICA_ROUTER.reset_after_fork()
+    for wq in list(_WRITE_QUEUES.values()):
+        wq.reset_after_fork()
+    for gate in list(_WRITE_GATES.values()):
+        gate.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    # Gunicorn --preload bootstraps in the master; workers must not share its sockets.
+    os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
+
+
 def postgres_enabled(dsn: str | None = None) -> bool:
     use_dsn = (dsn if dsn is not None else os.getenv("POSTGRES_DSN", "")).strip()
     return bool(use_dsn)
 
 
-def connect_db(path: str | None = None):
+def connect_db(path: str | None = None, readonly: bool = False):
+    """Open (or check out) a connection.
+
+    ``readonly=True`` routes to a PostgreSQL read replica from
+    POSTGRES_REPLICA_DSNS when one is healthy; otherwise it is the primary.
+    """
     dsn = (os.getenv("POSTGRES_DSN", "") or "").strip()
     if dsn:
         if psycopg is None:
             raise RuntimeError("POSTGRES_DSN is set but psycopg is not installed")
+        if readonly:
+            router = _replica_router()
+            conn = router.connect(_connect_replica) if router is not None else None
+            if conn is not None:
+                return conn
+        if pool_enabled():
+            return _get_pool(("postgres", dsn), "postgres", lambda: PostgresConnectionCompat(dsn)).acquire()
         return PostgresConnectionCompat(dsn)
     sqlite_path = path or os.getenv("DATABASE_PATH", "data/atlasbahamas.sqlite")
-    return SqliteConnectionCompat(sqlite_path, timeout=30)
+    if pool_enabled() and sqlite_path != ":memory:":
+        key = ("sqlite", os.path.abspath(sqlite_path))
+        return _get_pool(
+            key,
+            f"sqlite:{os.path.basename(sqlite_path)}",
+            lambda: SqliteConnectionCompat(
+                sqlite_path, timeout=30, check_same_thread=False, write_gate=sqlite_write_gate(sqlite_path)
+            ),
+        ).acquire()
+    return SqliteConnectionCompat(sqlite_path, timeout=30, write_gate=sqlite_write_gate(sqlite_path))
 
 
 class PostgresDB:
@@ -386,7 +1529,7 @@ class SqliteDB:
 
     @contextmanager
     def connect(self):
-        conn = SqliteConnectionCompat(self.path, timeout=15)
+        conn = SqliteConnectionCompat(self.path, timeout=15, write_gate=sqlite_write_gate(self.path))
         try:
             yield conn
             conn.commit()
@@ -0,0 +1,215 @@
+"""Node-local shared state for the login guard and rate limiter (GUARD_STATE_BACKEND=sqlite).
+
+Gunicorn workers on one host share one small SQLite file, so LOGIN_MAX_ATTEMPTS and
+RATE_LIMIT_RULES hold across all workers when Redis is not available. Active lockouts and
+refusals are also kept in a per-process front cache, so a client that is already locked out
+or throttled costs no file access.
+"""
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits(key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits(tat);
+CREATE TABLE IF NOT EXISTS login_failures(
+    username TEXT NOT NULL,
+    ip TEXT NOT NULL,
+    fail_count INTEGER NOT NULL,
+    first_ts REAL NOT NULL,
+    lock_until REAL NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY(username, ip)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_login_failures_expires ON login_failures(expires_at);
+"""
+
+
+class SqliteGuardStore:
+    """Same interface as core.LoginGuard plus RedisClient.rate_limit, backed by a shared file.
+
+    Login keys are (ip, username) tuples. Every write runs in a BEGIN IMMEDIATE transaction, so
+    concurrent workers serialize on the file lock instead of overwriting each other. Each process
+    keeps one connection behind a lock; every statement is a short indexed lookup, so threads
+    waiting for it cost less than opening a connection per thread.
+    """
+
+    FRONT_CACHE_SECONDS = 2.0
+    FRONT_CACHE_MAX = 10000
+
+    def __init__(self, path, max_attempts, track_seconds, lock_seconds, busy_timeout_ms=2000):
+        self.path = str(path)
+        self.max_attempts = max(1, int(max_attempts))
+        self.track_seconds = float(track_seconds)
+        self.lock_seconds = float(lock_seconds)
+        self.busy_timeout_ms = max(1, int(busy_timeout_ms))
+        self._conn_lock = threading.Lock()
+        self._conn_obj = None
+        self._conn_pid = None
+        self._front_lock = threading.Lock()
+        self._locked = {}  # (ip, username) -> (lock_until, trust_until)
+        self._refused = {}  # rate-limit key -> retry_at
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _conn(self):
+        # Called with _conn_lock held. One connection per process, reopened after a fork
+        # (gunicorn --preload); the schema and WAL mode are set up only when it is opened.
+        if self._conn_obj is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Guard state is disposable; losing the last writes on power loss only resets counters.
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+            self._conn_obj = conn
+            self._conn_pid = os.getpid()
+        return self._conn_obj
+
+    def _read(self, sql, params):
+        with self._conn_lock:
+            return self._conn().execute(sql, params).fetchone()
+
+    def _write(self, fn):
+        with self._conn_lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return out
+
+    def close(self):
+        with self._conn_lock:
+            if self._conn_obj is not None and self._conn_pid == os.getpid():
+                self._conn_obj.close()
+            self._conn_obj = None
+            self._conn_pid = None
+
+    def _front_put(self, table, key, value):
+        with self._front_lock:
+            if len(table) >= self.FRONT_CACHE_MAX:
+                table.clear()
+            table[key] = value
+
+    # -- rate limiting (GCRA, same arithmetic as core.rate_limit_check) --
+
+    def rate_limit(self, key, limit, window_seconds):
+        """Returns (allowed, retry_after_seconds)."""
+        now = time.time()
+        retry_at = self._refused.get(key)
+        if retry_at is not None and retry_at > now:
+            return False, max(1, math.ceil(retry_at - now))
+        limit = max(1, int(limit))
+        window_seconds = max(1, int(window_seconds))
+
+        def op(conn):
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key=?", (key,)).fetchone()
+            tat = max(row[0] if row else now, now)
+            new_tat = tat + window_seconds / limit
+            if new_tat - now > window_seconds + 1e-6:
+                return new_tat - now - window_seconds
+            conn.execute(
+                "INSERT INTO rate_limits(key,tat) VALUES(?,?) ON CONFLICT(key) DO UPDATE SET tat=excluded.tat",
+                (key, new_tat),
+            )
+            return 0.0
+
+        wait = self._write(op)
+        if wait > 0:
+            self._front_put(self._refused, key, now + wait)
+            return False, max(1, math.ceil(wait))
+        return True, 0
+
+    # -- login guard --
+
+    def check(self, key, now):
+        cached = self._locked.get(key)
+        if cached is not None and cached[0] > now and cached[1] > now:
+            return True, int(cached[0] - now)
+        ip, uname = key
+        row = self._read("SELECT first_ts,lock_until FROM login_failures WHERE username=? AND ip=?", (uname, ip))
+        if not row:
+            return False, 0
+        first_ts, lock_until = row
+        if lock_until and lock_until > now:
+            self._front_put(self._locked, key, (lock_until, now + self.FRONT_CACHE_SECONDS))
+            return True, int(lock_until - now)
+        if now - first_ts > self.track_seconds:
+            self._write(lambda conn: conn.execute(
+                "DELETE FROM login_failures WHERE username=? AND ip=? AND expires_at<=?", (uname, ip, now)
+            ))
+        return False, 0
+
+    def fail(self, key, now):
+        ip, uname = key
+
+        def op(conn):
+            row = conn.execute(
+                "SELECT fail_count,first_ts,lock_until FROM login_failures WHERE username=? AND ip=?", (uname, ip)
+            ).fetchone()
+            fail_count, first_ts, lock_until = row if row else (0, now, 0.0)
+            if now - first_ts > self.track_seconds:
+                fail_count, first_ts, lock_until = 0, now, 0.0
+            fail_count += 1
+            if fail_count >= self.max_attempts:
+                lock_until = now + self.lock_seconds
+            conn.execute(
+                "INSERT INTO login_failures(username,ip,fail_count,first_ts,lock_until,expires_at) VALUES(?,?,?,?,?,?) "
+                "ON CONFLICT(username,ip) DO UPDATE SET fail_count=excluded.fail_count,first_ts=excluded.first_ts,"
+                "lock_until=excluded.lock_until,expires_at=excluded.expires_at",
+                (uname, ip, fail_count, first_ts, lock_until, max(first_ts + self.track_seconds, lock_until)),
+            )
+            return lock_until
+
+        lock_until = self._write(op)
+        if lock_until > now:
+            self._front_put(self._locked, key, (lock_until, now + self.FRONT_CACHE_SECONDS))
+
+    def clear(self, key):
+        ip, uname = key
+        with self._front_lock:
+            self._locked.pop(key, None)
+        self._write(lambda conn: conn.execute("DELETE FROM login_failures WHERE username=? AND ip=?", (uname, ip)))
+
+    def user_status(self, uname, now):
+        row = self._read(
+            "SELECT MAX(lock_until),COALESCE(SUM(fail_count),0) FROM login_failures WHERE username=? AND expires_at>?",
+            (uname, now),
+        )
+        wait_s = max(0, int((row[0] or 0) - now))
+        return (wait_s > 0, wait_s, int(row[1] or 0))
+
+    def unlock_user(self, uname, now):
+        with self._front_lock:
+            for key in [k for k in self._locked if k[1] == uname]:
+                self._locked.pop(key, None)
+        # Other workers may keep refusing for up to FRONT_CACHE_SECONDS.
+        return self._write(lambda conn: conn.execute("DELETE FROM login_failures WHERE username=?", (uname,)).rowcount)
+
+    def snapshot(self, now):
+        row = self._read(
+            "SELECT COUNT(1),COALESCE(SUM(CASE WHEN lock_until>? THEN 1 ELSE 0 END),0),COALESCE(SUM(fail_count),0) "
+            "FROM login_failures WHERE expires_at>?",
+            (now, now),
+        )
+        return {"tracked": int(row[0]), "locked": int(row[1]), "fail_total": int(row[2])}
+
+    def expire(self, now=None):
+        now = time.time() if now is None else now
+
+        def op(conn):
+            conn.execute("DELETE FROM login_failures WHERE expires_at<=?", (now,))
+            conn.execute("DELETE FROM rate_limits WHERE tat<=?", (now,))
+
+        self._write(op)
+        with self._front_lock:
+            for table in (self._locked, self._refused):
+                for key in [k for k, v in table.items() if (v[0] if isinstance(v, tuple) else v) <= now]:
+                    table.pop(key, None)
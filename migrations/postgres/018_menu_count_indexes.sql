@@ -0,0 +1,20 @@
+-- AtlasBahamas PostgreSQL migration 018
+-- Composite indexes behind the single-query nav badge counts (menu_counts_for_user).
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_id, is_read);
+CREATE INDEX IF NOT EXISTS idx_maintenance_tenant_status ON maintenance_requests(tenant_account, status);
+CREATE INDEX IF NOT EXISTS idx_property_checks_prop_status ON property_checks(property_id, status);
+CREATE INDEX IF NOT EXISTS idx_payments_payer_status ON payments(payer_account, status);
+CREATE INDEX IF NOT EXISTS idx_tp_invites_prop_status ON tenant_property_invites(property_id, status);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+CREATE INDEX IF NOT EXISTS idx_inquiries_status ON inquiries(status);
+
+INSERT INTO schema_meta(key, value, updated_at)
+VALUES ('schema_version', '18', (to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00'))
+ON CONFLICT(key) DO UPDATE SET
+    value = EXCLUDED.value,
+    updated_at = EXCLUDED.updated_at;
+
+COMMIT;
@@ -0,0 +1,210 @@
+-- AtlasBahamas PostgreSQL migration 019
+-- Trigger-maintained dashboard_counters (one row per property owner, '*' for admins).
+-- Mirrors _sqlite_dashboard_counter_triggers() in atlasbahamas_app/core.py.
+-- Repair drift with: python tools/db_ops.py rebuild-counters
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS dashboard_counters(
+    owner_account TEXT PRIMARY KEY,
+    maintenance_open INTEGER NOT NULL DEFAULT 0,
+    maintenance_in_progress INTEGER NOT NULL DEFAULT 0,
+    checks_pending INTEGER NOT NULL DEFAULT 0,
+    listing_reviews INTEGER NOT NULL DEFAULT 0,
+    payments_submitted INTEGER NOT NULL DEFAULT 0,
+    invites_pending INTEGER NOT NULL DEFAULT 0
+);
+
+-- Active leases a tenant holds with an owner; '*' always weighs 1.
+CREATE OR REPLACE FUNCTION dashboard_counters_lease_weight(tenant TEXT, owner TEXT) RETURNS INTEGER AS $$
+    SELECT CASE WHEN owner = '*' THEN 1 ELSE (
+        SELECT COUNT(1)::INTEGER FROM tenant_leases l JOIN properties p ON p.id = l.property_id
+        WHERE l.tenant_account = tenant AND l.is_active = 1 AND p.owner_account = owner
+    ) END
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_owner_recount(owner TEXT) RETURNS VOID AS $$
+    UPDATE dashboard_counters SET
+        maintenance_open = (
+            SELECT COUNT(1) FROM maintenance_requests m
+            JOIN tenant_leases l ON l.tenant_account = m.tenant_account AND l.is_active = 1
+            JOIN properties p ON p.id = l.property_id
+            WHERE p.owner_account = owner AND m.status = 'open'
+        ),
+        maintenance_in_progress = (
+            SELECT COUNT(1) FROM maintenance_requests m
+            JOIN tenant_leases l ON l.tenant_account = m.tenant_account AND l.is_active = 1
+            JOIN properties p ON p.id = l.property_id
+            WHERE p.owner_account = owner AND m.status = 'in_progress'
+        ),
+        payments_submitted = (
+            SELECT COUNT(1) FROM payments
+            WHERE status = 'submitted' AND payer_account IN (
+                SELECT l.tenant_account FROM tenant_leases l JOIN properties p ON p.id = l.property_id
+                WHERE l.is_active = 1 AND p.owner_account = owner
+            )
+        )
+    WHERE owner_account = owner
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_property_checks() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status IN ('requested', 'scheduled') THEN
+        UPDATE dashboard_counters SET checks_pending = checks_pending - 1
+        WHERE owner_account = '*' OR owner_account = (SELECT owner_account FROM properties WHERE id = OLD.property_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status IN ('requested', 'scheduled') THEN
+        UPDATE dashboard_counters SET checks_pending = checks_pending + 1
+        WHERE owner_account = '*' OR owner_account = (SELECT owner_account FROM properties WHERE id = NEW.property_id);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_listing_requests() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'pending' THEN
+        UPDATE dashboard_counters SET listing_reviews = listing_reviews - 1
+        WHERE owner_account = '*' OR owner_account = (SELECT owner_account FROM properties WHERE id = OLD.property_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'pending' THEN
+        UPDATE dashboard_counters SET listing_reviews = listing_reviews + 1
+        WHERE owner_account = '*' OR owner_account = (SELECT owner_account FROM properties WHERE id = NEW.property_id);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_invites() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'pending' THEN
+        UPDATE dashboard_counters SET invites_pending = invites_pending - 1
+        WHERE owner_account = '*' OR owner_account = (SELECT owner_account FROM properties WHERE id = OLD.property_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'pending' THEN
+        UPDATE dashboard_counters SET invites_pending = invites_pending + 1
+        WHERE owner_account = '*' OR owner_account = (SELECT owner_account FROM properties WHERE id = NEW.property_id);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_payments() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'submitted' THEN
+        UPDATE dashboard_counters SET payments_submitted = payments_submitted - 1
+        WHERE owner_account = '*' OR owner_account IN (
+            SELECT p.owner_account FROM tenant_leases l JOIN properties p ON p.id = l.property_id
+            WHERE l.tenant_account = OLD.payer_account AND l.is_active = 1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'submitted' THEN
+        UPDATE dashboard_counters SET payments_submitted = payments_submitted + 1
+        WHERE owner_account = '*' OR owner_account IN (
+            SELECT p.owner_account FROM tenant_leases l JOIN properties p ON p.id = l.property_id
+            WHERE l.tenant_account = NEW.payer_account AND l.is_active = 1
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_maintenance() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status IN ('open', 'in_progress') THEN
+        UPDATE dashboard_counters dc SET
+            maintenance_open = dc.maintenance_open - (CASE WHEN OLD.status = 'open'
+                THEN dashboard_counters_lease_weight(OLD.tenant_account, dc.owner_account) ELSE 0 END),
+            maintenance_in_progress = dc.maintenance_in_progress - (CASE WHEN OLD.status = 'in_progress'
+                THEN dashboard_counters_lease_weight(OLD.tenant_account, dc.owner_account) ELSE 0 END)
+        WHERE dc.owner_account = '*' OR dc.owner_account IN (
+            SELECT p.owner_account FROM tenant_leases l JOIN properties p ON p.id = l.property_id
+            WHERE l.tenant_account = OLD.tenant_account AND l.is_active = 1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status IN ('open', 'in_progress') THEN
+        UPDATE dashboard_counters dc SET
+            maintenance_open = dc.maintenance_open + (CASE WHEN NEW.status = 'open'
+                THEN dashboard_counters_lease_weight(NEW.tenant_account, dc.owner_account) ELSE 0 END),
+            maintenance_in_progress = dc.maintenance_in_progress + (CASE WHEN NEW.status = 'in_progress'
+                THEN dashboard_counters_lease_weight(NEW.tenant_account, dc.owner_account) ELSE 0 END)
+        WHERE dc.owner_account = '*' OR dc.owner_account IN (
+            SELECT p.owner_account FROM tenant_leases l JOIN properties p ON p.id = l.property_id
+            WHERE l.tenant_account = NEW.tenant_account AND l.is_active = 1
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_leases() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM dashboard_counters_owner_recount(owner_account) FROM properties WHERE id = OLD.property_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM dashboard_counters_owner_recount(owner_account) FROM properties WHERE id = NEW.property_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counters_properties() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO dashboard_counters(owner_account) VALUES (NEW.owner_account) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_dc_property_checks ON property_checks;
+CREATE TRIGGER trg_dc_property_checks AFTER INSERT OR DELETE OR UPDATE OF status, property_id ON property_checks
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_property_checks();
+DROP TRIGGER IF EXISTS trg_dc_listing_requests ON listing_requests;
+CREATE TRIGGER trg_dc_listing_requests AFTER INSERT OR DELETE OR UPDATE OF status, property_id ON listing_requests
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_listing_requests();
+DROP TRIGGER IF EXISTS trg_dc_tenant_property_invites ON tenant_property_invites;
+CREATE TRIGGER trg_dc_tenant_property_invites AFTER INSERT OR DELETE OR UPDATE OF status, property_id ON tenant_property_invites
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_invites();
+DROP TRIGGER IF EXISTS trg_dc_payments ON payments;
+CREATE TRIGGER trg_dc_payments AFTER INSERT OR DELETE OR UPDATE OF status, payer_account ON payments
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_payments();
+DROP TRIGGER IF EXISTS trg_dc_maintenance ON maintenance_requests;
+CREATE TRIGGER trg_dc_maintenance AFTER INSERT OR DELETE OR UPDATE OF status, tenant_account ON maintenance_requests
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_maintenance();
+DROP TRIGGER IF EXISTS trg_dc_leases ON tenant_leases;
+CREATE TRIGGER trg_dc_leases AFTER INSERT OR DELETE OR UPDATE OF is_active, tenant_account, property_id ON tenant_leases
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_leases();
+DROP TRIGGER IF EXISTS trg_dc_properties ON properties;
+CREATE TRIGGER trg_dc_properties AFTER INSERT ON properties
+    FOR EACH ROW EXECUTE FUNCTION dashboard_counters_properties();
+
+-- Seed from current data; triggers keep it current from here on.
+DELETE FROM dashboard_counters;
+INSERT INTO dashboard_counters(owner_account, maintenance_open, maintenance_in_progress, checks_pending,
+                               listing_reviews, payments_submitted, invites_pending)
+SELECT '*',
+    (SELECT COUNT(1) FROM maintenance_requests WHERE status = 'open'),
+    (SELECT COUNT(1) FROM maintenance_requests WHERE status = 'in_progress'),
+    (SELECT COUNT(1) FROM property_checks WHERE status IN ('requested', 'scheduled')),
+    (SELECT COUNT(1) FROM listing_requests WHERE status = 'pending'),
+    (SELECT COUNT(1) FROM payments WHERE status = 'submitted'),
+    (SELECT COUNT(1) FROM tenant_property_invites WHERE status = 'pending');
+INSERT INTO dashboard_counters(owner_account)
+SELECT DISTINCT owner_account FROM properties;
+UPDATE dashboard_counters dc SET
+    checks_pending = (SELECT COUNT(1) FROM property_checks pc JOIN properties p ON p.id = pc.property_id
+                      WHERE p.owner_account = dc.owner_account AND pc.status IN ('requested', 'scheduled')),
+    listing_reviews = (SELECT COUNT(1) FROM listing_requests lr JOIN properties p ON p.id = lr.property_id
+                       WHERE p.owner_account = dc.owner_account AND lr.status = 'pending'),
+    invites_pending = (SELECT COUNT(1) FROM tenant_property_invites i JOIN properties p ON p.id = i.property_id
+                       WHERE p.owner_account = dc.owner_account AND i.status = 'pending')
+WHERE dc.owner_account <> '*';
+SELECT dashboard_counters_owner_recount(owner_account) FROM dashboard_counters WHERE owner_account <> '*';
+
+INSERT INTO schema_meta(key, value, updated_at)
+VALUES ('schema_version', '19', (to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00'))
+ON CONFLICT(key) DO UPDATE SET
+    value = EXCLUDED.value,
+    updated_at = EXCLUDED.updated_at;
+
+COMMIT;
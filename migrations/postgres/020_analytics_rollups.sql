@@ -0,0 +1,211 @@
+-- AtlasBahamas PostgreSQL migration 020
+-- Monthly rollups behind /manager/analytics, kept current by triggers.
+-- Mirrors _SQLITE_ROLLUP_TRIGGERS in atlasbahamas_app/core.py.
+-- Recompute with: python tools/db_ops.py rebuild-rollups
+
+BEGIN;
+
+ALTER TABLE payments ADD COLUMN IF NOT EXISTS property_id TEXT;
+ALTER TABLE maintenance_requests ADD COLUMN IF NOT EXISTS property_id TEXT;
+ALTER TABLE maintenance_requests ADD COLUMN IF NOT EXISTS closed_at TEXT;
+
+CREATE TABLE IF NOT EXISTS payment_monthly(
+    month TEXT NOT NULL,
+    property_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payments INTEGER NOT NULL DEFAULT 0,
+    amount INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(month, property_id, status)
+);
+CREATE TABLE IF NOT EXISTS maintenance_monthly(
+    month TEXT NOT NULL,
+    property_id TEXT NOT NULL,
+    opened INTEGER NOT NULL DEFAULT 0,
+    closed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(month, property_id)
+);
+CREATE TABLE IF NOT EXISTS maintenance_backlog(
+    property_id TEXT PRIMARY KEY,
+    open_count INTEGER NOT NULL DEFAULT 0,
+    created_days_sum REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS occupancy_monthly(
+    property_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    units_total INTEGER NOT NULL DEFAULT 0,
+    units_occupied INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(property_id, month)
+);
+CREATE INDEX IF NOT EXISTS idx_applications_created ON applications(created_at);
+CREATE INDEX IF NOT EXISTS idx_inquiries_created ON inquiries(created_at);
+CREATE INDEX IF NOT EXISTS idx_listing_requests_created ON listing_requests(created_at);
+
+CREATE OR REPLACE FUNCTION rollup_lease_property(tenant TEXT) RETURNS TEXT AS $$
+    SELECT COALESCE((
+        SELECT l.property_id FROM tenant_leases l
+        WHERE l.tenant_account = tenant AND l.is_active = 1
+        ORDER BY l.id DESC LIMIT 1
+    ), '')
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION rollup_epoch_days(ts TEXT) RETURNS DOUBLE PRECISION AS $$
+    SELECT EXTRACT(EPOCH FROM CAST(ts AS timestamptz)) / 86400.0
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION rollup_payments_before() RETURNS trigger AS $$
+BEGIN
+    IF NEW.payer_role = 'tenant' AND NEW.property_id IS NULL THEN
+        NEW.property_id := rollup_lease_property(NEW.payer_account);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_payments() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.property_id IS NOT NULL THEN
+        UPDATE payment_monthly SET payments = payments - 1, amount = amount - OLD.amount
+        WHERE month = substr(OLD.created_at, 1, 7) AND property_id = OLD.property_id AND status = OLD.status;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.property_id IS NOT NULL THEN
+        INSERT INTO payment_monthly(month, property_id, status, payments, amount)
+        VALUES (substr(NEW.created_at, 1, 7), NEW.property_id, NEW.status, 1, NEW.amount)
+        ON CONFLICT(month, property_id, status) DO UPDATE SET
+            payments = payment_monthly.payments + 1,
+            amount = payment_monthly.amount + EXCLUDED.amount;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_maintenance_before() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' AND NEW.property_id IS NULL THEN
+        NEW.property_id := rollup_lease_property(NEW.tenant_account);
+    END IF;
+    IF NEW.status = 'closed' AND (TG_OP = 'INSERT' OR OLD.status <> 'closed') THEN
+        NEW.closed_at := to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00';
+    ELSIF NEW.status <> 'closed' THEN
+        NEW.closed_at := NULL;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_maintenance() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.property_id IS NOT NULL THEN
+        IF TG_OP = 'DELETE' THEN
+            UPDATE maintenance_monthly SET opened = opened - 1
+            WHERE month = substr(OLD.created_at, 1, 7) AND property_id = OLD.property_id;
+        END IF;
+        IF OLD.closed_at IS NOT NULL AND (TG_OP = 'DELETE' OR NEW.status <> 'closed') THEN
+            UPDATE maintenance_monthly SET closed = closed - 1
+            WHERE month = substr(OLD.closed_at, 1, 7) AND property_id = OLD.property_id;
+        END IF;
+        IF OLD.status IN ('open', 'in_progress') AND (TG_OP = 'DELETE' OR NEW.status = 'closed') THEN
+            UPDATE maintenance_backlog SET
+                open_count = open_count - 1,
+                created_days_sum = created_days_sum - rollup_epoch_days(OLD.created_at)
+            WHERE property_id = OLD.property_id;
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.property_id IS NOT NULL THEN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO maintenance_monthly(month, property_id, opened, closed)
+            VALUES (substr(NEW.created_at, 1, 7), NEW.property_id, 1, 0)
+            ON CONFLICT(month, property_id) DO UPDATE SET opened = maintenance_monthly.opened + 1;
+        END IF;
+        IF NEW.status = 'closed' AND (TG_OP = 'INSERT' OR OLD.status <> 'closed') THEN
+            INSERT INTO maintenance_monthly(month, property_id, opened, closed)
+            VALUES (substr(NEW.closed_at, 1, 7), NEW.property_id, 0, 1)
+            ON CONFLICT(month, property_id) DO UPDATE SET closed = maintenance_monthly.closed + 1;
+        END IF;
+        IF NEW.status IN ('open', 'in_progress') AND (TG_OP = 'INSERT' OR OLD.status = 'closed') THEN
+            INSERT INTO maintenance_backlog(property_id, open_count, created_days_sum)
+            VALUES (NEW.property_id, 1, rollup_epoch_days(NEW.created_at))
+            ON CONFLICT(property_id) DO UPDATE SET
+                open_count = maintenance_backlog.open_count + 1,
+                created_days_sum = maintenance_backlog.created_days_sum + EXCLUDED.created_days_sum;
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_units() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO occupancy_monthly(property_id, month, units_total, units_occupied)
+    SELECT p.id, to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM'),
+        (SELECT COUNT(1) FROM units WHERE property_id = p.id),
+        (SELECT COUNT(1) FROM units WHERE property_id = p.id AND is_occupied = 1)
+    FROM properties p
+    WHERE p.id IN (
+        CASE WHEN TG_OP <> 'INSERT' THEN OLD.property_id END,
+        CASE WHEN TG_OP <> 'DELETE' THEN NEW.property_id END
+    )
+    ON CONFLICT(property_id, month) DO UPDATE SET
+        units_total = EXCLUDED.units_total,
+        units_occupied = EXCLUDED.units_occupied;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rollup_payments_before ON payments;
+CREATE TRIGGER trg_rollup_payments_before BEFORE INSERT ON payments
+    FOR EACH ROW EXECUTE FUNCTION rollup_payments_before();
+DROP TRIGGER IF EXISTS trg_rollup_payments ON payments;
+CREATE TRIGGER trg_rollup_payments AFTER INSERT OR DELETE OR UPDATE OF status, amount ON payments
+    FOR EACH ROW EXECUTE FUNCTION rollup_payments();
+DROP TRIGGER IF EXISTS trg_rollup_maintenance_before ON maintenance_requests;
+CREATE TRIGGER trg_rollup_maintenance_before BEFORE INSERT OR UPDATE OF status ON maintenance_requests
+    FOR EACH ROW EXECUTE FUNCTION rollup_maintenance_before();
+DROP TRIGGER IF EXISTS trg_rollup_maintenance ON maintenance_requests;
+CREATE TRIGGER trg_rollup_maintenance AFTER INSERT OR DELETE OR UPDATE OF status ON maintenance_requests
+    FOR EACH ROW EXECUTE FUNCTION rollup_maintenance();
+DROP TRIGGER IF EXISTS trg_rollup_units ON units;
+CREATE TRIGGER trg_rollup_units AFTER INSERT OR DELETE OR UPDATE OF is_occupied, property_id ON units
+    FOR EACH ROW EXECUTE FUNCTION rollup_units();
+
+-- Backfill: attribute existing rows to the tenant's current lease, then aggregate.
+UPDATE payments SET property_id = rollup_lease_property(payer_account)
+WHERE property_id IS NULL AND payer_role = 'tenant';
+UPDATE maintenance_requests SET property_id = rollup_lease_property(tenant_account)
+WHERE property_id IS NULL;
+UPDATE maintenance_requests SET closed_at = COALESCE(updated_at, created_at)
+WHERE status = 'closed' AND closed_at IS NULL;
+
+DELETE FROM payment_monthly;
+INSERT INTO payment_monthly(month, property_id, status, payments, amount)
+SELECT substr(created_at, 1, 7), property_id, status, COUNT(1), COALESCE(SUM(amount), 0)
+FROM payments WHERE payer_role = 'tenant' AND property_id IS NOT NULL
+GROUP BY substr(created_at, 1, 7), property_id, status;
+
+DELETE FROM maintenance_monthly;
+INSERT INTO maintenance_monthly(month, property_id, opened, closed)
+SELECT month, property_id, SUM(opened), SUM(closed) FROM (
+    SELECT substr(created_at, 1, 7) AS month, property_id, 1 AS opened, 0 AS closed FROM maintenance_requests
+    UNION ALL
+    SELECT substr(closed_at, 1, 7), property_id, 0, 1 FROM maintenance_requests WHERE closed_at IS NOT NULL
+) x GROUP BY month, property_id;
+
+DELETE FROM maintenance_backlog;
+INSERT INTO maintenance_backlog(property_id, open_count, created_days_sum)
+SELECT property_id, COUNT(1), COALESCE(SUM(rollup_epoch_days(created_at)), 0)
+FROM maintenance_requests WHERE status IN ('open', 'in_progress') GROUP BY property_id;
+
+INSERT INTO occupancy_monthly(property_id, month, units_total, units_occupied)
+SELECT p.id, to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM'), COUNT(u.id),
+    COALESCE(SUM(CASE WHEN u.is_occupied = 1 THEN 1 ELSE 0 END), 0)
+FROM properties p LEFT JOIN units u ON u.property_id = p.id GROUP BY p.id
+ON CONFLICT(property_id, month) DO UPDATE SET
+    units_total = EXCLUDED.units_total,
+    units_occupied = EXCLUDED.units_occupied;
+
+INSERT INTO schema_meta(key, value, updated_at)
+VALUES ('schema_version', '20', (to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00'))
+ON CONFLICT(key) DO UPDATE SET
+    value = EXCLUDED.value,
+    updated_at = EXCLUDED.updated_at;
+
+COMMIT;
@@ -0,0 +1,54 @@
+-- AtlasBahamas PostgreSQL migration 021
+-- Paid tenant rent per payer and month for /manager/rent-roll, kept current by triggers.
+-- Mirrors the trg_rollup_rent_paid_* triggers in atlasbahamas_app/core.py.
+-- Recompute with: python tools/db_ops.py rebuild-rollups
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS rent_payer_monthly(
+    payer_account TEXT NOT NULL,
+    month TEXT NOT NULL,
+    paid_amount INTEGER NOT NULL DEFAULT 0,
+    last_paid_at TEXT,
+    PRIMARY KEY(payer_account, month)
+);
+
+CREATE OR REPLACE FUNCTION rollup_rent_payer_recount(payer TEXT, mon TEXT) RETURNS void AS $$
+    INSERT INTO rent_payer_monthly(payer_account, month, paid_amount, last_paid_at)
+    SELECT payer, mon, COALESCE(SUM(amount), 0), MAX(created_at) FROM payments
+    WHERE payer_account = payer AND status = 'paid' AND payer_role = 'tenant'
+        AND payment_type = 'rent' AND substr(created_at, 1, 7) = mon
+    ON CONFLICT(payer_account, month) DO UPDATE SET
+        paid_amount = EXCLUDED.paid_amount,
+        last_paid_at = EXCLUDED.last_paid_at
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION rollup_rent_paid() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.payer_role = 'tenant' AND OLD.payment_type = 'rent' THEN
+        PERFORM rollup_rent_payer_recount(OLD.payer_account, substr(OLD.created_at, 1, 7));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.payer_role = 'tenant' AND NEW.payment_type = 'rent' THEN
+        PERFORM rollup_rent_payer_recount(NEW.payer_account, substr(NEW.created_at, 1, 7));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rollup_rent_paid ON payments;
+CREATE TRIGGER trg_rollup_rent_paid AFTER INSERT OR DELETE OR UPDATE OF status, amount, payer_account, created_at ON payments
+    FOR EACH ROW EXECUTE FUNCTION rollup_rent_paid();
+
+DELETE FROM rent_payer_monthly;
+INSERT INTO rent_payer_monthly(payer_account, month, paid_amount, last_paid_at)
+SELECT payer_account, substr(created_at, 1, 7), COALESCE(SUM(amount), 0), MAX(created_at)
+FROM payments WHERE status = 'paid' AND payer_role = 'tenant' AND payment_type = 'rent'
+GROUP BY payer_account, substr(created_at, 1, 7);
+
+INSERT INTO schema_meta(key, value, updated_at)
+VALUES ('schema_version', '21', (to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00'))
+ON CONFLICT(key) DO UPDATE SET
+    value = EXCLUDED.value,
+    updated_at = EXCLUDED.updated_at;
+
+COMMIT;
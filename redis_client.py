@@ -2,8 +2,8 @@
 from __future__ import annotations
 
 import json
+import math
 import os
-import time
 
 try:
     import redis
@@ -11,10 +11,30 @@ except Exception:  # pragma: no cover - optional during migration
     redis = None
 
 
+# Generic cell rate algorithm: the key holds the theoretical arrival time (TAT). Each allowed
+# request moves it window/limit seconds further out; a request is refused while that would put
+# the TAT more than one window past now. Returns {allowed, retry_after_seconds}.
+_GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + window / limit
+if new_tat - now > window + 0.000001 then
+    return {0, tostring(new_tat - now - window)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
 class RedisClient:
     def __init__(self, url: str | None = None):
         self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self._client = None
+        self._rate_limit_script = None
         if redis is not None:
             try:
                 self._client = redis.Redis.from_url(self.url, decode_responses=True)
@@ -84,6 +104,61 @@ class RedisClient:
         except Exception:
             return None
 
+    def get_many_json(self, keys: list[str]) -> list:
+        """MGET: one round trip, None for missing or undecodable keys."""
+        if not self.enabled or not keys:
+            return [None] * len(keys or [])
+        try:
+            raws = self._client.mget(keys)
+        except Exception:
+            return [None] * len(keys)
+        out = []
+        for raw in raws:
+            try:
+                out.append(json.loads(raw) if raw else None)
+            except Exception:
+                out.append(None)
+        return out
+
+    def set_many_json(self, items: list[tuple[str, object, int]]) -> bool:
+        """Pipelined SET of (key, value, ttl_seconds) triples; ttl 0 keeps the key without expiry."""
+        commands = []
+        for key, value, ttl_seconds in items:
+            cmd = ("SET", key, json.dumps(value))
+            commands.append(cmd + ("EX", int(ttl_seconds)) if ttl_seconds and int(ttl_seconds) > 0 else cmd)
+        replies = self.pipeline(commands)
+        return replies is not None and all(replies)
+
+    def set_members(self, key: str) -> set[str]:
+        if not self.enabled:
+            return set()
+        try:
+            return set(self._client.smembers(key) or ())
+        except Exception:
+            return set()
+
+    def incr(self, key: str) -> int:
+        if not self.enabled:
+            return 0
+        try:
+            return int(self._client.incr(key))
+        except Exception:
+            return 0
+
+    def pipeline(self, commands: list[tuple]) -> list | None:
+        """Runs [(command, *args), ...] in one round trip (no MULTI); None on error."""
+        if not self.enabled:
+            return None
+        if not commands:
+            return []
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for cmd in commands:
+                pipe.execute_command(*cmd)
+            return pipe.execute()
+        except Exception:
+            return None
+
     def delete(self, key: str) -> bool:
         if not self.enabled:
             return False
@@ -97,7 +172,7 @@ class RedisClient:
         if not self.enabled or not keys:
             return 0
         try:
-            return int(self._client.delete(*keys))
+            return int(self._client.unlink(*keys))
         except Exception:
             return 0
 
@@ -110,27 +185,27 @@ class RedisClient:
             for key in self._client.scan_iter(match=f"{prefix}*"):
                 chunk.append(key)
                 if len(chunk) >= max(1, int(batch_size)):
-                    removed += int(self._client.delete(*chunk))
+                    removed += int(self._client.unlink(*chunk))
                     chunk = []
             if chunk:
-                removed += int(self._client.delete(*chunk))
+                removed += int(self._client.unlink(*chunk))
         except Exception:
             return removed
         return removed
 
     def rate_limit(self, key: str, limit: int, window_seconds: int) -> tuple[bool, int]:
-        """Returns (allowed, retry_after_seconds)."""
+        """Returns (allowed, retry_after_seconds). GCRA in one script call, on the Redis clock."""
         if not self.enabled:
             return True, 0
         try:
-            bucket = f"rl:{key}:{int(time.time() // max(1, window_seconds))}"
-            count = self._client.incr(bucket)
-            if count == 1:
-                self._client.expire(bucket, max(1, window_seconds))
-            if count > limit:
-                ttl = self._client.ttl(bucket)
-                return False, max(1, int(ttl if ttl and ttl > 0 else window_seconds))
-            return True, 0
+            if self._rate_limit_script is None:
+                self._rate_limit_script = self._client.register_script(_GCRA_SCRIPT)
+            allowed, retry_after = self._rate_limit_script(
+                keys=[f"rl:{key}"], args=[max(1, int(limit)), max(1, int(window_seconds))]
+            )
+            if int(allowed):
+                return True, 0
+            return False, max(1, math.ceil(float(retry_after)))
         except Exception:
             return True, 0
 
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+import db  # noqa: E402
+
+
+def check_pool(tmp_dir):
+    checks = {}
+    path = str(Path(tmp_dir) / "pool.sqlite")
+    pool = db.ConnectionPool(
+        lambda: db.SqliteConnectionCompat(path, timeout=5, check_same_thread=False),
+        name="test",
+        min_size=1,
+        max_size=2,
+        timeout=0.3,
+        max_lifetime=3600,
+        health_check_idle=0,
+    )
+    pool.prefill()
+    checks["prefill"] = pool.stats()["idle"] == 1
+
+    c = pool.acquire()
+    c.execute("CREATE TABLE t(id INTEGER PRIMARY KEY, v TEXT)")
+    c.commit()
+    c.execute("INSERT INTO t(v) VALUES('uncommitted')")
+    c.close()
+    c = pool.acquire()
+    checks["release_rolls_back"] = c.execute("SELECT COUNT(*) AS n FROM t").fetchone()["n"] == 0
+    c.close()
+    checks["connection_reused"] = pool.stats()["created"] == 1
+
+    a = pool.acquire()
+    b = pool.acquire()
+    try:
+        pool.acquire()
+        checks["timeout_when_exhausted"] = False
+    except db.PoolTimeout:
+        checks["timeout_when_exhausted"] = pool.stats()["timeouts"] == 1
+
+    def _late_release():
+        time.sleep(0.1)
+        b.close()
+
+    threading.Thread(target=_late_release).start()
+    waited = pool.acquire()
+    stats = pool.stats()
+    checks["wait_metrics"] = stats["waits"] == 1 and stats["wait_ms_max"] > 0
+    waited.close()
+    a.close()
+
+    created = pool.stats()["created"]
+    leaked = pool.acquire()
+    del leaked
+    again = pool.acquire()
+    checks["leaked_connection_recovered"] = pool.stats()["created"] == created
+    again.close()
+
+    pool.max_lifetime = 0.01
+    time.sleep(0.02)
+    c = pool.acquire()
+    c.close()
+    checks["max_lifetime_recycles"] = pool.stats()["recycled"] >= 1
+    pool.close_idle()
+    checks["close_idle"] = pool.stats()["size"] == 0
+    return checks
+
+
+def check_stream(tmp_dir):
+    checks = {}
+    c = db.SqliteConnectionCompat(str(Path(tmp_dir) / "stream.sqlite"))
+    c.execute("CREATE TABLE t(id INTEGER PRIMARY KEY, v TEXT)")
+    c.executemany("INSERT INTO t(v) VALUES(?)", [(f"v{i}",) for i in range(25)])
+    c.commit()
+    rows = c.stream("SELECT id,v FROM t WHERE id>? ORDER BY id", (5,), batch_size=4)
+    first = next(rows)
+    checks["stream_lazy"] = first["v"] == "v5"
+    checks["stream_all_rows"] = [r["id"] for r in rows] == list(range(7, 26))
+    checks["stream_batch_default"] = db.stream_batch_size() >= 1 and db.stream_batch_size(0) == 1
+    c.close()
+    return checks
+
+
+def check_query_stats():
+    checks = {}
+    c = db.SqliteConnectionCompat(":memory:")
+    c.execute("CREATE TABLE t(id INTEGER PRIMARY KEY, v TEXT)")
+    stats = db.start_query_stats()
+    for i in range(12):
+        c.execute("SELECT v FROM t WHERE id=?", (i,)).fetchone()
+    c.execute("SELECT v FROM t WHERE id IN (?,?,?) AND v='x'", (1, 2, 3)).fetchall()
+    list(c.stream("SELECT id FROM t"))
+    finished = db.stop_query_stats()
+    c.execute("SELECT 1")
+    c.close()
+    checks["query_stats_count"] = finished is stats and stats.count == 14 and db.current_query_stats() is None
+    repeated = stats.repeated(10)
+    checks["query_stats_repeated"] = len(repeated) == 1 and repeated[0]["count"] == 12
+    checks["query_stats_fingerprint"] = db.sql_fingerprint("SELECT v FROM t WHERE id IN (?, ?) AND v='x' LIMIT 50") == "SELECT v FROM t WHERE id IN (...) AND v=? LIMIT ?"
+    checks["query_stats_slowest"] = len(stats.slowest()) == 5 and stats.summary()["distinct"] == 3
+    return checks
+
+
+def check_write_queue(tmp_dir):
+    checks = {}
+    path = str(Path(tmp_dir) / "writes.sqlite")
+    setup = db.SqliteConnectionCompat(path)
+    setup.execute("CREATE TABLE t(id INTEGER PRIMARY KEY, v TEXT UNIQUE)")
+    setup.commit()
+    setup.close()
+    wq = db.SqliteWriteQueue(lambda: db.SqliteConnectionCompat(path, check_same_thread=False), name="test", max_pending=100)
+
+    gate = threading.Event()
+    blocker = wq.submit(lambda c: gate.wait(2))
+    futures = [wq.submit(lambda c, i=i: c.execute("INSERT INTO t(v) VALUES(?)", (f"v{i}",)).lastrowid) for i in range(20)]
+    dup = wq.submit(lambda c: c.execute("INSERT INTO t(v) VALUES('v0')"))
+    undone = wq.submit(lambda c: (c.execute("INSERT INTO t(v) VALUES('undone')"), c.rollback()))
+    gate.set()
+    blocker.result(5)
+    ids = [f.result(5) for f in futures]
+    checks["write_queue_results"] = len(set(ids)) == 20
+    try:
+        dup.result(5)
+        checks["write_queue_failure_isolated"] = False
+    except sqlite3.IntegrityError:
+        checks["write_queue_failure_isolated"] = True
+    undone.result(5)
+    reader = db.SqliteConnectionCompat(path)
+    checks["write_queue_committed"] = reader.execute("SELECT COUNT(*) AS n FROM t").fetchone()["n"] == 20
+    reader.close()
+    stats = wq.stats()
+    checks["write_queue_group_commit"] = stats["batches"] < stats["committed"] and stats["failed"] == 1
+
+    small = db.SqliteWriteQueue(lambda: db.SqliteConnectionCompat(path, check_same_thread=False), name="small", max_pending=1, put_timeout=0.05)
+    gate.clear()
+    small.submit(lambda c: gate.wait(2))
+    time.sleep(0.05)
+    small.submit(lambda c: None)
+    try:
+        small.submit(lambda c: None)
+        checks["write_queue_bounded"] = False
+    except db.WriteQueueFull:
+        checks["write_queue_bounded"] = small.stats()["rejected"] == 1
+    gate.set()
+    wq.stop()
+    small.stop()
+    return checks
+
+
+def _contended_writes(path, gate):
+    """Queue jobs and direct handler-style transactions writing at the same time."""
+
+    def connect():
+        conn = db.SqliteConnectionCompat(path, check_same_thread=False, write_gate=gate)
+        # No busy handler: any SQLite-level lock contention surfaces immediately.
+        conn.execute("PRAGMA busy_timeout=0")
+        return conn
+
+    wq = db.SqliteWriteQueue(connect, name="mixed", max_pending=500)
+    errors = []
+
+    def handler(n):
+        conn = connect()
+        try:
+            for i in range(10):
+                try:
+                    conn.execute("SELECT COUNT(*) FROM t").fetchone()
+                    conn.execute("INSERT INTO t(v) VALUES(?)", (f"h{n}-{i}",))
+                    time.sleep(0.003)
+                    conn.commit()
+                except sqlite3.OperationalError as e:
+                    errors.append(str(e))
+                    conn.rollback()
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=handler, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    futures = [wq.submit(lambda c, i=i: c.execute("INSERT INTO t(v) VALUES(?)", (f"q{i}",))) for i in range(60)]
+    for f in futures:
+        try:
+            f.result(10)
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+    for t in threads:
+        t.join(10)
+    wq.stop()
+    return errors
+
+
+def check_write_gate(tmp_dir):
+    checks = {}
+    path = str(Path(tmp_dir) / "gate.sqlite")
+    setup = db.SqliteConnectionCompat(path)
+    setup.execute("CREATE TABLE t(id INTEGER PRIMARY KEY, v TEXT UNIQUE)")
+    setup.commit()
+    setup.close()
+
+    ungated = _contended_writes(path, None)
+    checks["write_gate_control_contends"] = any("locked" in e for e in ungated)
+
+    setup = db.SqliteConnectionCompat(path)
+    setup.execute("DELETE FROM t")
+    setup.commit()
+    gate = db.SqliteWriteGate(timeout=5)
+    errors = _contended_writes(path, gate)
+    checks["write_gate_no_lock_errors"] = errors == []
+    checks["write_gate_all_committed"] = setup.execute("SELECT COUNT(*) AS n FROM t").fetchone()["n"] == 120
+    checks["write_gate_waits"] = gate.stats()["gate_waits"] > 0
+    setup.close()
+
+    conn = db.SqliteConnectionCompat(path, write_gate=gate)
+    conn.execute("SELECT COUNT(*) FROM t").fetchone()
+    free_after_read = gate._lock.acquire(blocking=False)
+    if free_after_read:
+        gate.release()
+    conn.execute("INSERT INTO t(v) VALUES('left-open')")
+    held = not gate._lock.acquire(blocking=False)
+    conn.close()
+    checks["write_gate_held_for_transaction"] = free_after_read and held
+    checks["write_gate_released_on_close"] = gate._lock.acquire(blocking=False)
+    gate.release()
+
+    takes = db._sqlite_takes_write_lock
+    checks["write_gate_detects_writes"] = all(takes(sql) for sql in (
+        "  insert into t(v) values('x')",
+        "-- audit\n/* bulk */ UPDATE t SET v='y'",
+        "WITH old AS (SELECT id FROM t WHERE v='(') DELETE FROM t WHERE id IN (SELECT id FROM old)",
+        "WITH RECURSIVE n(i) AS (VALUES(1) UNION ALL SELECT i+1 FROM n WHERE i<3) INSERT INTO t(v) SELECT i FROM n",
+        "BEGIN IMMEDIATE",
+    )) and not any(takes(sql) for sql in (
+        "SELECT 'insert' FROM t",
+        "-- UPDATE t\nSELECT 1",
+        "WITH a(x) AS (SELECT 'update') SELECT x FROM a",
+        "WITH \"insert\" AS (SELECT 1) SELECT * FROM \"insert\"",
+        "BEGIN",
+    ))
+
+    old = os.environ.get("SQLITE_WRITE_QUEUE")
+    try:
+        os.environ["SQLITE_WRITE_QUEUE"] = "0"
+        off = db.sqlite_write_gate(path)
+        os.environ["SQLITE_WRITE_QUEUE"] = "1"
+        shared = db.sqlite_write_gate(path)
+        checks["write_gate_env"] = off is None and shared is not None and db.sqlite_write_gate(path) is shared
+    finally:
+        if old is None:
+            os.environ.pop("SQLITE_WRITE_QUEUE", None)
+        else:
+            os.environ["SQLITE_WRITE_QUEUE"] = old
+    return checks
+
+
+class _FakeReplica:
+    def __init__(self, lag):
+        self.lag = lag
+        self.closed = False
+
+    def execute(self, sql, params=()):
+        return db.PostgresCursorCompat(_FakeCursor(["lag"], [(self.lag,)]))
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def check_replica_router():
+    checks = {}
+    lags = {"r1": 0.0, "r2": 0.0, "r3": 60.0}
+    down = set()
+
+    def connect(idx, dsn):
+        if dsn in down:
+            raise OSError("replica unreachable")
+        return _FakeReplica(lags[dsn])
+
+    router = db.ReplicaRouter(["r1", "r2", "r3"], max_lag=5, lag_check_interval=60, cooldown=60)
+    picked = [router.connect(connect).lag for _ in range(6)]
+    checks["replica_round_robin"] = picked == [0.0] * 6 and router.stats()["replica_reads"] == 6
+    checks["replica_lag_skip"] = router.stats()["lag_skips"] >= 2
+    down.update(("r1", "r2"))
+    router._lag_checked = [float("-inf")] * 3
+    checks["replica_primary_fallback"] = router.connect(connect) is None and router.stats()["primary_fallbacks"] == 1
+    down.clear()
+    checks["replica_cooldown"] = router.connect(connect) is None and router.stats()["errors"] == 2
+    return checks
+
+
+def check_translation_cache():
+    checks = {}
+    sql = "SELECT id FROM users WHERE created_at>=datetime('now','-7 days') AND id=?"
+    before = db.sql_translation_cache_stats()
+    first = db._translate_sql(sql, (1,))
+    second = db._translate_sql(sql, (2,))
+    after = db.sql_translation_cache_stats()
+    checks["translation_placeholders"] = "%s" in first[0] and "?" not in first[0]
+    checks["translation_params_pass_through"] = first[1] == (1,) and second[1] == (2,) and first[0] == second[0]
+    checks["translation_cache_hit"] = after["hits"] - before["hits"] == 1 and after["misses"] - before["misses"] == 1
+    pragma_sql, pragma_params = db._translate_sql("PRAGMA table_info(users)", ("ignored",))
+    checks["translation_pragma_params"] = pragma_params == ("users", "users") and "information_schema" in pragma_sql
+    return checks
+
+
+class _FakeColumn:
+    def __init__(self, name):
+        self.name = name
+
+    def __getitem__(self, idx):
+        return (self.name,)[idx]
+
+
+class _FakeCursor:
+    def __init__(self, names, rows):
+        self.description = [_FakeColumn(n) for n in names]
+        self.rowcount = len(rows)
+        self._rows = list(rows)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+def check_compat_rows():
+    checks = {}
+    cur = db.PostgresCursorCompat(_FakeCursor(["id", "name"], [(1, "a"), (2, "b"), (3, "c")]))
+    first = cur.fetchone()
+    rest = cur.fetchall()
+    checks["row_access"] = first["name"] == "a" and first[0] == 1 and first.keys() == ["id", "name"]
+    checks["row_dict"] = dict(rest[0]) == {"id": 2, "name": "b"} and rest[1].get("missing") is None
+    checks["row_membership"] = "id" in first and "missing" not in first
+    checks["row_shared_index"] = first._index is rest[0]._index is rest[1]._index
+    try:
+        first["missing"]
+        checks["row_missing_key"] = False
+    except KeyError:
+        checks["row_missing_key"] = True
+    return checks
+
+
+class _StubPsycopg:
+    class _Conn:
+        closed = False
+        read_only = False
+        prepare_threshold = 5
+        prepared_max = 100
+
+    def connect(self, dsn):
+        self.dsn = dsn
+        return self._Conn()
+
+
+def check_prepare_settings():
+    checks = {}
+    real, saved = db.psycopg, {k: os.environ.get(k) for k in ("POSTGRES_PREPARE_THRESHOLD", "POSTGRES_PREPARED_MAX")}
+    db.psycopg = _StubPsycopg()
+    try:
+        os.environ["POSTGRES_PREPARE_THRESHOLD"] = "0"
+        os.environ["POSTGRES_PREPARED_MAX"] = "64"
+        conn = db.PostgresConnectionCompat("postgresql://stub", read_only=True)._conn
+        checks["prepare_env_applied"] = conn.prepare_threshold == 0 and conn.prepared_max == 64 and conn.read_only
+        os.environ["POSTGRES_PREPARE_THRESHOLD"] = "off"
+        checks["prepare_disabled"] = db.PostgresConnectionCompat("postgresql://stub")._conn.prepare_threshold is None
+        for key in saved:
+            os.environ.pop(key, None)
+        # Threshold keeps psycopg's 5; prepared_max overrides psycopg's 100 on purpose.
+        conn = db.PostgresConnectionCompat("postgresql://stub")._conn
+        checks["prepare_defaults"] = conn.prepare_threshold == 5 and conn.prepared_max == 256
+    finally:
+        db.psycopg = real
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return checks
+
+
+def main():
+    checks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checks.update(check_pool(tmp_dir))
+        checks.update(check_stream(tmp_dir))
+        checks.update(check_write_queue(tmp_dir))
+        checks.update(check_write_gate(tmp_dir))
+    checks.update(check_query_stats())
+    checks.update(check_replica_router())
+    checks.update(check_translation_cache())
+    checks.update(check_compat_rows())
+    checks.update(check_prepare_settings())
+    print("DB_COMPAT_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from guard_store import SqliteGuardStore  # noqa: E402
+
+
+def _store(path):
+    return SqliteGuardStore(path, max_attempts=5, track_seconds=900, lock_seconds=600)
+
+
+def _worker_rate_limit(path, calls, out):
+    store = _store(path)
+    out.put(sum(1 for _ in range(calls) if store.rate_limit("login:1.2.3.4:probe", 12, 60)[0]))
+
+
+def _worker_fail(path, out):
+    store = _store(path)
+    now = time.time()
+    for _ in range(3):
+        store.fail(("1.2.3.4", "probe"), now)
+    out.put(True)
+
+
+def check_cross_process(path):
+    checks = {}
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker_rate_limit, args=(path, 10, out)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    allowed = sum(out.get(timeout=30) for _ in procs)
+    for p in procs:
+        p.join(timeout=30)
+    # 40 attempts from 4 processes still share one budget of 12 per minute.
+    checks["rate_limit_shared"] = allowed == 12
+    procs = [ctx.Process(target=_worker_fail, args=(path, out)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        out.get(timeout=30)
+    for p in procs:
+        p.join(timeout=30)
+    store = _store(path)
+    locked, wait_s = store.check(("1.2.3.4", "probe"), time.time())
+    checks["login_lock_shared"] = locked and wait_s > 500
+    return checks
+
+
+def check_login_guard(path):
+    checks = {}
+    store = _store(path)
+    now = time.time()
+    store.fail(("5.5.5.5", "alice"), now)
+    store.fail(("6.6.6.6", "alice"), now)
+    checks["status_totals"] = store.user_status("alice", now) == (False, 0, 2)
+    checks["snapshot"] = store.snapshot(now)["fail_total"] >= 2
+    checks["window_expiry"] = store.user_status("alice", now + 901) == (False, 0, 0)
+    checks["unlock"] = store.unlock_user("probe", now) == 1 and not store.check(("1.2.3.4", "probe"), now)[0]
+    store.clear(("5.5.5.5", "alice"))
+    checks["clear"] = store.user_status("alice", now)[2] == 1
+    store.expire(now + 2000)
+    checks["expire"] = store.snapshot(now)["tracked"] == 0
+    return checks
+
+
+def check_threads(path):
+    checks = {}
+    store = _store(path)
+    store.rate_limit("warmup", 1, 60)
+    conn = store._conn_obj
+    allowed = []
+
+    def worker():
+        allowed.append(sum(1 for _ in range(10) if store.rate_limit("search:9.9.9.9", 12, 60)[0]))
+
+    # One short-lived thread per request, as under the WSGI adapter.
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    checks["threads_share_budget"] = sum(allowed) == 12
+    checks["threads_share_connection"] = store._conn_obj is conn
+    store.close()
+    return checks
+
+
+def _core(tmp):
+    # Imported lazily: the spawned rate-limit workers re-import this module.
+    os.environ["DATABASE_PATH"] = str(Path(tmp) / "core.sqlite")
+    os.environ["SEED_DEMO_DATA"] = "1"
+    os.environ["REDIS_SESSIONS_ENABLED"] = "0"
+    os.environ["GUARD_STATE_BACKEND"] = "memory"
+    os.environ["LOGIN_MAX_ATTEMPTS"] = "5"
+    os.environ["LOGIN_LOCK_SECONDS"] = "600"
+    os.environ["LOGIN_TRACK_SECONDS"] = "900"
+    from atlasbahamas_app import core
+    return core
+
+
+def check_core_login_guard(core):
+    checks = {}
+    guard = core.LoginGuard()
+    now = 1_000_000.0
+    for _ in range(4):
+        guard.fail(("1.1.1.1", "bob"), now)
+    before = guard.check(("1.1.1.1", "bob"), now)[0]
+    guard.fail(("1.1.1.1", "bob"), now)
+    locked, wait_s = guard.check(("1.1.1.1", "bob"), now)
+    checks["core_lock_after_max_attempts"] = not before and locked and wait_s == 600
+    guard.fail(("2.2.2.2", "bob"), now)
+    guard.fail(("2.2.2.2", "bob"), now)
+    checks["core_user_totals_across_ips"] = guard.user_status("bob", now) == (True, 600, 7)
+    checks["core_unlock_user"] = (
+        guard.unlock_user("bob", now) == 2
+        and not guard.check(("1.1.1.1", "bob"), now)[0]
+        and guard.user_status("bob", now) == (False, 0, 0)
+    )
+    for _ in range(4):
+        guard.fail(("3.3.3.3", "carol"), now)
+    guard.fail(("3.3.3.3", "carol"), now + 901)
+    checks["core_window_reset"] = (
+        not guard.check(("3.3.3.3", "carol"), now + 901)[0] and guard.user_status("carol", now + 901)[2] == 1
+    )
+    for i in range(2500):
+        for _ in range(5):
+            guard.fail((f"10.0.{i // 250}.{i % 250}", f"user{i}"), now)
+    full = guard.snapshot(now)
+    guard.expire(now + 901 + 600 + 2 * guard.BUCKET_SECONDS)
+    checks["core_expire_drains"] = (
+        full["tracked"] == 2501 and full["locked"] == 2500
+        and guard.snapshot(now + 2000) == {"tracked": 0, "locked": 0, "fail_total": 0}
+        and not guard.users and not guard._expiry and not guard._unlock
+    )
+    return checks
+
+
+def check_core_rate_limit(core):
+    checks = {}
+    results = [core.rate_limit_check("login:7.7.7.7:gcra", 5, 60) for _ in range(6)]
+    checks["gcra_burst_equals_limit"] = [blocked for blocked, _ in results] == [False] * 5 + [True]
+    checks["gcra_retry_after"] = results[-1][1] == 12
+    # Twelve seconds later exactly one more request fits.
+    with core._RATE_LIMIT_LOCK:
+        core._RATE_LIMIT_BUCKETS["login:7.7.7.7:gcra"] -= 12
+    checks["gcra_refills_one_slot"] = (
+        not core.rate_limit_check("login:7.7.7.7:gcra", 5, 60)[0]
+        and core.rate_limit_check("login:7.7.7.7:gcra", 5, 60)[0]
+    )
+    return checks
+
+
+def main():
+    checks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "guard_state.sqlite")
+        checks.update(check_cross_process(path))
+        checks.update(check_login_guard(path))
+        checks.update(check_threads(path))
+        core = _core(tmp)
+        checks.update(check_core_login_guard(core))
+        checks.update(check_core_rate_limit(core))
+    print("GUARD_STORE_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
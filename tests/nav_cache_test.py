@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = str(Path(_TMP.name) / "nav_cache_test.sqlite")
+os.environ["SEED_DEMO_DATA"] = "1"
+os.environ["SQLITE_WRITE_QUEUE"] = "0"
+os.environ["NAV_CACHE_TTL_SECONDS"] = "60"
+
+from atlasbahamas_app import core  # noqa: E402
+
+
+def _users():
+    c = core._open_db()
+    try:
+        rows = c.execute("SELECT * FROM users WHERE username IN('admin1','manager1','landlord1','tenant1')").fetchall()
+        return {r["username"]: dict(r) for r in rows}
+    finally:
+        c.close()
+
+
+def _seed(users):
+    c = core._open_db()
+    try:
+        for pid, owner in (("NAV-PROP-A", "manager1"), ("NAV-PROP-B", "landlord1")):
+            c.execute(
+                "INSERT INTO properties(id,owner_account,name,property_type,units_count,location)VALUES(?,?,?,?,?,?)",
+                (pid, users[owner]["account_number"], pid, "Apartment", 1, "Nassau"),
+            )
+            c.execute("INSERT INTO units(property_id,unit_label)VALUES(?,?)", (pid, "Unit 1"))
+        c.execute(
+            "INSERT INTO tenant_leases(tenant_account,property_id,unit_label,start_date,is_active)VALUES(?,?,?,?,1)",
+            (users["tenant1"]["account_number"], "NAV-PROP-A", "Unit 1", "2026-01-01"),
+        )
+        c.commit()
+    finally:
+        c.close()
+
+
+def _counting_menu_counts():
+    calls = []
+    real = core.menu_counts_for_user
+
+    def _count(user):
+        calls.append(user["username"])
+        return real(user)
+
+    return calls, real, _count
+
+
+def _warm(users):
+    core.invalidate_nav_cache()
+    for u in users.values():
+        core.nav_counts(u)
+
+
+def _cached(users):
+    return {name for name, u in users.items() if u["id"] in core._NAV_CACHE}
+
+
+def check_hit_and_ttl(users):
+    checks = {}
+    core.invalidate_nav_cache()
+    calls, real, core.menu_counts_for_user = _counting_menu_counts()
+    try:
+        first = core.nav_counts(users["manager1"])
+        second = core.nav_counts(users["manager1"])
+        checks["nav_cache_hit"] = calls == ["manager1"] and first is second
+        core._NAV_CACHE[users["manager1"]["id"]]["expires"] = time.monotonic() - 1
+        core.nav_counts(users["manager1"])
+        checks["nav_cache_ttl_expiry"] = calls == ["manager1", "manager1"]
+        renamed = dict(users["manager1"], full_name="Renamed Manager")
+        core.nav_counts(renamed)
+        checks["nav_cache_key_change_misses"] = len(calls) == 3
+    finally:
+        core.menu_counts_for_user = real
+    return checks
+
+
+def check_targeted_invalidation(users):
+    checks = {}
+    everyone = set(users)
+    _warm(users)
+    before = core.nav_counts(users["manager1"])["checks_pending"]
+    # Handles stay open until the request ends, which commits the scope connection.
+    with core.request_db_scope() as scope:
+        scope.method = "POST"
+        c = core.db()
+        c.execute(
+            "INSERT INTO property_checks(requester_account,property_id,preferred_date,notes,status)VALUES(?,?,?,?,?)",
+            (users["manager1"]["account_number"], "NAV-PROP-A", "2026-11-01", "", "requested"),
+        )
+        core.invalidate_nav_property(c, "NAV-PROP-A")
+    # Only the owner's and the admin's badges read the changed counter rows.
+    checks["nav_invalidate_property_owner"] = _cached(users) == {"landlord1", "tenant1"}
+    checks["nav_invalidate_property_fresh"] = core.nav_counts(users["manager1"])["checks_pending"] == before + 1
+
+    _warm(users)
+    with core.request_db_scope():
+        c = core.db()
+        c.execute(
+            "INSERT INTO maintenance_requests(tenant_account,tenant_name,description,status)VALUES(?,?,?,?)",
+            (users["tenant1"]["account_number"], "Tenant", "Leaking tap", "open"),
+        )
+        core.invalidate_nav_tenant(c, users["tenant1"]["account_number"])
+    checks["nav_invalidate_tenant_lease_owners"] = _cached(users) == {"landlord1", "tenant1"}
+
+    _warm(users)
+    with core.request_db_scope():
+        core.invalidate_nav_staff()
+    checks["nav_invalidate_staff"] = _cached(users) == {"tenant1"}
+
+    _warm(users)
+    with core.request_db_scope():
+        c = core.db()
+        core.create_notification(c, users["tenant1"]["id"], "Nav cache probe", "/notifications")
+    checks["nav_invalidate_user"] = _cached(users) == everyone - {"tenant1"}
+
+    _warm(users)
+    with core.request_db_scope() as scope:
+        scope.method = "POST"
+        c = core.db()
+        c.execute("UPDATE users SET phone=phone WHERE id=?", (users["tenant1"]["id"],))
+    checks["nav_no_blanket_clear_on_post"] = _cached(users) == everyone
+    return checks
+
+
+def check_lru_eviction(users):
+    checks = {}
+    core.invalidate_nav_cache()
+    saved = core.NAV_CACHE_MAX_USERS
+    core.NAV_CACHE_MAX_USERS = 2
+    evictions = core._NAV_CACHE_STATS["evictions"]
+    try:
+        core.nav_counts(users["admin1"])
+        core.nav_counts(users["manager1"])
+        core.nav_counts(users["admin1"])
+        core.nav_counts(users["tenant1"])
+    finally:
+        core.NAV_CACHE_MAX_USERS = saved
+    # manager1 was least recently used; admin1 survives because it was read again.
+    checks["nav_lru_evicts_oldest"] = _cached(users) == {"admin1", "tenant1"}
+    checks["nav_lru_counts_evictions"] = core._NAV_CACHE_STATS["evictions"] == evictions + 1
+    return checks
+
+
+def main():
+    core.ensure_db()
+    users = _users()
+    _seed(users)
+    checks = {}
+    checks.update(check_hit_and_ttl(users))
+    checks.update(check_targeted_invalidation(users))
+    checks.update(check_lru_eviction(users))
+    print("NAV_CACHE_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = str(Path(_TMP.name) / "password_hash_test.sqlite")
+os.environ["SEED_DEMO_DATA"] = "1"
+os.environ["REDIS_SESSIONS_ENABLED"] = "0"
+os.environ["GUARD_STATE_BACKEND"] = "memory"
+
+from atlasbahamas_app import core  # noqa: E402
+
+
+def _wait_pending(value, timeout=30):
+    deadline = time.time() + timeout
+    while core._PW_PENDING != value and time.time() < deadline:
+        time.sleep(0.01)
+    return core._PW_PENDING == value
+
+
+def _post_login():
+    from atlasbahamas_app.wsgi_adapter import WSGIHandler
+
+    body = b"username=tenant1&password=AtlasTenant!1"
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/login",
+        "QUERY_STRING": "",
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+        "CONTENT_LENGTH": str(len(body)),
+        "SERVER_NAME": "127.0.0.1",
+        "SERVER_PORT": "80",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(body),
+    }
+    seen = {}
+    WSGIHandler()(environ, lambda status, headers, exc_info=None: seen.setdefault("status", status))
+    return seen.get("status", "")
+
+
+def check_password_hashing():
+    checks = {}
+    salt = b"s" * 16
+    legacy = hashlib.pbkdf2_hmac("sha256", b"Secret!1", salt, 200000).hex()
+    checks["pw_verify_legacy_hex"] = core.pw_verify("Secret!1", salt, legacy) and not core.pw_verify("Secret!2", salt, legacy)
+    cheap = core.pw_hash("Secret!1", salt, rounds=1000)
+    checks["pw_hash_prefixed_format"] = (
+        cheap.startswith("pbkdf2_sha256$1000$")
+        and core.pw_verify("Secret!1", salt, cheap)
+        and not core.pw_verify("Secret!2", salt, cheap)
+        and core.pw_needs_rehash(cheap)
+        and not core.pw_needs_rehash(legacy)
+    )
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE users(id INTEGER PRIMARY KEY, password_salt TEXT, password_hash TEXT)")
+    conn.execute("INSERT INTO users VALUES(1, ?, ?)", (salt.hex(), cheap))
+    with core.request_db_scope():
+        rehashed = core.rehash_password_if_needed(conn, 1, "Secret!1", cheap)
+    new_salt, new_hash = conn.execute("SELECT password_salt,password_hash FROM users WHERE id=1").fetchone()
+    checks["rehash_on_login"] = (
+        rehashed and not core.pw_needs_rehash(new_hash) and core.pw_verify("Secret!1", bytes.fromhex(new_salt), new_hash)
+    )
+    conn.close()
+
+    core.ensure_db()
+    # Warm the WSGI stack so the saturated request below is not slowed by first-request setup.
+    checks["pw_login_before_saturation"] = _post_login().startswith("302")
+    core.PASSWORD_HASH_MAX_PENDING = 1
+    core.PASSWORD_HASH_TIMEOUT_SECONDS = 0.2
+    try:
+        with core.request_db_scope():
+            core.pw_hash("Secret!1", salt, rounds=3_000_000)
+        timed_out = False
+    except core.PasswordHashBusy:
+        timed_out = True
+    # The abandoned hash is still running in the pool and keeps its slot.
+    still_counted = core._PW_PENDING == 1
+    try:
+        with core.request_db_scope():
+            core.pw_hash("Secret!1", salt, rounds=1000)
+        rejected = False
+    except core.PasswordHashBusy:
+        rejected = True
+    checks["pw_timeout_keeps_bound"] = timed_out and still_counted and rejected
+    checks["pw_saturated_login_503"] = _post_login().startswith("503")
+    checks["pw_slot_freed_when_done"] = _wait_pending(0)
+    core.PASSWORD_HASH_TIMEOUT_SECONDS = 10
+    checks["pw_login_after_saturation"] = _post_login().startswith("302")
+    return checks
+
+
+def main():
+    checks = {}
+    checks.update(check_password_hashing())
+    print("PASSWORD_HASH_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
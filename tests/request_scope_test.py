@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = str(Path(_TMP.name) / "request_scope_test.sqlite")
+os.environ["SEED_DEMO_DATA"] = "0"
+os.environ["SQLITE_WRITE_QUEUE"] = "0"
+
+from atlasbahamas_app import core  # noqa: E402
+
+
+class _CountingConnection:
+    """Wraps a real connection and counts the transaction calls made on it."""
+
+    def __init__(self, conn, log):
+        self._conn = conn
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        self._log["commits"] += 1
+        self._conn.commit()
+
+    def rollback(self):
+        self._log["rollbacks"] += 1
+        self._conn.rollback()
+
+
+def _counting_open_db():
+    log = {"opened": 0, "commits": 0, "rollbacks": 0}
+    real = core._open_db
+
+    def _open():
+        log["opened"] += 1
+        return _CountingConnection(real(), log)
+
+    return log, real, _open
+
+
+def _values():
+    c = core._open_db()
+    try:
+        return [r["v"] for r in c.execute("SELECT v FROM scope_probe ORDER BY id").fetchall()]
+    finally:
+        c.close()
+
+
+def _reset():
+    c = core._open_db()
+    try:
+        c.execute("DELETE FROM scope_probe")
+        c.commit()
+    finally:
+        c.close()
+
+
+def check_one_connection_one_commit():
+    checks = {}
+    _reset()
+    log, real, core._open_db = _counting_open_db()
+    try:
+        with core.request_db_scope():
+            # Handles stay open until the request ends, as cur_user/nav/handler handles do.
+            c = core.db()
+            c.execute("INSERT INTO scope_probe(v) VALUES('a')")
+            c2 = core.db()
+            c2.execute("INSERT INTO scope_probe(v) VALUES('b')")
+            c2.close()
+            c3 = core.db_read()
+            same = c3.execute("SELECT COUNT(*) AS n FROM scope_probe").fetchone()["n"] == 2
+            c3.close()
+            mid_request = dict(log)
+    finally:
+        core._open_db = real
+    checks["scope_one_connection"] = log["opened"] == 1 and same
+    checks["scope_commits_once_at_end"] = mid_request["commits"] == 0 and log["commits"] == 1
+    checks["scope_persisted"] = _values() == ["a", "b"]
+    return checks
+
+
+def check_rollback_on_failure():
+    checks = {}
+    _reset()
+    try:
+        with core.request_db_scope():
+            c = core.db()
+            c.execute("INSERT INTO scope_probe(v) VALUES('lost')")
+            raise RuntimeError("handler failed")
+    except RuntimeError:
+        pass
+    checks["scope_rollback_on_exception"] = _values() == []
+    with core.request_db_scope() as scope:
+        c = core.db()
+        c.execute("INSERT INTO scope_probe(v) VALUES('lost')")
+        scope.mark_failed()
+    checks["scope_rollback_when_marked_failed"] = _values() == []
+    return checks
+
+
+def check_write_retry_in_request():
+    checks = {}
+    _reset()
+    log, real, core._open_db = _counting_open_db()
+    attempts = []
+
+    def _flaky(c):
+        c.execute("INSERT INTO scope_probe(v) VALUES('retried')")
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise core.DBOperationalError[0]("database is locked")
+        return "ok"
+
+    try:
+        with core.request_db_scope():
+            c = core.db()
+            c.execute("INSERT INTO scope_probe(v) VALUES('pending')")
+            result = core.db_write_retry(_flaky, delay=0)
+            during = dict(log)
+    finally:
+        core._open_db = real
+    # The helper joined the open transaction: no commit or rollback until the request ends,
+    # and the failed first attempt only undid its own insert.
+    checks["write_retry_joins_request"] = (
+        result == "ok" and log["opened"] == 1 and during["commits"] == 0 and during["rollbacks"] == 0
+    )
+    checks["write_retry_savepoint_retry"] = len(attempts) == 2 and _values() == ["pending", "retried"]
+
+    _reset()
+    try:
+        with core.request_db_scope():
+            c = core.db()
+            c.execute("INSERT INTO scope_probe(v) VALUES('pending')")
+            core.db_write_retry(lambda c: c.execute("INSERT INTO scope_probe(v) VALUES('helper')"))
+            raise RuntimeError("handler failed after the helper")
+    except RuntimeError:
+        pass
+    checks["write_retry_rolls_back_with_request"] = _values() == []
+
+    _reset()
+    log, real, core._open_db = _counting_open_db()
+    try:
+        with core.request_db_scope() as scope:
+            core.db_write_retry(lambda c: c.execute("INSERT INTO scope_probe(v) VALUES('own')"))
+            untouched = scope.conn is None
+            during = dict(log)
+            committed = _values() == ["own"]
+    finally:
+        core._open_db = real
+    # With nothing pending on the request, the helper commits on its own connection.
+    checks["write_retry_own_connection"] = untouched and committed and during["opened"] == 1 and during["commits"] == 1
+    return checks
+
+
+def main():
+    core.ensure_db()
+    c = core._open_db()
+    c.execute("CREATE TABLE IF NOT EXISTS scope_probe(id INTEGER PRIMARY KEY, v TEXT)")
+    c.commit()
+    c.close()
+    checks = {}
+    checks.update(check_one_connection_one_commit())
+    checks.update(check_rollback_on_failure())
+    checks.update(check_write_retry_in_request())
+    print("REQUEST_SCOPE_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
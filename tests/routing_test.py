@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DATABASE_PATH", str(Path(tempfile.gettempdir()) / "atlas_routing_test.sqlite"))
+
+from atlasbahamas_app.routing import RouteTable  # noqa: E402
+
+
+def check_table():
+    checks = {}
+    table = RouteTable()
+    table.get("/a", "exact")
+    table.get("/item/<int:item_id>", "item")
+    table.get("/item/<int:item_id>/file/<name>", "file")
+    table.get("/section", "section", prefix=True)
+    table.get("/section/deep", "deep", prefix=True)
+    route, params = table.match("GET", "/item/42/file/report.pdf")
+    checks["pattern_params"] = route.handler == "file" and params == {"item_id": 42, "name": "report.pdf"}
+    checks["pattern_int_only"] = table.match("GET", "/item/abc")[0] is None
+    checks["exact"] = table.match("GET", "/a")[0].handler == "exact" and table.match("POST", "/a")[0] is None
+    checks["longest_prefix"] = table.match("GET", "/section/deep/x")[0].handler == "deep"
+    try:
+        table.get("/a", "again")
+        checks["duplicate_rejected"] = False
+    except ValueError:
+        checks["duplicate_rejected"] = True
+    return checks
+
+
+def check_declared_routes():
+    checks = {}
+    from atlasbahamas_app.handlers.routes import GET_ROUTES, POST_ROUTES
+    from atlasbahamas_app.http_handler import H
+
+    missing = []
+    for route in GET_ROUTES.routes() + POST_ROUTES.routes():
+        code = route.handler.__code__
+        for name in code.co_names:
+            if name.startswith("_") and not hasattr(H, name):
+                missing.append((route.label, name))
+    checks["handlers_exist"] = not missing
+    if missing:
+        print("MISSING_HANDLERS", missing)
+    checks["listing_detail"] = GET_ROUTES.match("GET", "/listing/7")[1] == {"listing_id": 7}
+    dashboard = GET_ROUTES.match("GET", "/manager")[0]
+    checks["manager_guarded"] = dashboard.role == "manager" and dashboard.action == "manager.portal"
+    return checks
+
+
+def main():
+    checks = {}
+    checks.update(check_table())
+    checks.update(check_declared_routes())
+    print("ROUTING_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
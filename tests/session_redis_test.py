@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = str(Path(_TMP.name) / "session_redis_test.sqlite")
+os.environ["SEED_DEMO_DATA"] = "1"
+
+from atlasbahamas_app import core  # noqa: E402
+from redis_client import RedisClient  # noqa: E402
+
+
+class FakeRedis:
+    """Just enough of RedisClient for the session paths, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def _json(self, key):
+        raw = self.data.get(key)
+        return json.loads(raw) if isinstance(raw, str) else None
+
+    def get_text(self, key):
+        raw = self.data.get(key)
+        return None if raw is None else str(raw)
+
+    def get_json(self, key):
+        return self._json(key)
+
+    def get_many_json(self, keys):
+        return [self._json(k) for k in keys]
+
+    def set_members(self, key):
+        return set(self.data.get(key) or ())
+
+    def incr(self, key):
+        value = int(self.data.get(key) or 0) + 1
+        self.data[key] = str(value)
+        return value
+
+    def delete_many(self, keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def set_many_json(self, items):
+        return all(self.pipeline([("SET", k, json.dumps(v), "EX", ttl) for k, v, ttl in items]))
+
+    def pipeline(self, commands):
+        out = []
+        for cmd, *args in commands:
+            if cmd == "SET":
+                self.data[args[0]] = args[1]
+                out.append(True)
+            elif cmd == "SADD":
+                self.data.setdefault(args[0], set()).update(args[1:])
+                out.append(1)
+            elif cmd == "SREM":
+                self.data.get(args[0], set()).difference_update(args[1:])
+                out.append(1)
+            elif cmd == "EXPIRE":
+                out.append(1)
+            elif cmd == "UNLINK":
+                out.append(self.delete_many(args))
+        return out
+
+
+class FakeRedisPy:
+    """The redis-py calls behind RedisClient's batch helpers, recording each pipeline."""
+
+    def __init__(self):
+        self.data = {}
+        self.pipelines = []
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def unlink(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self, transaction)
+
+
+class _FakePipeline:
+    def __init__(self, owner, transaction):
+        self.owner = owner
+        self.transaction = transaction
+        self.commands = []
+
+    def execute_command(self, *args):
+        self.commands.append(args)
+
+    def execute(self):
+        self.owner.pipelines.append((self.transaction, list(self.commands)))
+        out = []
+        for cmd, key, *rest in self.commands:
+            if cmd != "SET":
+                raise ConnectionError("connection lost")
+            self.owner.data[key] = rest[0]
+            out.append(True)
+        return out
+
+
+def _payload_user(fake, raw):
+    data = fake.get_json(core._redis_session_key(raw)) or {}
+    return data.get("user") or {}
+
+
+def _expires():
+    return (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(timespec="seconds")
+
+
+def check_payload_refresh(fake, uid):
+    checks = {}
+    c = core.db()
+    core.create_session(c, uid, {})
+    c.commit()
+    c.close()
+    raw = next(iter(fake.set_members(core._redis_user_session_key(uid))), "")
+    checks["payload_has_user"] = _payload_user(fake, raw).get("role") == "tenant"
+
+    # A role change that is rolled back must leave the cached sessions untouched.
+    try:
+        with core.request_db_scope():
+            c = core.db()
+            c.execute("UPDATE users SET role='admin' WHERE id=?", (uid,))
+            core.refresh_session_user(c, uid)
+            checks["rewrite_deferred"] = _payload_user(fake, raw).get("role") == "tenant"
+            raise RuntimeError("audit_log failed")
+    except RuntimeError:
+        pass
+    c = core.db()
+    role = c.execute("SELECT role FROM users WHERE id=?", (uid,)).fetchone()["role"]
+    c.close()
+    checks["rollback_keeps_payload"] = role == "tenant" and _payload_user(fake, raw).get("role") == "tenant"
+
+    with core.request_db_scope():
+        c = core.db()
+        c.execute("UPDATE users SET full_name='Renamed Tenant' WHERE id=?", (uid,))
+        core.refresh_session_user(c, uid)
+        c.commit()
+        c.close()
+    checks["commit_rewrites_payload"] = _payload_user(fake, raw).get("full_name") == "Renamed Tenant"
+    return checks
+
+
+def check_user_index(fake, uid):
+    checks = {}
+    ukey = core._redis_user_session_key(uid)
+    core.delete_user_sessions_redis(uid)
+    for token in ("idx-a", "idx-b", "idx-c"):
+        core.cache_session_redis(token, uid, _expires())
+    checks["index_tracks_sessions"] = fake.set_members(ukey) == {"idx-a", "idx-b", "idx-c"}
+
+    # Without a user id the owner comes from the payload, and the index entry goes with the key.
+    core.delete_sessions_redis([("idx-a", None)])
+    checks["index_delete_resolves_owner"] = (
+        core.get_session_redis("idx-a") is None and fake.set_members(ukey) == {"idx-b", "idx-c"}
+    )
+
+    # Index members whose session key is gone are dropped on the next rewrite.
+    fake.data.pop(core._redis_session_key("idx-b"))
+    c = core.db()
+    core._rewrite_session_user(c, uid)
+    c.close()
+    checks["index_stale_members_removed"] = fake.set_members(ukey) == {"idx-c"}
+
+    core.delete_user_sessions_redis(uid)
+    checks["index_delete_user"] = core.get_session_redis("idx-c") is None and ukey not in fake.data
+    return checks
+
+
+def check_namespace_bump(fake, uid):
+    checks = {}
+    core.cache_session_redis("ns-old", uid, _expires())
+    old_key = core._redis_session_key("ns-old")
+    ns = core.clear_redis_sessions()
+    checks["ns_bump_retires_sessions"] = (
+        ns == int(fake.get_text(core._redis_session_ns_key())) and old_key in fake.data
+        and core.get_session_redis("ns-old") is None
+    )
+    core.cache_session_redis("ns-new", uid, _expires())
+    checks["ns_new_sessions_readable"] = core._redis_session_key("ns-new").startswith(f"{core.REDIS_SESSION_PREFIX}{ns}:") and (
+        core.get_session_redis("ns-new") or {}
+    ).get("user_id") == uid
+
+    # Another worker clears sessions; this process has just refreshed its copy of the namespace.
+    fake.incr(core._redis_session_ns_key())
+    checks["ns_other_worker_bump_seen_on_read"] = (
+        core.get_session_redis("ns-new") is None and core._REDIS_SESSION_NS["value"] == ns + 1
+    )
+    return checks
+
+
+def check_client_batches():
+    checks = {}
+    cli = RedisClient("redis://127.0.0.1:1/0")
+    cli._client = fake = FakeRedisPy()
+    ok = cli.set_many_json([("k:a", {"x": 1}, 60), ("k:b", [2], 0)])
+    checks["client_set_many_one_pipeline"] = ok and fake.pipelines == [
+        (False, [("SET", "k:a", '{"x": 1}', "EX", 60), ("SET", "k:b", "[2]")])
+    ]
+    fake.data["k:bad"] = "{not json"
+    checks["client_get_many"] = (
+        cli.get_many_json(["k:a", "k:missing", "k:bad", "k:b"]) == [{"x": 1}, None, None, [2]]
+        and cli.get_many_json([]) == []
+    )
+    checks["client_delete_many"] = cli.delete_many(["k:a", "k:b", "k:missing"]) == 2 and cli.delete_many([]) == 0
+    checks["client_pipeline_error"] = cli.pipeline([("SADD", "k:set", "x")]) is None and cli.pipeline([]) == []
+    return checks
+
+
+def main():
+    checks = {}
+    core.ensure_db()
+    fake = FakeRedis()
+    core._REDIS_CACHE = fake
+    c = core.db()
+    uid = c.execute("SELECT id FROM users WHERE username='tenant1'").fetchone()["id"]
+    c.close()
+    checks.update(check_payload_refresh(fake, uid))
+    checks.update(check_user_index(fake, uid))
+    checks.update(check_namespace_bump(fake, uid))
+    checks.update(check_client_batches())
+    print("SESSION_REDIS_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -240,6 +240,107 @@ def main():
         else:
             checks["tenant_accept_invite"] = True
 
+        # Triggers kept dashboard_counters in step with every write above: a rebuild finds no drift.
+        rebuild = subprocess.run(
+            [sys.executable, "tools/db_ops.py", "rebuild-counters", "--db", env["DATABASE_PATH"]],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, timeout=60,
+        )
+        checks["dashboard_counters_no_drift"] = rebuild.returncode == 0 and "drift_rows=0" in rebuild.stdout
+
+        def rollup_rows():
+            conn = sqlite3.connect(env["DATABASE_PATH"])
+            try:
+                return {
+                    t: conn.execute(f"SELECT {cols} FROM {t} WHERE {nonzero} ORDER BY 1,2").fetchall()
+                    for t, cols, nonzero in (
+                        ("payment_monthly", "*", "payments<>0 OR amount<>0"),
+                        ("maintenance_monthly", "*", "opened<>0 OR closed<>0"),
+                        ("maintenance_backlog", "property_id,open_count,ROUND(created_days_sum,3)", "open_count<>0"),
+                        ("occupancy_monthly", "*", "1=1"),
+                        ("rent_payer_monthly", "*", "paid_amount<>0"),
+                    )
+                }
+            finally:
+                conn.close()
+
+        rollups_live = rollup_rows()
+        rebuild = subprocess.run(
+            [sys.executable, "tools/db_ops.py", "rebuild-rollups", "--db", env["DATABASE_PATH"]],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, timeout=60,
+        )
+        checks["analytics_rollups_match_rebuild"] = rebuild.returncode == 0 and rollup_rows() == rollups_live
+        c, analytics_page, _ = req(opener, "GET", "/manager/analytics")
+        checks["manager_analytics_page"] = c == 200 and "Occupancy" in analytics_page
+        c, rent_roll_page, _ = req(opener, "GET", "/manager/rent-roll?status=late&sort=rent_desc&q=unit")
+        checks["manager_rent_roll_filtered"] = c == 200 and "Rent Roll" in rent_roll_page
+
+        # Known rent-roll rows on manager1's property, labelled with a per-run tag so the
+        # assertions only see them on a reused database: A paid in full this month (current),
+        # B and C unpaid on leases due on the 1st (late), D, E and F vacant.
+        tag = f"rr{os.getpid()}t{int(time.time())}"
+        labels = {k: f"{tag} {k}" for k in "ABCDEF"}
+        tenants = {k: f"{tag.upper()}-{k}" for k in "ABC"}
+        conn = sqlite3.connect(env["DATABASE_PATH"])
+        try:
+            prop_id = conn.execute(
+                "SELECT p.id FROM properties p JOIN users u ON u.account_number=p.owner_account "
+                "WHERE u.username='manager1' ORDER BY p.created_at LIMIT 1"
+            ).fetchone()[0]
+            for k, rent in (("A", 1500), ("B", 900), ("C", 1200), ("D", 700), ("E", 300), ("F", 100)):
+                conn.execute("INSERT INTO units(property_id,unit_label,rent) VALUES(?,?,?)", (prop_id, labels[k], rent))
+            for k in "ABC":
+                conn.execute(
+                    "INSERT INTO tenant_leases(tenant_account,property_id,unit_label,start_date) VALUES(?,?,?,'2020-01-01')",
+                    (tenants[k], prop_id, labels[k]),
+                )
+            conn.execute(
+                "INSERT INTO payments(payer_account,payer_role,payment_type,amount,status,property_id) "
+                "VALUES(?,'tenant','rent',1500,'paid',?)",
+                (tenants["A"], prop_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        def rent_roll(query):
+            code, page, _ = req(opener, "GET", f"/manager/rent-roll?property={prop_id}&" + query)
+            counts = dict(re.findall(r"<div class='muted'>(Current|Late|Vacant)</div><div class='stat-num'>(\d+)</div>", page))
+            units = re.findall(r"\(" + re.escape(prop_id) + r"\)</td><td>([^<]*)</td>", page)
+            return code, counts, units
+
+        try:
+            c, counts, page1 = rent_roll(f"q={tag}&sort=rent_desc&per=5")
+            _, _, page2 = rent_roll(f"q={tag}&sort=rent_desc&per=5&page=2")
+            _, late_counts, late_rows = rent_roll(f"q={tag}&status=late&sort=rent_asc")
+            # "_" must match literally, not as a LIKE wildcard for the space after the tag.
+            _, _, literal_rows = rent_roll(f"q={tag}_")
+            checks["manager_rent_roll_rows"] = (
+                c == 200
+                and counts == {"Current": "1", "Late": "2", "Vacant": "3"}
+                and page1 == [labels["A"], labels["C"], labels["B"], labels["D"], labels["E"]]
+                and page2 == [labels["F"]]
+                and late_counts == {"Current": "0", "Late": "2", "Vacant": "0"}
+                and late_rows == [labels["B"], labels["C"]]
+                and literal_rows == []
+            )
+        finally:
+            conn = sqlite3.connect(env["DATABASE_PATH"])
+            try:
+                conn.execute("DELETE FROM payments WHERE payer_account=?", (tenants["A"],))
+                conn.execute("DELETE FROM tenant_leases WHERE tenant_account IN (?,?,?)", tuple(tenants.values()))
+                conn.execute("DELETE FROM units WHERE property_id=? AND unit_label LIKE ?", (prop_id, tag + " %"))
+                conn.commit()
+            finally:
+                conn.close()
+
+        # Logging in again rotates the session: the first tenant cookie must stop working even
+        # though it was just served from the in-process session cache.
+        c, tenant_home, _ = req(t_opener, "GET", "/tenant")
+        t2_opener, _ = build_opener()
+        req(t2_opener, "POST", "/login", {"username": "tenant1", "password": "AtlasTenant!1"})
+        c, stale_home, _ = req(t_opener, "GET", "/tenant")
+        checks["session_cache_rotation"] = "Alerts" in tenant_home and "Alerts" not in stale_home
+
         print("SMOKE_CHECKS", checks)
         if not all(checks.values()):
             raise SystemExit(1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DATABASE_PATH", str(Path(tempfile.gettempdir()) / "atlas_template_cache_test.sqlite"))
+
+from atlasbahamas_app import core  # noqa: E402
+
+
+def check_split():
+    checks = {}
+    saved = core.TEMPLATES_DIR, core.TEMPLATE_RELOAD
+    with tempfile.TemporaryDirectory() as tmp:
+        templates_dir = Path(tmp)
+        (templates_dir / "base.html").write_text("<title>{{title}}</title>{{content}}{{scripts}}", encoding="utf-8")
+        (templates_dir / "page.html").write_text("{{a}}{{b}} and {{a}}!", encoding="utf-8")
+        core.TEMPLATES_DIR = templates_dir
+        core.TEMPLATE_RELOAD = False
+        core.clear_template_cache()
+        try:
+            literals, slots = core.compiled_template("page.html")
+            checks["template_split_slots"] = slots == ("title", "a", "b", "a", "scripts")
+            checks["template_split_literals"] = literals == ("<title>", "</title>", "", " and ", "!", "")
+            checks["template_compiled_once"] = core.compiled_template("page.html")[0] is literals
+            checks["template_render_fills_slots"] = core.render("page.html", title="T", a="x", b="{{a}}") == b"<title>T</title>x{{a}} and x!"
+        finally:
+            core.TEMPLATES_DIR, core.TEMPLATE_RELOAD = saved
+            core.clear_template_cache()
+    return checks
+
+
+def _render_uncached(templates_dir, tpl, ctx):
+    # The pre-cache implementation: merge, then one regex pass over the whole document.
+    base = (templates_dir / "base.html").read_text(encoding="utf-8")
+    content = (templates_dir / tpl).read_text(encoding="utf-8")
+    merged = base.replace("{{content}}", content)
+    return core._ph.sub(lambda m: str(ctx.get(m.group(1), "")), merged).encode("utf-8")
+
+
+def check_template_cache():
+    checks = {}
+    saved = core.TEMPLATES_DIR, core.TEMPLATE_RELOAD
+    with tempfile.TemporaryDirectory() as tmp:
+        templates_dir = Path(tmp)
+        shutil.copytree(saved[0], templates_dir, dirs_exist_ok=True)
+        core.TEMPLATES_DIR = templates_dir
+        try:
+            mismatched = []
+            pages = sorted(p.name for p in templates_dir.glob("*.html") if p.name != "base.html")
+            for tpl in pages:
+                merged = (templates_dir / "base.html").read_text(encoding="utf-8").replace(
+                    "{{content}}", (templates_dir / tpl).read_text(encoding="utf-8")
+                )
+                names = sorted(set(core._ph.findall(merged)))
+                # Values that look like slots must come out verbatim; the last slot is left unset.
+                ctx = {name: f"<{name}>{{{{title}}}}" for name in names[:-1]}
+                expected = _render_uncached(templates_dir, tpl, ctx)
+                core.clear_template_cache()
+                core.TEMPLATE_RELOAD = True
+                reloaded = core.render(tpl, **ctx)
+                core.TEMPLATE_RELOAD = False
+                cached = [core.render(tpl, **ctx) for _ in range(2)]
+                if not (reloaded == expected and cached == [expected, expected]):
+                    mismatched.append(tpl)
+            checks["template_cache_matches_uncached"] = bool(pages) and not mismatched
+            if mismatched:
+                print("TEMPLATE_MISMATCH", mismatched)
+
+            tpl = pages[0]
+            core.TEMPLATE_RELOAD = False
+            before = core.render(tpl, title="T")
+            page = templates_dir / tpl
+            page.write_text(page.read_text(encoding="utf-8") + "<!-- edited -->", encoding="utf-8")
+            os.utime(page, ns=(page.stat().st_atime_ns, page.stat().st_mtime_ns + 10**9))
+            kept = core.render(tpl, title="T")
+            core.TEMPLATE_RELOAD = True
+            fresh = core.render(tpl, title="T")
+            checks["template_reload_on_change"] = kept == before and fresh == _render_uncached(templates_dir, tpl, {"title": "T"})
+        finally:
+            core.TEMPLATES_DIR, core.TEMPLATE_RELOAD = saved
+            core.clear_template_cache()
+    return checks
+
+
+def main():
+    checks = {}
+    checks.update(check_split())
+    checks.update(check_template_cache())
+    print("TEMPLATE_CACHE_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
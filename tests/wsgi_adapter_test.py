@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DATABASE_PATH", str(Path(tempfile.gettempdir()) / "atlas_wsgi_adapter_test.sqlite"))
+
+from atlasbahamas_app import core  # noqa: E402
+from atlasbahamas_app.asgi_adapter import ASGIHandler  # noqa: E402
+from atlasbahamas_app.http_io import Headers, NativeIOMixin, Request, Response  # noqa: E402
+from atlasbahamas_app.wsgi_adapter import WSGIHandler  # noqa: E402
+
+CHUNK = b"x" * 1024
+RELEASE = threading.Event()
+FINISHED = threading.Event()
+HANDLER_THREADS = []
+POSTED = []
+WRITES = []
+WRITE_DONE = threading.Event()
+
+
+class _Handler(NativeIOMixin):
+    def do_POST(self):
+        if self.path.split("?", 1)[0] == "/write":
+            WRITES.append(self.path)
+            c = core.db()
+            c.execute("INSERT INTO wsgi_probe(v) VALUES(?)", (self.path,))
+            RELEASE.wait(5)
+            try:
+                if "commit" in self.path:
+                    c.commit()
+                self.send_response(204)
+                self.end_headers()
+            finally:
+                WRITE_DONE.set()
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        POSTED.append(body)
+        reply = f"{self.headers.get('cookie')}|{self.headers.get('X-Real-Ip')}|{body.decode()}".encode()
+        self.send_response(201)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        HANDLER_THREADS.append(threading.get_ident())
+        if path == "/small":
+            body = b"hello"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/stream":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.end_headers()
+            RELEASE.wait(5)
+            try:
+                for _ in range(200):
+                    self.wfile.write(CHUNK)
+            finally:
+                FINISHED.set()
+        elif path == "/exit":
+            raise SystemExit(3)
+        elif path == "/hang":
+            RELEASE.wait(5)
+        elif path == "/broken":
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(CHUNK)
+            raise RuntimeError("export failed midway")
+        else:
+            raise RuntimeError("boom")
+
+
+def _environ(path, method="GET"):
+    return {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "127.0.0.1",
+        "SERVER_PORT": "80",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(b""),
+    }
+
+
+def _asgi_call(app, path, method="GET", body=b"", headers=(), incoming=None):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": list(headers),
+        "client": ("10.0.0.5", 5000),
+        "server": ("127.0.0.1", 80),
+        "scheme": "http",
+    }
+    if incoming is None:
+        incoming = [{"type": "http.request", "body": body[:3], "more_body": True}, {"type": "http.request", "body": body[3:], "more_body": False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    if not sent:
+        return None, {}, b"", 0
+    start = sent[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:]), len(sent) - 1
+
+
+def check_asgi():
+    checks = {}
+    app = ASGIHandler(_Handler, max_workers=2)
+    status, headers, data, _ = _asgi_call(app, "/small")
+    checks["asgi_small"] = status == 200 and data == b"hello" and headers[b"content-length"] == b"5"
+    RELEASE.set()
+    status, headers, data, parts = _asgi_call(app, "/stream")
+    checks["asgi_stream"] = b"content-length" not in headers and data == CHUNK * 200 and parts > 2
+    status, _, data, _ = _asgi_call(
+        app, "/form", method="POST", body=b"a=1&b=2",
+        headers=[(b"content-length", b"7"), (b"cookie", b"x=1"), (b"cookie", b"y=2")],
+    )
+    checks["asgi_post"] = status == 201 and data == b"x=1; y=2|10.0.0.5|a=1&b=2"
+    status, _, data, _ = _asgi_call(app, "/error")
+    checks["asgi_error"] = status == 500 and data == b"Internal Server Error"
+    POSTED.clear()
+    status, _, _, _ = _asgi_call(
+        app, "/form", method="POST",
+        incoming=[{"type": "http.request", "body": b"a=1", "more_body": True}, {"type": "http.disconnect"}],
+    )
+    checks["asgi_disconnect_skips_handler"] = status is None and not POSTED
+    limit = core.MAX_REQUEST_BYTES
+    core.MAX_REQUEST_BYTES = 8
+    status, _, data, _ = _asgi_call(
+        app, "/form", method="POST",
+        incoming=[{"type": "http.request", "body": b"a=12345", "more_body": True}, {"type": "http.request", "body": b"67", "more_body": False}],
+    )
+    checks["asgi_chunked_too_large"] = status == 413 and not POSTED
+    status, _, _, _ = _asgi_call(app, "/form", method="POST", body=b"a=1", headers=[(b"content-length", b"99")])
+    checks["asgi_declared_too_large"] = status == 413 and not POSTED
+    core.MAX_REQUEST_BYTES = limit
+    return checks
+
+
+def check_primary_sticky_cookie():
+    checks = {}
+    replicas_enabled, sticky_seconds = core.replicas_enabled, core.REPLICA_STICKY_SECONDS
+    core.replicas_enabled = lambda: True
+    core.REPLICA_STICKY_SECONDS = 5
+
+    def cookies(method, send):
+        response = Response()
+        handler = _Handler(Request(method, "/notifications/readall", Headers()), response)
+        with core.request_db_scope() as scope:
+            scope.describe(method, "/notifications/readall")
+            scope.use_primary()
+            send(handler)
+        return [v for k, v in response.headers if k == "Set-Cookie" and v.startswith(core.PRIMARY_STICKY_COOKIE)]
+
+    try:
+        checks["sticky_cookie_json_post"] = len(cookies("POST", lambda h: core.send_json(h, {"ok": True}))) == 1
+        checks["sticky_cookie_html_post"] = len(cookies("POST", lambda h: core.send_html(h, b"ok"))) == 1
+        checks["sticky_cookie_redirect_post"] = len(cookies("POST", lambda h: core.redir(h, "/"))) == 1
+        checks["sticky_get_not_extended"] = cookies("GET", lambda h: core.send_json(h, {"ok": True})) == []
+    finally:
+        core.replicas_enabled, core.REPLICA_STICKY_SECONDS = replicas_enabled, sticky_seconds
+    return checks
+
+
+def _probe_rows():
+    c = core._open_db()
+    try:
+        return [r["v"] for r in c.execute("SELECT v FROM wsgi_probe ORDER BY id").fetchall()]
+    finally:
+        c.close()
+
+
+def check_timeout_does_not_commit(pooled, start_response):
+    checks = {}
+    c = core._open_db()
+    c.execute("CREATE TABLE IF NOT EXISTS wsgi_probe(id INTEGER PRIMARY KEY, v TEXT)")
+    c.execute("DELETE FROM wsgi_probe")
+    c.commit()
+    c.close()
+    core.WSGI_RESPONSE_TIMEOUT_SECONDS = 0.2
+    try:
+        for path in ("/write?end", "/write?commit"):
+            # Started but slower than the timeout: 500, and neither the request-end commit nor
+            # the handler's own c.commit() may persist the write afterwards.
+            RELEASE.clear()
+            WRITE_DONE.clear()
+            body = pooled(_environ(path, "POST"), start_response)
+            answered_500 = body == [b"Internal Server Error"]
+            RELEASE.set()
+            WRITE_DONE.wait(5)
+            time.sleep(0.1)
+            checks[f"timeout_rolls_back_{path.split('?')[1]}"] = answered_500 and path in WRITES and _probe_rows() == []
+
+        # Queued behind a stuck handler on a one-thread pool: cancelled, never runs.
+        RELEASE.clear()
+        pooled(_environ("/hang"), start_response)
+        body = pooled(_environ("/write?queued", "POST"), start_response)
+        RELEASE.set()
+        time.sleep(0.3)
+        checks["timeout_cancels_queued"] = body == [b"Internal Server Error"] and "/write?queued" not in WRITES
+
+        # Sanity: with time to finish, the same handler commits.
+        core.WSGI_RESPONSE_TIMEOUT_SECONDS = 5
+        RELEASE.set()
+        data = b"".join(pooled(_environ("/write?ok", "POST"), start_response))
+        checks["write_commits_in_time"] = data == b"" and _probe_rows() == ["/write?ok"]
+    finally:
+        RELEASE.set()
+        core.WSGI_RESPONSE_TIMEOUT_SECONDS = 60
+    return checks
+
+
+def main():
+    checks = {}
+    checks.update(check_asgi())
+    checks.update(check_primary_sticky_cookie())
+    app = WSGIHandler(_Handler)
+    seen = {}
+
+    def start_response(status, headers, exc_info=None):
+        seen["status"] = status
+        seen["headers"] = dict(headers)
+
+    body = app(_environ("/small"), start_response)
+    checks["small_buffered"] = isinstance(body, list) and body == [b"hello"] and seen["headers"]["Content-Length"] == "5"
+
+    RELEASE.clear()
+    body = app(_environ("/stream"), start_response)
+    checks["stream_headers_first"] = seen["status"] == "200 OK" and "Content-Length" not in seen["headers"]
+    first = next(body)
+    RELEASE.set()
+    data = first + b"".join(body)
+    checks["stream_body"] = data == CHUNK * 200
+
+    RELEASE.clear()
+    FINISHED.clear()
+    body = app(_environ("/stream"), start_response)
+    next(body)
+    body.close()
+    RELEASE.set()
+    checks["stream_disconnect_stops_handler"] = FINISHED.wait(5)
+
+    body = app(_environ("/broken"), start_response)
+    try:
+        b"".join(body)
+        checks["stream_error_aborts"] = False
+    except RuntimeError:
+        checks["stream_error_aborts"] = True
+
+    body = app(_environ("/error"), start_response)
+    checks["error_before_headers"] = seen["status"].startswith("500") and body == [b"Internal Server Error"]
+
+    body = app(_environ("/exit"), start_response)
+    checks["base_exception_answers_500"] = seen["status"].startswith("500") and body == [b"Internal Server Error"]
+
+    pooled = WSGIHandler(_Handler, max_workers=1)
+    HANDLER_THREADS.clear()
+    for _ in range(3):
+        pooled(_environ("/small"), start_response)
+    checks["handler_threads_reused"] = len(HANDLER_THREADS) == 3 and len(set(HANDLER_THREADS)) == 1
+
+    RELEASE.clear()
+    core.WSGI_RESPONSE_TIMEOUT_SECONDS = 0.2
+    body = pooled(_environ("/hang"), start_response)
+    checks["stuck_handler_times_out"] = seen["status"].startswith("500") and body == [b"Internal Server Error"]
+    RELEASE.set()
+    core.WSGI_RESPONSE_TIMEOUT_SECONDS = 60
+    checks.update(check_timeout_does_not_commit(pooled, start_response))
+
+    core.WSGI_STREAMING_ENABLED = False
+    body = app(_environ("/small"), start_response)
+    checks["streaming_disabled"] = body == [b"hello"]
+    print("WSGI_ADAPTER_CHECKS", checks)
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for nav badge counts (menu_counts_for_user) on SQLite.
+
+Builds a throwaway database with one property manager owning a large portfolio
+(plus a second owner's data as noise), then times:
+
+- before: the previous per-badge COUNT round trips, without the 018 indexes
+- after:  the single query over dashboard_counters (019), with the 018 indexes
+
+Usage:
+  python tools/bench_menu_counts.py [--properties 500] [--units 5000] [--payments 100000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+NEW_INDEXES = (
+    "idx_notifications_user_read",
+    "idx_maintenance_tenant_status",
+    "idx_property_checks_prop_status",
+    "idx_payments_payer_status",
+    "idx_tp_invites_prop_status",
+    "idx_applications_status",
+    "idx_inquiries_status",
+)
+
+
+def legacy_counts(c, user):
+    # Pre-018 menu_counts_for_user for a property manager: one round trip per badge.
+    acct = user["account_number"]
+    one = lambda sql, args=(): c.execute(sql, args).fetchone()["n"]
+    counts = {
+        "alerts": one("SELECT COUNT(1) AS n FROM notifications WHERE user_id=? AND is_read=0", (user["id"],)),
+        "maintenance_open": one(
+            "SELECT COUNT(1) AS n FROM maintenance_requests m "
+            "JOIN tenant_leases l ON l.tenant_account=m.tenant_account AND l.is_active=1 "
+            "JOIN properties p ON p.id=l.property_id "
+            "WHERE p.owner_account=? AND m.status IN('open','in_progress')", (acct,)),
+        "checks_pending": one(
+            "SELECT COUNT(1) AS n FROM property_checks pc JOIN properties p ON p.id=pc.property_id "
+            "WHERE p.owner_account=? AND pc.status IN('requested','scheduled')", (acct,)),
+        "listing_reviews": one(
+            "SELECT COUNT(1) AS n FROM listing_requests lr JOIN properties p ON p.id=lr.property_id "
+            "WHERE p.owner_account=? AND lr.status='pending'", (acct,)),
+        "payments_submitted": one(
+            "SELECT COUNT(1) AS n FROM payments p WHERE p.status='submitted' AND EXISTS("
+            "SELECT 1 FROM tenant_leases l JOIN properties pp ON pp.id=l.property_id "
+            "WHERE l.tenant_account=p.payer_account AND l.is_active=1 AND pp.owner_account=?)", (acct,)),
+        "invites_pending": one(
+            "SELECT COUNT(1) AS n FROM tenant_property_invites i JOIN properties p ON p.id=i.property_id "
+            "WHERE p.owner_account=? AND i.status='pending'", (acct,)),
+        "applications_pending": one("SELECT COUNT(1) AS n FROM applications WHERE status IN('submitted','under_review')"),
+        "inquiries_open": one("SELECT COUNT(1) AS n FROM inquiries WHERE status IN('new','open')"),
+    }
+    counts["queue_total"] = (
+        counts["maintenance_open"] + counts["payments_submitted"] + counts["checks_pending"] +
+        counts["applications_pending"] + counts["inquiries_open"] + counts["invites_pending"]
+    )
+    return counts
+
+
+def populate(c, properties, units, payments, rng):
+    owners = [("PM-BENCH-1", "bench_pm"), ("PM-BENCH-2", "bench_pm_other")]
+    for acct, username in owners:
+        c.execute(
+            "INSERT INTO users(full_name,phone,email,username,password_salt,password_hash,role,account_number)"
+            "VALUES(?,?,?,?,?,?,?,?)",
+            (username, "000", f"{username}@example.com", username, "x", "x", "property_manager", acct),
+        )
+    tenants = []
+    leases = []
+    unit_rows = []
+    prop_rows = []
+    per_prop = max(1, units // max(1, properties))
+    for owner_idx, (acct, _) in enumerate(owners):
+        for p in range(properties):
+            pid = f"B{owner_idx}-{p:05d}"
+            prop_rows.append((pid, acct, f"Bench {p}", "Apartment", per_prop, "Nassau"))
+            for u in range(per_prop):
+                label = f"U{u}"
+                unit_rows.append((pid, label, 1, 1, 1500, 1))
+                tacct = f"T{owner_idx}-{p:05d}-{u:03d}"
+                tenants.append((f"Tenant {tacct}", "000", f"{tacct}@example.com", tacct.lower(), "x", "x", "tenant", tacct))
+                leases.append((tacct, pid, label, 1 if rng.random() < 0.9 else 0))
+    c.executemany("INSERT INTO properties(id,owner_account,name,property_type,units_count,location)VALUES(?,?,?,?,?,?)", prop_rows)
+    c.executemany("INSERT INTO units(property_id,unit_label,beds,baths,rent,is_occupied)VALUES(?,?,?,?,?,?)", unit_rows)
+    c.executemany(
+        "INSERT INTO users(full_name,phone,email,username,password_salt,password_hash,role,account_number)VALUES(?,?,?,?,?,?,?,?)",
+        tenants,
+    )
+    c.executemany("INSERT INTO tenant_leases(tenant_account,property_id,unit_label,is_active)VALUES(?,?,?,?)", leases)
+    accounts = [t[-1] for t in tenants]
+    c.executemany(
+        "INSERT INTO payments(payer_account,payer_role,payment_type,provider,amount,status)VALUES(?,?,?,?,?,?)",
+        (
+            (rng.choice(accounts), "tenant", "rent", "card", 1500, rng.choice(("paid", "paid", "paid", "failed", "submitted")))
+            for _ in range(payments * len(owners))
+        ),
+    )
+    c.executemany(
+        "INSERT INTO maintenance_requests(tenant_account,tenant_name,description,status)VALUES(?,?,?,?)",
+        ((a, a, "leak", rng.choice(("open", "in_progress", "closed", "closed"))) for a in rng.sample(accounts, len(accounts) // 2)),
+    )
+    pids = [p[0] for p in prop_rows]
+    c.executemany(
+        "INSERT INTO property_checks(requester_account,property_id,preferred_date,status)VALUES(?,?,?,?)",
+        ((p[1], p[0], "2026-01-01", rng.choice(("requested", "scheduled", "completed"))) for p in prop_rows),
+    )
+    c.executemany(
+        "INSERT INTO listing_requests(property_id,title,price,location,beds,baths,category,description,status)"
+        "VALUES(?,?,?,?,?,?,?,?,?)",
+        ((pid, "Unit", 1500, "Nassau", 1, 1, "Long Term Rental", "d", rng.choice(("pending", "approved"))) for pid in pids),
+    )
+    c.executemany(
+        "INSERT INTO notifications(user_id,text,is_read)VALUES(?,?,?)",
+        ((1 + (i % 2), "note", rng.choice((0, 1, 1))) for i in range(2000)),
+    )
+    c.commit()
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return result, statistics.median(samples)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark nav badge counts before/after the aggregated query.")
+    ap.add_argument("--properties", type=int, default=500)
+    ap.add_argument("--units", type=int, default=5000)
+    ap.add_argument("--payments", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_PATH"] = str(Path(tmp.name) / "bench.sqlite")
+    os.environ["DB_POOL_ENABLED"] = "0"
+    os.environ["SEED_DEMO_DATA"] = "0"
+    os.environ.setdefault("LOG_DIR", str(Path(tmp.name) / "logs"))
+    sys.path.insert(0, str(ROOT))
+    from atlasbahamas_app import core
+
+    core.ensure_db()
+    c = core.db()
+    populate(c, args.properties, args.units, args.payments, random.Random(7))
+    user = dict(c.execute("SELECT * FROM users WHERE account_number='PM-BENCH-1'").fetchone())
+    print(f"data properties={args.properties} units={args.units} payments={args.payments} (x2 owners)")
+
+    for name in NEW_INDEXES:
+        c.execute(f"DROP INDEX IF EXISTS {name}")
+    c.execute("ANALYZE")
+    c.commit()
+    before, before_ms = timed(lambda: legacy_counts(c, user), args.repeat)
+
+    core.ensure_db()
+    c.execute("ANALYZE")
+    c.commit()
+    after, after_ms = timed(lambda: core.menu_counts_for_user(user), args.repeat)
+    legacy_indexed, legacy_indexed_ms = timed(lambda: legacy_counts(c, user), args.repeat)
+    c.close()
+
+    print(f"before_ms={before_ms:.2f} round_trips=8 (per-badge queries, pre-018 indexes)")
+    print(f"legacy_with_indexes_ms={legacy_indexed_ms:.2f}")
+    print(f"after_ms={after_ms:.2f} round_trips=1 (dashboard_counters row + indexed subselects)")
+    print(f"speedup={before_ms / max(after_ms, 1e-6):.1f}x")
+    same = before == legacy_indexed == {k: after[k] for k in before}
+    print(f"counts_match={same} counts={after}")
+    tmp.cleanup()
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
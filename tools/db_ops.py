@@ -1,5 +1,7 @@
 import argparse
+import os
 import shutil
+import sys
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
@@ -55,6 +57,27 @@ def run_migrations():
     print("migrations_applied=ok")
 
 
+def _app_core(db_path: Path):
+    # Uses the configured backend: POSTGRES_DSN when set, otherwise the SQLite file.
+    os.environ.setdefault("DATABASE_PATH", str(db_path))
+    sys.path.insert(0, str(ROOT))
+    from atlasbahamas_app import core
+
+    return core
+
+
+def rebuild_counters(db_path: Path):
+    core = _app_core(db_path)
+    drift = core.db_write_retry(core.rebuild_dashboard_counters, queued=False)
+    print(f"dashboard_counters_rebuilt=ok drift_rows={drift}")
+
+
+def rebuild_rollups(db_path: Path):
+    core = _app_core(db_path)
+    rows = core.db_write_retry(core.rebuild_analytics_rollups, queued=False)
+    print("analytics_rollups_rebuilt=ok " + " ".join(f"{k}={v}" for k, v in rows.items()))
+
+
 def main():
     parser = argparse.ArgumentParser(description="AtlasBahamas DB backup/restore/integrity/migrate tooling.")
     sub = parser.add_subparsers(dest="cmd", required=True)
@@ -72,6 +95,12 @@ def main():
 
     sub.add_parser("migrate", help="Run ensure_db() migrations.")
 
+    p_counters = sub.add_parser("rebuild-counters", help="Recompute dashboard_counters from source tables.")
+    p_counters.add_argument("--db", default=str(DEFAULT_DB))
+
+    p_rollups = sub.add_parser("rebuild-rollups", help="Backfill and recompute the monthly analytics rollups.")
+    p_rollups.add_argument("--db", default=str(DEFAULT_DB))
+
     args = parser.parse_args()
     cmd = args.cmd
     if cmd == "backup":
@@ -82,6 +111,10 @@ def main():
         integrity_check(Path(args.db))
     elif cmd == "migrate":
         run_migrations()
+    elif cmd == "rebuild-counters":
+        rebuild_counters(Path(args.db))
+    elif cmd == "rebuild-rollups":
+        rebuild_rollups(Path(args.db))
 
 
 if __name__ == "__main__":
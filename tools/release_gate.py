@@ -4,6 +4,15 @@
 Runs required validations:
 - smoke tests
 - role-matrix tests
+- db compatibility layer checks
+- request-scoped connection checks
+- route table checks
+- template cache checks
+- nav badge cache checks
+- WSGI/ASGI adapter checks
+- shared guard-state store checks
+- password hashing pool checks
+- Redis session payload checks
 - backup + restore verification
 - PostgreSQL migration connectivity verification
 """
@@ -29,6 +38,15 @@ def main() -> int:
     checks = [
         ("smoke", [sys.executable, "tests/smoke_test.py"]),
         ("role_matrix", [sys.executable, "tests/role_matrix_test.py"]),
+        ("db_compat", [sys.executable, "tests/db_compat_test.py"]),
+        ("request_scope", [sys.executable, "tests/request_scope_test.py"]),
+        ("routing", [sys.executable, "tests/routing_test.py"]),
+        ("template_cache", [sys.executable, "tests/template_cache_test.py"]),
+        ("nav_cache", [sys.executable, "tests/nav_cache_test.py"]),
+        ("wsgi_adapter", [sys.executable, "tests/wsgi_adapter_test.py"]),
+        ("guard_store", [sys.executable, "tests/guard_store_test.py"]),
+        ("password_hash", [sys.executable, "tests/password_hash_test.py"]),
+        ("session_redis", [sys.executable, "tests/session_redis_test.py"]),
         ("backup", [sys.executable, "tools/backup_restore.py", "backup"]),
         ("restore_test", [sys.executable, "tools/backup_restore.py", "restore-test", "--latest"]),
     ]